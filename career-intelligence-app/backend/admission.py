@@ -0,0 +1,207 @@
+"""
+Admission Control
+Bounded concurrency, coalescing of identical in-flight requests, and
+per-request latency budgets for /api/analyze
+"""
+
+import threading
+import time
+
+# Weight of the newest observation in a section's running cost estimate
+COST_SMOOTHING = 0.2
+
+# Seconds after which an estimate that was not refreshed is dropped, so a
+# section skipped because of one slow run gets measured again
+COST_TTL = 10.0
+
+
+class Overloaded(Exception):
+    """Raised when no analysis slot frees up in time"""
+    
+    def __init__(self, retry_after):
+        super().__init__('Server is busy, please retry shortly')
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    Caps the number of analyses computed at once
+    
+    Requests over the cap wait at most `wait` seconds for a slot and are
+    then turned away with Overloaded, instead of queueing without limit.
+    """
+    
+    def __init__(self, max_concurrency=32, wait=0.0, retry_after=1):
+        self.max_concurrency = max_concurrency
+        self.wait = wait
+        self.retry_after = retry_after
+        self.admitted = 0
+        self.rejected = 0
+        self.in_flight = 0
+        self._freed = threading.Condition(threading.Lock())
+    
+    def acquire(self):
+        """
+        Take a slot; every successful acquire() must be paired with release()
+        
+        Raises:
+            Overloaded: if every slot is still taken after `wait` seconds
+        """
+        with self._freed:
+            if self.in_flight >= self.max_concurrency and not (
+                self.wait > 0
+                and self._freed.wait_for(lambda: self.in_flight < self.max_concurrency, self.wait)
+            ):
+                self.rejected += 1
+                raise Overloaded(self.retry_after)
+            self.admitted += 1
+            self.in_flight += 1
+    
+    def release(self):
+        with self._freed:
+            self.in_flight -= 1
+            if self.wait > 0:
+                self._freed.notify()
+    
+    def stats(self):
+        """Admission counters and current load"""
+        with self._freed:
+            return {
+                'admitted': self.admitted,
+                'rejected': self.rejected,
+                'in_flight': self.in_flight,
+                'max_concurrency': self.max_concurrency
+            }
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error')
+    
+    def __init__(self):
+        self.done = None  # Event, created by the first caller that has to wait
+        self.result = None
+        self.error = None
+
+
+class RequestCoalescer:
+    """
+    Runs identical concurrent computations once
+    
+    The first caller for a key computes; callers arriving while it runs
+    wait and share its result (or its exception). Nothing is kept once
+    the computation finishes - that is the result cache's job.
+    """
+    
+    def __init__(self):
+        self.coalesced = 0
+        self._calls = {}
+        self._lock = threading.Lock()
+    
+    def run(self, key, compute):
+        """
+        compute() for key, or the result of an identical call in flight
+        
+        Args:
+            key: Hashable identity of the computation
+            compute: Zero-argument callable
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.coalesced += 1
+                if call.done is None:
+                    call.done = threading.Event()
+                done = call.done
+        
+        if not leader:
+            done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        
+        try:
+            call.result = compute()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+                done = call.done
+            if done is not None:
+                done.set()
+
+
+class SectionCosts:
+    """
+    Running estimate of the seconds each optional response section takes
+    
+    Updates are unlocked: a lost update only delays the estimate slightly.
+    """
+    
+    def __init__(self, smoothing=COST_SMOOTHING, ttl=COST_TTL):
+        self.smoothing = smoothing
+        self.ttl = ttl
+        self._estimates = {}  # section -> (seconds, monotonic time observed)
+    
+    def estimate(self, section):
+        """Expected seconds for section; 0 until it has been observed recently"""
+        entry = self._estimates.get(section)
+        if entry is None or time.monotonic() - entry[1] > self.ttl:
+            return 0.0
+        return entry[0]
+    
+    def observe(self, section, seconds):
+        previous = self._estimates.get(section)
+        if previous is not None:
+            seconds = previous[0] + self.smoothing * (seconds - previous[0])
+        self._estimates[section] = (seconds, time.monotonic())
+    
+    def snapshot(self):
+        """{section: estimated milliseconds}"""
+        return {section: round(entry[0] * 1000, 3) for section, entry in self._estimates.items()}
+
+
+def parse_latency_budget(value):
+    """
+    Validate the latency_budget_ms field of a request
+    
+    Returns:
+        The budget in milliseconds (float), or None if not given
+    
+    Raises:
+        ValueError: if value is not a positive number
+    """
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not value > 0:
+        raise ValueError('latency_budget_ms must be a positive number')
+    return float(value)
+
+
+class LatencyBudget:
+    """Time left for one request, measured from when it arrived"""
+    
+    __slots__ = ('budget_ms', 'costs', 'deadline')
+    
+    def __init__(self, budget_ms, costs, start=None):
+        self.budget_ms = budget_ms
+        self.costs = costs
+        self.deadline = (time.perf_counter() if start is None else start) + budget_ms / 1000
+    
+    def choose(self, options):
+        """
+        The first of options (most complete first) expected to finish in time
+        
+        Returns:
+            An entry of options, or None if none of them fits
+        """
+        remaining = self.deadline - time.perf_counter()
+        for option in options:
+            if self.costs.estimate(option) <= remaining:
+                return option
+        return None
@@ -0,0 +1,137 @@
+"""
+Compact Profile Types
+Slotted value types that the algorithms pass around instead of nested
+dicts of strings
+
+Proficiency levels are interned Level objects with an integer code, so a
+level is lowercased and weighted once rather than on every comparison.
+Strengths and gaps become plain dicts only when a response is encoded
+(see to_dict()).
+"""
+
+from types import MappingProxyType
+
+PROFICIENCY_WEIGHTS = MappingProxyType({
+    'expert': 1.0,
+    'advanced': 0.75,
+    'intermediate': 0.5,
+    'beginner': 0.25
+})
+
+# Integer level codes. Levels outside PROFICIENCY_WEIGHTS are UNRECOGNIZED
+# and weighted like beginner.
+UNRECOGNIZED, BEGINNER, INTERMEDIATE, ADVANCED, EXPERT = range(5)
+LEVEL_CODES = MappingProxyType({
+    'beginner': BEGINNER,
+    'intermediate': INTERMEDIATE,
+    'advanced': ADVANCED,
+    'expert': EXPERT
+})
+# Weight per level code
+LEVEL_WEIGHTS = tuple(PROFICIENCY_WEIGHTS[name] for name in
+                      ('beginner', 'beginner', 'intermediate', 'advanced', 'expert'))
+
+# Distinct level spellings kept interned
+MAX_INTERNED_LEVELS = 1024
+
+_levels = {}
+
+
+class Level:
+    """One proficiency level as a user wrote it; get instances from level_of()"""
+    
+    __slots__ = ('text', 'key', 'label', 'code', 'weight')
+    
+    def __init__(self, text):
+        self.text = text                # as given, e.g. 'ADVANCED'
+        self.key = text.lower()         # 'advanced'
+        self.label = text.capitalize()  # 'Advanced', as shown in responses
+        self.code = LEVEL_CODES.get(self.key, UNRECOGNIZED)
+        self.weight = LEVEL_WEIGHTS[self.code]
+    
+    def __repr__(self):
+        return f'Level({self.text!r})'
+
+
+def level_of(text):
+    """The shared Level for a level string"""
+    level = _levels.get(text)
+    if level is None:
+        if len(_levels) >= MAX_INTERNED_LEVELS:
+            _levels.clear()
+        level = _levels[text] = Level(text)
+    return level
+
+
+class Profile:
+    """
+    A user's normalized skills: {skill ID: Level}
+    
+    Built by scoring.normalize_profile(); read-only once built.
+    """
+    
+    __slots__ = ('levels',)
+    
+    def __init__(self, levels):
+        self.levels = levels
+    
+    def get(self, skill_id):
+        """Level of a skill, or None"""
+        return self.levels.get(skill_id)
+    
+    def items(self):
+        return self.levels.items()
+    
+    def __len__(self):
+        return len(self.levels)
+    
+    def __repr__(self):
+        return f'Profile({self.levels!r})'
+
+
+class Strength:
+    """A required skill the user is already good at"""
+    
+    __slots__ = ('skill', 'your_level', 'importance', 'note')
+    
+    def __init__(self, skill, your_level, importance, note):
+        self.skill = skill
+        self.your_level = your_level    # level label, e.g. 'Advanced'
+        self.importance = importance    # 'Critical' or 'Important'
+        self.note = note
+    
+    def to_dict(self):
+        return {
+            'skill': self.skill,
+            'your_level': self.your_level,
+            'importance': self.importance,
+            'note': self.note
+        }
+    
+    def __repr__(self):
+        return f'Strength({self.skill!r}, {self.your_level!r})'
+
+
+class SkillGap:
+    """A required skill that is missing or below its minimum level"""
+    
+    __slots__ = ('skill', 'current_level', 'required_level', 'priority', 'note')
+    
+    def __init__(self, skill, current_level, required_level, priority, note):
+        self.skill = skill
+        self.current_level = current_level    # level label, or 'None' if missing
+        self.required_level = required_level  # level label
+        self.priority = priority              # 'High' or 'Medium'
+        self.note = note
+    
+    def to_dict(self):
+        return {
+            'skill': self.skill,
+            'current_level': self.current_level,
+            'required_level': self.required_level,
+            'priority': self.priority,
+            'note': self.note
+        }
+    
+    def __repr__(self):
+        return f'SkillGap({self.skill!r}, {self.current_level!r} -> {self.required_level!r})'
@@ -0,0 +1,478 @@
+"""
+Learning Path Planner
+Chooses which skills to learn, and to what level, to raise the job fit
+score the most within a time budget
+
+Every required skill below expert is a group of options - one per level
+the user could reach - each with a fit score gain (from the same
+importance and proficiency weights as scoring.analyze_fit) and a cost in
+weeks (from the level distance, scaled by how long the skill's learning
+resources take). Picking at most one option per skill within the budget
+is a multiple-choice knapsack. It is solved exactly by dynamic
+programming, or for very large instances by the convex-hull greedy with
+its LP upper bound.
+
+A fit score is clamped to 0-100 after the experience and education
+bonuses, so gains past a role's remaining headroom (measured from the
+unclamped score) are worth nothing. The objective is capped at the average
+headroom of the target roles (exact for one role), and of the plans
+reaching the best capped gain the one taking the fewest weeks is chosen.
+"""
+
+from bisect import bisect_left
+from collections import namedtuple
+import math
+import re
+import threading
+from operator import sub
+
+from algorithms.models import LEVEL_WEIGHTS, UNRECOGNIZED, BEGINNER, EXPERT
+from algorithms.recommendations import LazyFragments
+from algorithms.salary_estimation import estimate_salary
+from algorithms.scoring import EDUCATION_BONUS, EXPERIENCE_BONUS
+
+# Level indexes of the plan: 0 is a missing skill, 1-4 the proficiency
+# levels (as models' level codes)
+LEVEL_NAMES = ('None', 'Beginner', 'Intermediate', 'Advanced', 'Expert')
+PLAN_WEIGHTS = (0.0,) + LEVEL_WEIGHTS[BEGINNER:]
+
+# Largest accepted budget and number of target roles
+MAX_PLAN_WEEKS = 104
+MAX_PLAN_ROLES = 5
+
+# Instances with more DP cells (options x budget weeks) than this are
+# solved greedily
+DP_MAX_CELLS = 400000
+
+# Solved DP tables kept per PlannerIndex (see PlanMemo), and the most DP
+# cells they may hold together (about 32 bytes each)
+MEMO_SIZE = 256
+MEMO_MAX_CELLS = 1000000
+
+# Resource durations ("2-3 weeks", "3-4 months", "20-30 hours") in weeks
+DURATION_PATTERN = re.compile(r'(\d+(?:\.\d+)?)(?:\s*-\s*(\d+(?:\.\d+)?))?\s*(hour|day|week|month)s?',
+                              re.IGNORECASE)
+WEEKS_PER_UNIT = {'hour': 1 / 10, 'day': 1 / 5, 'week': 1.0, 'month': 52 / 12}  # 10 study hours a week
+
+# Weeks per level climbed when learning_time has no usable estimate
+FALLBACK_WEEKS_PER_LEVEL = 6.0
+
+# Resource durations are taken to cover none -> intermediate, this many levels
+RESOURCE_LEVELS = 2
+
+# Bounds on how much a skill's resources may speed up or slow down the
+# generic estimate
+MIN_PACE = 0.5
+MAX_PACE = 2.0
+
+# Learning cost data derived from skills_database and the learning_time
+# section of recommendation_content.json
+PlannerIndex = namedtuple('PlannerIndex', [
+    'level_weeks',   # weeks to climb n levels, indexed by n (0-4)
+    'skill_pace',    # LazyFragments {skill ID: multiplier of level_weeks} for skills with resource durations
+    'memo'           # PlanMemo
+])
+
+# One way to improve one skill
+_Option = namedtuple('_Option', ['weeks', 'gain', 'level', 'role_gains'])
+
+
+class PlanMemo:
+    """
+    Solved plans of one PlannerIndex, shared by the request threads
+    
+    Maps (roles, level signature) to (budget, groups, DP rows or None, gain
+    cap). It is emptied when it would exceed MEMO_SIZE entries or
+    MEMO_MAX_CELLS DP cells.
+    """
+    
+    def __init__(self):
+        self._entries = {}  # key -> (cells, entry)
+        self._cells = 0
+        self._lock = threading.Lock()
+    
+    def get(self, key):
+        with self._lock:
+            cached = self._entries.get(key)
+        return cached[1] if cached is not None else None
+    
+    def put(self, key, entry, cells):
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._cells -= previous[0]
+            if len(self._entries) >= MEMO_SIZE or self._cells + cells > MEMO_MAX_CELLS:
+                self._entries.clear()
+                self._cells = 0
+            self._entries[key] = (cells, entry)
+            self._cells += cells
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._cells = 0
+    
+    def __len__(self):
+        return len(self._entries)
+
+
+def parse_weeks(text):
+    """
+    Duration text in weeks: the midpoint of a range, None if it has no duration
+    """
+    match = DURATION_PATTERN.search(text) if isinstance(text, str) else None
+    if match is None:
+        return None
+    low = float(match.group(1))
+    high = float(match.group(2)) if match.group(2) else low
+    return (low + high) / 2 * WEEKS_PER_UNIT[match.group(3).lower()]
+
+
+def build_planner_index(skills_database, content):
+    """
+    Args:
+        content: Parsed recommendation_content.json
+    
+    Returns:
+        PlannerIndex
+    """
+    learning_time = content['learning_time']
+    default_weeks = parse_weeks(learning_time['default'])
+    level_weeks = tuple(
+        0.0 if distance == 0 else (parse_weeks(learning_time['estimates'].get(str(distance)))
+                                   or default_weeks or FALLBACK_WEEKS_PER_LEVEL * distance)
+        for distance in range(EXPERT + 1)
+    )
+    
+    # Paces are worked out when a plan first needs them; only the names
+    # are read up front, so a mapped snapshot's entries stay undecoded
+    names = {skill.lower(): skill for skill in skills_database}
+    skill_pace = LazyFragments(lambda skill_id: (
+        _skill_pace(skills_database[names[skill_id]], level_weeks) if skill_id in names else None
+    ))
+    
+    return PlannerIndex(level_weeks=level_weeks, skill_pace=skill_pace, memo=PlanMemo())
+
+
+def _skill_pace(skill_info, level_weeks):
+    """Multiplier of level_weeks from a skill's resource durations, or None without any"""
+    durations = [parse_weeks(resource.get('duration')) for resource in skill_info.get('resources', [])]
+    durations = sorted(weeks for weeks in durations if weeks)
+    if not durations:
+        return None
+    median = (durations[(len(durations) - 1) // 2] + durations[len(durations) // 2]) / 2
+    pace = median / level_weeks[RESOURCE_LEVELS]
+    return min(max(pace, MIN_PACE), MAX_PACE)
+
+
+def _current_level(level):
+    """Plan level index of a models.Level (None when missing)"""
+    if level is None:
+        return 0
+    return max(level.code, BEGINNER) if level.code != UNRECOGNIZED else BEGINNER
+
+
+def _build_groups(roles, profile, planner_index):
+    """
+    One (skill ID, skill name, current level, options) group per skill that
+    any target role requires and that can still be improved
+    
+    Gains are fit score points averaged over the roles.
+    """
+    groups = {}
+    for role in roles:
+        for position, skill_id in enumerate(role.keys):
+            if skill_id not in groups:
+                groups[skill_id] = (role.skills[position], _current_level(profile.get(skill_id)))
+    
+    result = []
+    level_weeks = planner_index.level_weeks
+    for skill_id, (skill, current) in groups.items():
+        # Fit score points per unit of proficiency weight, per role
+        points = []
+        for role in roles:
+            position = role.positions.get(skill_id)
+            if position is None or role.total_weight <= 0:
+                points.append(0.0)
+            else:
+                points.append(role.importance[position] * 100 / role.total_weight)
+        mean_points = sum(points) / len(points)
+        if mean_points <= 0:
+            continue
+        pace = planner_index.skill_pace.get(skill_id, 1.0)
+        current_weight = profile.get(skill_id).weight if current else 0.0
+        options = []
+        for target in range(current + 1, EXPERT + 1):
+            delta = PLAN_WEIGHTS[target] - current_weight
+            weeks = max(1, math.ceil(level_weeks[target - current] * pace - 1e-9))
+            options.append(_Option(weeks, mean_points * delta, target, tuple(value * delta for value in points)))
+        if options:
+            result.append((skill_id, skill, current, options))
+    return result
+
+
+def _raw_scores(roles, profile, experience, education):
+    """
+    Fit scores of the roles before the clamp to 0-100, computed as
+    scoring.analyze_fit does (a negative education bonus can take them
+    below 0, bonuses can take them past 100)
+    """
+    experience_bonus = EXPERIENCE_BONUS.get(experience, 0)
+    education_bonus = EDUCATION_BONUS.get(education.lower(), 0)
+    scores = []
+    for role in roles:
+        contributions = []
+        for position, skill_id in enumerate(role.keys):
+            level = profile.get(skill_id)
+            if level is not None:
+                contributions.append(level.weight * role.importance[position] * 100)
+        skill_score = math.fsum(contributions)
+        base_score = skill_score / role.total_weight if role.total_weight > 0 else 0
+        scores.append(base_score + experience_bonus + education_bonus)
+    return scores
+
+
+def _clamp_score(score):
+    """Fit score from an unclamped one, as scoring.analyze_fit reports it"""
+    return max(min(score, 100), 0)
+
+
+def _gain_cap(groups, raw_scores):
+    """
+    Average fit score headroom of the roles, or None when the groups cannot
+    gain that much anyway
+    """
+    cap = sum(max(100 - score, 0) for score in raw_scores) / len(raw_scores)
+    # Options are in increasing level order, so the last gains the most
+    reachable = sum(group[3][-1].gain for group in groups)
+    # Without bonuses the two are equal up to rounding
+    return cap if cap < reachable - 1e-9 else None
+
+
+def _solve_dp(groups, budget, cap=None):
+    """
+    Exact multiple-choice knapsack
+    
+    Args:
+        cap: Total gain beyond which more is worth nothing, or None
+    
+    Returns:
+        List of one row per group: row[b] is the best total gain of the
+        groups so far within b weeks, at most cap
+    """
+    rows = []
+    best = [0.0] * (budget + 1)
+    for _, _, _, options in groups:
+        row = best[:]
+        for option in options:
+            weeks = option.weeks
+            if weeks > budget:
+                continue
+            gain = option.gain
+            # row[b] = max(row[b], best[b - weeks] + gain) for b >= weeks
+            row[weeks:] = [value if value >= before + gain else before + gain
+                           for value, before in zip(row[weeks:], best)]
+        if cap is not None:
+            # Capping the best option is capping every option
+            row = [value if value < cap else cap for value in row]
+        rows.append(row)
+        best = row
+    return rows
+
+
+def _backtrack(groups, rows, budget, cap=None):
+    """
+    The option chosen per group for a budget, as {group index: option}
+    
+    Of the plans reaching the best gain, the one taking the fewest weeks
+    is chosen.
+    """
+    if rows:
+        # Rows never decrease with the budget
+        budget = bisect_left(rows[-1], rows[-1][budget], 0, budget)
+    chosen = {}
+    for index in range(len(groups) - 1, -1, -1):
+        row = rows[index]
+        previous = rows[index - 1] if index > 0 else None
+        value = row[budget]
+        if value == (previous[budget] if previous is not None else 0.0):
+            continue
+        for option in groups[index][3]:
+            if option.weeks <= budget:
+                before = previous[budget - option.weeks] if previous is not None else 0.0
+                gain = before + option.gain
+                if (gain if cap is None else min(gain, cap)) == value:
+                    chosen[index] = option
+                    budget -= option.weeks
+                    break
+    return chosen
+
+
+def _upper_hull(options):
+    """The options on the upper convex hull of (weeks, gain), starting from (0, 0)"""
+    hull = []
+    for option in options:
+        while hull:
+            last = hull[-1]
+            before_weeks, before_gain = (hull[-2].weeks, hull[-2].gain) if len(hull) > 1 else (0, 0.0)
+            # Drop last if it lies on or below the line from before to option
+            if ((last.gain - before_gain) * (option.weeks - before_weeks)
+                    <= (option.gain - before_gain) * (last.weeks - before_weeks)):
+                hull.pop()
+            else:
+                break
+        hull.append(option)
+    return hull
+
+
+def _solve_greedy(groups, budget, cap=None):
+    """
+    Convex-hull greedy for the multiple-choice knapsack
+    
+    Args:
+        cap: Total gain beyond which more is worth nothing, or None; the
+             greedy stops once it is reached
+    
+    Returns:
+        ({group index: option}, LP upper bound on the best total gain)
+    """
+    increments = []
+    for index, (_, _, _, options) in enumerate(groups):
+        weeks, gain = 0, 0.0
+        for rank, option in enumerate(_upper_hull(options)):
+            increments.append(((option.gain - gain) / (option.weeks - weeks), rank, index,
+                               option.weeks - weeks, option.gain - gain, option))
+            weeks, gain = option.weeks, option.gain
+    increments.sort(key=lambda increment: (-increment[0], increment[1]))
+    
+    chosen = {}
+    blocked = set()
+    remaining = budget
+    total = 0.0
+    bound = None
+    for efficiency, _, index, weeks, gain, option in increments:
+        if index in blocked:
+            continue
+        if cap is not None and total >= cap:
+            break
+        if weeks <= remaining:
+            remaining -= weeks
+            total += gain
+            chosen[index] = option
+        else:
+            if bound is None:
+                bound = total + efficiency * remaining
+            # Later increments of this group build on this one
+            blocked.add(index)
+    bound = bound if bound is not None else total
+    return chosen, bound if cap is None else min(bound, cap)
+
+
+def plan_learning_path(target_roles, profile, budget_weeks, job_roles, role_index, planner_index,
+                       experience='fresher', education='bachelors', location='tier3',
+                       salary_data=None, salary_table=None):
+    """
+    Best set of skill upgrades within budget_weeks, as an ordered plan
+    
+    With several target roles, the average fit score gain across them is
+    maximized. Gains are capped by the 100-point maximum (see the module
+    docstring) and reported as the actual change of the clamped score.
+    Scores below 0 count from their unclamped value, so the part of a
+    gain that only brings a score up to 0 is not reported. Steps are
+    ordered by gain per week, and each carries the fit score and salary
+    range of every role once it is done.
+    
+    Args:
+        target_roles: Role names, all present in role_index
+        profile: Output of scoring.normalize_profile()
+        budget_weeks: Whole weeks available (1 to MAX_PLAN_WEEKS)
+        planner_index: build_planner_index() of the same data
+        salary_data, salary_table: Market data for the salary projections
+                                   (projections are left out without them)
+    
+    Returns:
+        Dict with the current scores, the steps and the solver used
+    """
+    roles = [role_index[role] for role in target_roles]
+    raw_scores = _raw_scores(roles, profile, experience, education)
+    scores = [_clamp_score(score) for score in raw_scores]
+    groups_key = (tuple(target_roles), tuple(sorted(
+        (skill_id, level.code) for skill_id, level in profile.items()
+        if any(skill_id in role.positions for role in roles)
+    )))
+    
+    # A table solved for a larger budget and the same cap answers every
+    # smaller budget
+    memo = planner_index.memo
+    entry = memo.get(groups_key)
+    groups = entry[1] if entry is not None else _build_groups(roles, profile, planner_index)
+    cap = _gain_cap(groups, raw_scores)
+    if entry is not None and entry[0] >= budget_weeks and entry[2] is not None and entry[3] == cap:
+        rows = entry[2]
+    else:
+        rows = None
+        cells = sum(len(group[3]) for group in groups) * (budget_weeks + 1)
+        if cells <= DP_MAX_CELLS:
+            rows = _solve_dp(groups, budget_weeks, cap)
+        else:
+            cells = 0
+        memo.put(groups_key, (budget_weeks, groups, rows, cap), cells)
+    
+    if rows is not None:
+        solver = 'dp'
+        chosen = _backtrack(groups, rows, budget_weeks, cap)
+        upper_bound = rows[-1][budget_weeks] if rows else 0.0
+    else:
+        solver = 'greedy'
+        chosen, upper_bound = _solve_greedy(groups, budget_weeks, cap)
+    
+    def projection(role_name, fit_score):
+        entry = {'role': role_name, 'fit_score': round(fit_score, 1)}
+        if salary_data is not None:
+            salary = estimate_salary(role_name, location, experience, fit_score, salary_data, salary_table)
+            entry['salary_range'] = {
+                'min': salary['min'],
+                'max': salary['max'],
+                'formatted_range': salary['formatted_range']
+            }
+        return entry
+    
+    current_scores = scores
+    current = [projection(role_name, score) for role_name, score in zip(target_roles, scores)]
+    
+    # Most fit score per week first
+    ordered = sorted(chosen.items(), key=lambda item: (-item[1].gain / item[1].weeks, item[0]))
+    steps = []
+    total_weeks = 0
+    for index, option in ordered:
+        _, skill, current_level, _ = groups[index]
+        total_weeks += option.weeks
+        previous = scores
+        raw_scores = [score + gain for score, gain in zip(raw_scores, option.role_gains)]
+        scores = [_clamp_score(score) for score in raw_scores]
+        steps.append({
+            'skill': skill,
+            'from_level': LEVEL_NAMES[current_level],
+            'to_level': LEVEL_NAMES[option.level],
+            'weeks': option.weeks,
+            'cumulative_weeks': total_weeks,
+            'fit_score_gain': round(sum(map(sub, scores, previous)) / len(scores), 1),
+            'projected': [projection(role_name, score) for role_name, score in zip(target_roles, scores)]
+        })
+    
+    role_gains = list(map(sub, scores, current_scores))
+    return {
+        'roles': list(target_roles),
+        'budget_weeks': budget_weeks,
+        'total_weeks': total_weeks,
+        'expected_gain': round(sum(role_gains) / len(role_gains), 1),
+        'role_gains': [
+            {'role': role_name, 'fit_score_gain': round(gain, 1)}
+            for role_name, gain in zip(target_roles, role_gains)
+        ],
+        'upper_bound_gain': round(upper_bound, 1),
+        'solver': solver,
+        'candidates': len(groups),
+        'current': current,
+        'steps': steps
+    }
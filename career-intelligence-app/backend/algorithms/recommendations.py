@@ -3,170 +3,289 @@ Recommendations Engine
 Generates personalized learning paths and career advice
 """
 
-def generate_recommendations(target_role, user_skills, skill_gaps, experience, job_roles, skills_database):
+from collections import namedtuple
+from functools import lru_cache
+import json
+import os
+
+# Tips, timelines and learning times live in this data file; the
+# DataStore reloads it together with the other market data
+CONTENT_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                            'data', 'recommendation_content.json')
+
+# More gaps than this gets the "upskill first" job search advice
+MANY_GAPS = 3
+
+# Freshers with at most this many High priority gaps get the shorter timeline
+FEW_CRITICAL_GAPS = 2
+
+MAX_JOB_SEARCH_TIPS = 8
+
+# Level indexes assumed for levels missing from learning_time.levels
+DEFAULT_CURRENT_LEVEL_INDEX = 0
+DEFAULT_TARGET_LEVEL_INDEX = 2
+
+# Assembled recommendations kept per RecommendationIndex
+MEMO_SIZE = 4096
+
+# Recommendation fragments precompiled from the data files. Fragments are
+# shared between responses and must be treated as read-only.
+RecommendationIndex = namedtuple('RecommendationIndex', [
+    'job_search_tips',   # {(role, is_fresher, has_many_gaps): list of tips}
+    'default_tips',      # {(is_fresher, has_many_gaps): list of tips} for other roles
+    'resources',         # LazyFragments {(skill, priority): learning_resources entry}
+    'timelines',         # {'fresher_few_gaps' | 'fresher_many_gaps' | 'experienced': timeline}
+    'learning_times',    # {(current level, target level): estimate}, lowercased levels
+    'certifications',    # LazyFragments {role: list of certifications}
+    'memo'               # {(role, experience, gap signature, include_resources): recommendations}
+])
+
+
+class LazyFragments:
     """
-    Generate comprehensive recommendations for career improvement
+    Fragments built from the market data on first lookup, then memoized
+    (misses included)
+    
+    Building them all up front would decode every entry of a memory-mapped
+    snapshot (see snapshot_format.LazyJSONMapping) at load time.
+    """
+    
+    __slots__ = ('_build', '_built')
+    
+    def __init__(self, build):
+        self._build = build    # key -> fragment, or None if there is none
+        self._built = {}
+    
+    def get(self, key, default=None):
+        try:
+            value = self._built[key]
+        except KeyError:
+            value = self._built[key] = self._build(key)
+        return default if value is None else value
+
+
+# (job_roles, skills_database, index) for callers that pass no index
+_fallback = None
+
+
+@lru_cache(maxsize=1)
+def load_default_content():
+    """The bundled recommendation_content.json, for callers without a DataStore"""
+    with open(CONTENT_PATH, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def build_recommendation_index(job_roles, skills_database, content=None):
+    """
+    Precompile the static recommendation fragments
+    
+    Fragments drawn from single skills or roles (resource bundles,
+    certifications) are built on first lookup instead.
+    
+    Args:
+        content: Parsed recommendation_content.json (default: the bundled file)
     
     Returns:
-        Dict with categorized recommendations
+        RecommendationIndex
     """
-    recommendations = {
-        'immediate_priorities': [],
-        'learning_resources': [],
-        'timeline': {},
-        'job_search_tips': [],
-        'certifications': []
+    if content is None:
+        content = load_default_content()
+    
+    flags = [(is_fresher, has_many_gaps) for is_fresher in (True, False) for has_many_gaps in (True, False)]
+    roles = set(job_roles) | set(content['job_search_tips']['roles'])
+    
+    levels = [level.lower() for level in content['learning_time']['levels']]
+    
+    return RecommendationIndex(
+        job_search_tips={
+            (role, is_fresher, has_many_gaps): _job_search_tips(role, is_fresher, has_many_gaps, content)
+            for role in roles
+            for is_fresher, has_many_gaps in flags
+        },
+        default_tips={
+            (is_fresher, has_many_gaps): _job_search_tips(None, is_fresher, has_many_gaps, content)
+            for is_fresher, has_many_gaps in flags
+        },
+        resources=LazyFragments(lambda key: _resource_bundle(key[0], key[1], skills_database)),
+        timelines=content['timelines'],
+        learning_times={
+            (current, target): _learning_time(current, target, content)
+            for current in levels
+            for target in levels
+        },
+        certifications=LazyFragments(
+            lambda role: job_roles[role].get('certifications', []) if role in job_roles else None
+        ),
+        memo={}
+    )
+
+
+def _resource_bundle(skill, priority, skills_database):
+    """learning_resources entry of a gap, or None for skills without data"""
+    if priority not in ('High', 'Medium') or skill not in skills_database:
+        return None
+    skill_info = skills_database[skill]
+    return {
+        'skill': skill,
+        'priority': priority,
+        'resources': skill_info.get('resources', []),
+        'practice_tips': skill_info.get('practice_tips', '')
     }
+
+
+def generate_recommendations(target_role, user_skills, skill_gaps, experience, job_roles, skills_database,
+                             high_priority_gaps=None, recommendation_index=None, include_resources=True):
+    """
+    Generate comprehensive recommendations for career improvement
+    
+    Responses are assembled from the precompiled fragments of
+    recommendation_index and memoized per (role, experience, gap
+    signature), so identical gap sets share one result.
+    
+    include_resources=False leaves out learning_resources, the largest
+    section, for responses that have to be fast (see latency_budget_ms).
+    
+    high_priority_gaps can be passed in when the caller already has the
+    High priority subset of skill_gaps (e.g. from scoring.analyze_fit).
+    
+    Args:
+        skill_gaps: List of models.SkillGap, most important first
+        recommendation_index: Optional prebuilt build_recommendation_index()
+    
+    Returns:
+        Dict with categorized recommendations (shared - do not modify)
+    """
+    index = recommendation_index
+    if index is None:
+        index = _fallback_index(job_roles, skills_database)
+    
+    # Everything below depends only on the role, experience and the gaps
+    signature = (target_role, experience, tuple(
+        (gap.skill, gap.current_level, gap.required_level, gap.priority, gap.note)
+        for gap in skill_gaps
+    ), include_resources)
+    recommendations = index.memo.get(signature)
+    if recommendations is not None:
+        return recommendations
+    
+    if high_priority_gaps is None:
+        high_priority_gaps = [gap for gap in skill_gaps if gap.priority == 'High']
     
     # Immediate priorities (top 3 skill gaps)
-    high_priority_gaps = [gap for gap in skill_gaps if gap['priority'] == 'High'][:3]
-    
-    for gap in high_priority_gaps:
-        skill = gap['skill']
-        recommendations['immediate_priorities'].append({
-            'action': f"Master {skill}",
-            'reason': gap['note'],
-            'target': gap['required_level'],
-            'estimated_time': get_learning_time(gap['current_level'], gap['required_level'])
+    immediate_priorities = []
+    for gap in high_priority_gaps[:3]:
+        immediate_priorities.append({
+            'action': f"Master {gap.skill}",
+            'reason': gap.note,
+            'target': gap.required_level,
+            'estimated_time': _indexed_learning_time(index, gap.current_level, gap.required_level)
         })
     
-    # Learning resources for each skill gap
-    for gap in skill_gaps[:5]:  # Top 5 gaps
-        skill = gap['skill']
-        if skill in skills_database:
-            skill_info = skills_database[skill]
-            recommendations['learning_resources'].append({
-                'skill': skill,
-                'priority': gap['priority'],
-                'resources': skill_info.get('resources', []),
-                'practice_tips': skill_info.get('practice_tips', '')
-            })
-    
-    # Timeline estimation
-    recommendations['timeline'] = generate_timeline(skill_gaps, experience)
-    
-    # Job search tips based on profile
-    recommendations['job_search_tips'] = generate_job_search_tips(
-        target_role, 
-        experience, 
-        len(skill_gaps)
-    )
+    # Learning resources for each skill gap (top 5 gaps)
+    learning_resources = []
+    if include_resources:
+        for gap in skill_gaps[:5]:
+            bundle = index.resources.get((gap.skill, gap.priority))
+            if bundle is not None:
+                learning_resources.append(bundle)
     
-    # Relevant certifications
-    if target_role in job_roles:
-        role_certs = job_roles[target_role].get('certifications', [])
-        recommendations['certifications'] = role_certs
+    # Timeline and job search tips are whole precompiled fragments
+    timeline = index.timelines[_timeline_key(experience, len(high_priority_gaps))]
+    flags = (experience == 'fresher', len(skill_gaps) > MANY_GAPS)
+    job_search_tips = index.job_search_tips.get((target_role,) + flags)
+    if job_search_tips is None:
+        job_search_tips = index.default_tips[flags]
+    
+    recommendations = {
+        'immediate_priorities': immediate_priorities,
+        'learning_resources': learning_resources,
+        'timeline': timeline,
+        'job_search_tips': job_search_tips,
+        'certifications': index.certifications.get(target_role, [])
+    }
+    if not include_resources:
+        del recommendations['learning_resources']
     
+    if len(index.memo) >= MEMO_SIZE:
+        index.memo.clear()
+    index.memo[signature] = recommendations
     return recommendations
 
-def get_learning_time(current_level, target_level):
+
+def _fallback_index(job_roles, skills_database):
+    """Index over the bundled content, rebuilt only when the data objects change"""
+    global _fallback
+    if _fallback is None or _fallback[0] is not job_roles or _fallback[1] is not skills_database:
+        _fallback = (job_roles, skills_database, build_recommendation_index(job_roles, skills_database))
+    return _fallback[2]
+
+
+def _indexed_learning_time(index, current_level, target_level):
+    estimate = index.learning_times.get((current_level.lower(), target_level.lower()))
+    if estimate is None:
+        estimate = get_learning_time(current_level, target_level)
+    return estimate
+
+
+def get_learning_time(current_level, target_level, content=None):
     """
     Estimate learning time to reach target proficiency
     """
-    level_order = ['none', 'beginner', 'intermediate', 'advanced', 'expert']
+    if content is None:
+        content = load_default_content()
+    return _learning_time(current_level.lower(), target_level.lower(), content)
+
+
+def _learning_time(current_level, target_level, content):
+    level_order = [level.lower() for level in content['learning_time']['levels']]
     
-    current_idx = level_order.index(current_level.lower()) if current_level.lower() in level_order else 0
-    target_idx = level_order.index(target_level.lower()) if target_level.lower() in level_order else 2
+    current_idx = level_order.index(current_level) if current_level in level_order else DEFAULT_CURRENT_LEVEL_INDEX
+    target_idx = level_order.index(target_level) if target_level in level_order else DEFAULT_TARGET_LEVEL_INDEX
     
     gap = target_idx - current_idx
     
-    time_estimates = {
-        1: "2-4 weeks",
-        2: "6-8 weeks",
-        3: "3-4 months",
-        4: "6-8 months"
-    }
-    
-    return time_estimates.get(abs(gap), "4-8 weeks")
+    return content['learning_time']['estimates'].get(str(abs(gap)), content['learning_time']['default'])
+
+
+def _timeline_key(experience, num_critical_gaps):
+    if experience != 'fresher':
+        return 'experienced'
+    return 'fresher_few_gaps' if num_critical_gaps <= FEW_CRITICAL_GAPS else 'fresher_many_gaps'
 
-def generate_timeline(skill_gaps, experience):
+
+def generate_timeline(skill_gaps, experience, num_critical_gaps=None, content=None):
     """
     Generate realistic timeline for improvement
     """
-    num_critical_gaps = len([g for g in skill_gaps if g['priority'] == 'High'])
-    
-    if experience == 'fresher':
-        if num_critical_gaps <= 2:
-            return {
-                'ready_for_jobs': '3-4 months',
-                'competitive_profile': '6-8 months',
-                'milestones': [
-                    {'month': 1, 'goal': 'Complete foundational learning in top priority skills'},
-                    {'month': 2, 'goal': 'Build 1-2 portfolio projects'},
-                    {'month': 3, 'goal': 'Start applying to internships and entry-level roles'},
-                    {'month': 6, 'goal': 'Achieve competitive skill level, actively interview'}
-                ]
-            }
-        else:
-            return {
-                'ready_for_jobs': '6-8 months',
-                'competitive_profile': '10-12 months',
-                'milestones': [
-                    {'month': 1, 'goal': 'Focus on SQL and primary tool (Power BI/Tableau)'},
-                    {'month': 3, 'goal': 'Complete 2 substantial projects'},
-                    {'month': 6, 'goal': 'Start applying, continue upskilling secondary skills'},
-                    {'month': 10, 'goal': 'Strong portfolio, competitive for most positions'}
-                ]
-            }
-    else:
-        return {
-            'ready_for_jobs': '1-2 months',
-            'competitive_profile': '3-4 months',
-            'milestones': [
-                {'month': 1, 'goal': 'Address critical skill gaps'},
-                {'month': 2, 'goal': 'Update resume and portfolio with new skills'},
-                {'month': 3, 'goal': 'Actively apply and interview'}
-            ]
-        }
-
-def generate_job_search_tips(target_role, experience, num_gaps):
+    if content is None:
+        content = load_default_content()
+    if num_critical_gaps is None:
+        num_critical_gaps = len([g for g in skill_gaps if g.priority == 'High'])
+    
+    return content['timelines'][_timeline_key(experience, num_critical_gaps)]
+
+
+def generate_job_search_tips(target_role, experience, num_gaps, content=None):
     """
     Generate role and profile-specific job search advice
     """
+    if content is None:
+        content = load_default_content()
+    return _job_search_tips(target_role, experience == 'fresher', num_gaps > MANY_GAPS, content)
+
+
+def _job_search_tips(target_role, is_fresher, has_many_gaps, content):
+    tips_content = content['job_search_tips']
     tips = []
     
     # Role-specific tips
-    role_tips = {
-        'Data Analyst': [
-            "Highlight Excel and SQL prominently in your resume",
-            "Create a GitHub portfolio with 2-3 data analysis projects",
-            "Target companies: Analytics services, startups, BFSI sector",
-            "Job titles to search: Junior Data Analyst, MIS Executive, Business Analyst"
-        ],
-        'Software Engineer': [
-            "Focus on DSA (Data Structures & Algorithms) practice",
-            "Build 3-5 full-stack projects showcasing different technologies",
-            "Target: Product companies, startups, service-based companies",
-            "Practice on LeetCode, HackerRank for interview prep"
-        ],
-        'Product Manager': [
-            "Create case studies of product analysis and strategy",
-            "Network extensively on LinkedIn with PMs",
-            "Target: Startups, tech companies, e-commerce platforms",
-            "Demonstrate analytical and communication skills in applications"
-        ]
-    }
-    
-    tips.extend(role_tips.get(target_role, [
-        "Research companies hiring for this role in India",
-        "Tailor your resume to highlight relevant skills",
-        "Network with professionals in this field"
-    ]))
+    tips.extend(tips_content['roles'].get(target_role, tips_content['default']))
     
     # Experience-based tips
-    if experience == 'fresher':
-        tips.extend([
-            "Consider internships (3-6 months) as entry points",
-            "Use Internshala, AngelList for startup opportunities",
-            "Attend virtual career fairs and webinars",
-            "Join relevant LinkedIn groups and engage with content"
-        ])
+    if is_fresher:
+        tips.extend(tips_content['fresher'])
     
     # Gap-based advice
-    if num_gaps > 3:
-        tips.append("Focus on upskilling before mass applying - quality over quantity")
-        tips.append("Consider freelance projects on Upwork/Fiverr to gain practical experience")
-    else:
-        tips.append("Your profile is competitive - start applying actively")
+    tips.extend(tips_content['many_gaps'] if has_many_gaps else tips_content['few_gaps'])
     
-    return tips[:8]  # Return top 8 tips
+    return tips[:MAX_JOB_SEARCH_TIPS]
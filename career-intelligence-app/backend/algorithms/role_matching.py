@@ -0,0 +1,163 @@
+"""
+Role Matching
+Finds the roles a skill set is closest to, via an inverted skill -> role index
+
+Ranking uses the calculate_job_fit formula. Partial scores are only
+accumulated for roles sharing at least one skill with the user, and new
+roles stop being admitted once the remaining skills cannot lift an unseen
+role into the top K.
+"""
+
+from collections import namedtuple
+import heapq
+import math
+from types import MappingProxyType
+
+from algorithms.scoring import EDUCATION_BONUS, EXPERIENCE_BONUS
+
+# Slack allowed between the accumulated and the exactly recomputed score,
+# which differ only by floating point summation order
+SCORE_EPSILON = 1e-9
+
+# Posting for one (skill, role) pair
+Posting = namedtuple('Posting', [
+    'row',                # role number in InvertedIndex.roles
+    'importance',         # 0-1 scale
+    'min_level_weight',   # proficiency weight of the role's min_level
+    'weight'              # importance * 100 / role total weight: score per unit proficiency
+])
+
+InvertedIndex = namedtuple('InvertedIndex', [
+    'roles',              # role names, by row
+    'postings',           # {skill ID: (Posting, ...)}
+    'max_weight'          # {skill ID: highest Posting.weight} - per-skill score bound
+])
+
+
+def build_inverted_index(role_index):
+    """
+    Build the skill -> role postings from a scoring.build_role_index() index
+    
+    Returns:
+        InvertedIndex
+    """
+    roles = tuple(role_index.keys())
+    postings = {}
+    for row, role_name in enumerate(roles):
+        role = role_index[role_name]
+        if role.total_weight <= 0:
+            continue
+        for position, skill_id in enumerate(role.keys):
+            importance = role.importance[position]
+            postings.setdefault(skill_id, []).append(Posting(
+                row=row,
+                importance=importance,
+                min_level_weight=role.min_level_weights[position],
+                weight=importance * 100 / role.total_weight
+            ))
+    
+    return InvertedIndex(
+        roles=roles,
+        postings=MappingProxyType({skill_id: tuple(plist) for skill_id, plist in postings.items()}),
+        max_weight=MappingProxyType({
+            skill_id: max(posting.weight for posting in plist)
+            for skill_id, plist in postings.items()
+        })
+    )
+
+
+def _exact_fit(role, profile, experience_bonus, education_bonus):
+    """
+    Fit score with exactly the arithmetic of scoring.analyze_fit
+    
+    Returns:
+        (fit_score, matched skill names, names of matched skills below min_level)
+    """
+    contributions = []
+    matched = []
+    below_level = []
+    for position, skill_id in enumerate(role.keys):
+        level = profile.get(skill_id)
+        if level is None:
+            continue
+        proficiency_weight = level.weight
+        contributions.append(proficiency_weight * role.importance[position] * 100)
+        matched.append(role.skills[position])
+        if proficiency_weight < role.min_level_weights[position]:
+            below_level.append(role.skills[position])
+    
+    skill_score = math.fsum(contributions)
+    base_score = skill_score / role.total_weight if role.total_weight > 0 else 0
+    final_score = min(base_score + experience_bonus + education_bonus, 100)
+    return max(final_score, 0), matched, below_level
+
+
+def match_roles(profile, inverted_index, role_index, experience='fresher', education='bachelors',
+                top_k=5):
+    """
+    Top-K roles for a normalized profile, ranked by job fit
+    
+    Args:
+        profile: Output of scoring.normalize_profile()
+        inverted_index: Index from build_inverted_index()
+        role_index: The scoring.build_role_index() index it was built from
+        top_k: Number of roles to return
+    
+    Returns:
+        List of dicts with role, fit_score, matched_skills and
+        skills_below_level, best first. Only roles sharing at least one
+        skill with the profile are considered.
+    """
+    if top_k <= 0:
+        return []
+    
+    # Query terms, strongest possible contribution first
+    terms = []
+    for skill_id, level in profile.items():
+        proficiency_weight = level.weight
+        max_weight = inverted_index.max_weight.get(skill_id)
+        if max_weight is not None and proficiency_weight > 0:
+            terms.append((proficiency_weight * max_weight, skill_id, proficiency_weight))
+    terms.sort(key=lambda term: term[0], reverse=True)
+    remaining = sum(term[0] for term in terms)
+    
+    # Term-at-a-time accumulation of base scores
+    scores = {}
+    admitting = True
+    for bound, skill_id, proficiency_weight in terms:
+        if admitting and len(scores) >= top_k:
+            # An unseen role can at most collect the remaining bounds
+            threshold = heapq.nlargest(top_k, scores.values())[-1]
+            admitting = remaining >= threshold - SCORE_EPSILON
+        for posting in inverted_index.postings[skill_id]:
+            score = scores.get(posting.row)
+            if score is not None:
+                scores[posting.row] = score + proficiency_weight * posting.weight
+            elif admitting:
+                scores[posting.row] = proficiency_weight * posting.weight
+        remaining -= bound
+    
+    if not scores:
+        return []
+    
+    # Recompute the leading candidates exactly and rank them
+    cutoff = heapq.nlargest(top_k, scores.values())[-1] - SCORE_EPSILON
+    experience_bonus = EXPERIENCE_BONUS.get(experience, 0)
+    education_bonus = EDUCATION_BONUS.get(education.lower(), 0)
+    
+    ranked = []
+    for row, score in scores.items():
+        if score < cutoff:
+            continue
+        role_name = inverted_index.roles[row]
+        fit_score, matched, below_level = _exact_fit(
+            role_index[role_name], profile, experience_bonus, education_bonus
+        )
+        ranked.append((-fit_score, row, {
+            'role': role_name,
+            'fit_score': fit_score,
+            'matched_skills': matched,
+            'skills_below_level': below_level
+        }))
+    
+    return [entry for _, _, entry in heapq.nsmallest(top_k, ranked)]
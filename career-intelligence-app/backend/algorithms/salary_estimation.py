@@ -3,7 +3,197 @@ Salary Estimation Algorithm
 Estimates salary range based on role, location, experience, and skills
 """
 
-def estimate_salary(target_role, location, experience, fit_score, salary_data):
+from collections import namedtuple
+import re
+from types import MappingProxyType
+
+EXPERIENCE_LEVELS = ('fresher', '1-2', '3-5', '5+')
+LOCATIONS = ('tier1', 'tier2', 'tier3', 'remote')
+
+# Fallback model, used for roles (or cells) without a market band
+EXPERIENCE_MULTIPLIERS = MappingProxyType({
+    'fresher': 1.0,
+    '1-2': 1.4,
+    '3-5': 2.0,
+    '5+': 2.8
+})
+LOCATION_MULTIPLIERS = MappingProxyType({
+    'tier1': 1.0,
+    'tier2': 0.75,
+    'tier3': 0.60,
+    'remote': 0.70
+})
+DEFAULT_BASE_SALARY = 350000
+
+# Unknown experience levels and locations are priced like these
+DEFAULT_EXPERIENCE = 'fresher'
+DEFAULT_LOCATION = 'remote'
+
+# Fallback model: up to 30% skill bonus for high fit scores
+MAX_SKILL_BONUS = 0.30
+
+# Estimates are shown as a ±12% range
+RANGE_SPREAD = 0.12
+
+LAKH = 100000
+
+# "3.0-4.5 LPA" bands in salary_data.json by_experience
+BAND_PATTERN = re.compile(r'^\s*(\d+(?:\.\d+)?)\s*-\s*(\d+(?:\.\d+)?)\s*LPA\s*$', re.IGNORECASE)
+
+# Precomputed pricing of one (role, experience, location) combination.
+# The estimate for a fit score is low * (1 + spread * fit_score / 100), so a
+# fit of 0 sits at the bottom of the band and a fit of 100 at the top.
+SalaryCell = namedtuple('SalaryCell', [
+    'low',         # INR at fit score 0
+    'spread',      # relative width of the band: high / low - 1
+    'band',        # market band as shown to users, e.g. "3.0-4.5 LPA", or None
+    'factors'      # read-only dict of formatted factors, without skill_bonus
+])
+
+
+def format_inr(amount):
+    """Format amount in Indian numbering system"""
+    amount = int(amount)
+    if amount >= 10000000:  # 1 Crore+
+        crores = amount / 10000000
+        return f"₹{crores:.2f} Cr"
+    elif amount >= 100000:  # 1 Lakh+
+        lakhs = amount / 100000
+        return f"₹{lakhs:.2f} L"
+    else:
+        thousands = amount / 1000
+        return f"₹{thousands:.0f}K"
+
+
+def parse_band(text):
+    """
+    Parse a "3.0-4.5 LPA" band
+    
+    Returns:
+        (low, high) in INR, or None if text is not a valid band
+    """
+    match = BAND_PATTERN.match(text) if isinstance(text, str) else None
+    if match is None:
+        return None
+    low, high = float(match.group(1)) * LAKH, float(match.group(2)) * LAKH
+    if not 0 < low <= high:
+        return None
+    return low, high
+
+
+def _market_band(role_salary_data, experience, location):
+    """
+    The (low, high) band for a cell, or None
+    
+    Remote roles have no band of their own; they are priced off the tier1
+    band with the remote location multiplier.
+    """
+    by_experience = role_salary_data.get('by_experience')
+    if not isinstance(by_experience, dict) or not isinstance(by_experience.get(experience), dict):
+        return None
+    bands = by_experience[experience]
+    if location in bands:
+        return parse_band(bands[location])
+    if location == 'remote' and 'tier1' in bands:
+        band = parse_band(bands['tier1'])
+        if band is not None:
+            ratio = LOCATION_MULTIPLIERS['remote'] / LOCATION_MULTIPLIERS['tier1']
+            return band[0] * ratio, band[1] * ratio
+    return None
+
+
+def build_salary_cell(target_role, experience, location, salary_data):
+    """
+    Price one (role, experience, location) combination
+    
+    Uses the role's by_experience market band when salary_data has a valid
+    one, otherwise base_salary with the experience and location multipliers.
+    
+    Args:
+        experience: One of EXPERIENCE_LEVELS
+        location: One of LOCATIONS (lowercase)
+    
+    Returns:
+        SalaryCell
+    """
+    role_salary_data = salary_data[target_role] if target_role in salary_data else {}
+    base_salary = role_salary_data.get('base_salary', DEFAULT_BASE_SALARY)
+    
+    band = _market_band(role_salary_data, experience, location)
+    if band is None:
+        exp_multiplier = EXPERIENCE_MULTIPLIERS[experience]
+        loc_multiplier = LOCATION_MULTIPLIERS[location]
+        return SalaryCell(
+            low=base_salary * exp_multiplier * loc_multiplier,
+            spread=MAX_SKILL_BONUS,
+            band=None,
+            factors=MappingProxyType({
+                'base_role_salary': f"₹{int(base_salary):,}",
+                'experience_multiplier': f"{exp_multiplier}x",
+                'location_adjustment': f"{loc_multiplier}x"
+            })
+        )
+    
+    # Effective multipliers, from band midpoints, for the factors breakdown
+    low, high = band
+    entry_band = _market_band(role_salary_data, DEFAULT_EXPERIENCE, 'tier1')
+    tier1_band = _market_band(role_salary_data, experience, 'tier1')
+    exp_multiplier = round(sum(tier1_band) / sum(entry_band), 2) if entry_band and tier1_band else 1.0
+    loc_multiplier = round((low + high) / sum(tier1_band), 2) if tier1_band else 1.0
+    
+    band_label = f"{low / LAKH:.1f}-{high / LAKH:.1f} LPA"
+    return SalaryCell(
+        low=low,
+        spread=high / low - 1,
+        band=band_label,
+        factors=MappingProxyType({
+            'base_role_salary': f"₹{int(base_salary):,}",
+            'experience_multiplier': f"{exp_multiplier}x",
+            'location_adjustment': f"{loc_multiplier}x",
+            'market_band': band_label
+        })
+    )
+
+
+def build_salary_table(salary_data):
+    """
+    Precompute the SalaryCell of every role x experience x location
+    
+    Returns:
+        Read-only dict of {(role, experience, location): SalaryCell}
+    """
+    return MappingProxyType({
+        (role, experience, location): build_salary_cell(role, experience, location, salary_data)
+        for role in salary_data
+        for experience in EXPERIENCE_LEVELS
+        for location in LOCATIONS
+    })
+
+
+def _lookup_cell(target_role, experience, location, salary_data, salary_table):
+    if experience not in EXPERIENCE_MULTIPLIERS:
+        experience = DEFAULT_EXPERIENCE
+    location = location.lower()
+    if location not in LOCATION_MULTIPLIERS:
+        location = DEFAULT_LOCATION
+    
+    cell = salary_table.get((target_role, experience, location)) if salary_table is not None else None
+    if cell is None:
+        cell = build_salary_cell(target_role, experience, location, salary_data)
+    return cell
+
+
+def _salary_range(cell, fit_score):
+    """(min, max, skill_bonus) for a fit score, min/max rounded to the nearest 10,000"""
+    skill_bonus = (fit_score / 100) * cell.spread
+    estimated_salary = cell.low * (1 + skill_bonus)
+    
+    min_salary = round(estimated_salary * (1 - RANGE_SPREAD) / 10000) * 10000
+    max_salary = round(estimated_salary * (1 + RANGE_SPREAD) / 10000) * 10000
+    return min_salary, max_salary, skill_bonus
+
+
+def estimate_salary(target_role, location, experience, fit_score, salary_data, salary_table=None):
     """
     Estimate salary range in INR
     
@@ -13,81 +203,53 @@ def estimate_salary(target_role, location, experience, fit_score, salary_data):
         experience: fresher, 1-2, 3-5, 5+
         fit_score: Job fit score (0-100)
         salary_data: Salary database
+        salary_table: Optional precomputed build_salary_table(salary_data)
     
     Returns:
         Dict with salary range information
     """
-    # Get base salary for the role
-    if target_role not in salary_data:
-        # Default fallback
-        base_salary = 350000
-    else:
-        role_salary_data = salary_data[target_role]
-        base_salary = role_salary_data.get('base_salary', 350000)
-    
-    # Experience multiplier
-    experience_multipliers = {
-        'fresher': 1.0,
-        '1-2': 1.4,
-        '3-5': 2.0,
-        '5+': 2.8
-    }
-    exp_multiplier = experience_multipliers.get(experience, 1.0)
-    
-    # Location adjustment
-    location_multipliers = {
-        'tier1': 1.0,
-        'tier2': 0.75,
-        'tier3': 0.60,
-        'remote': 0.70
-    }
-    loc_multiplier = location_multipliers.get(location.lower(), 0.70)
-    
-    # Skill fit bonus (up to 30% bonus for high fit scores)
-    skill_bonus = (fit_score / 100) * 0.30
-    
-    # Calculate estimated salary
-    estimated_salary = base_salary * exp_multiplier * loc_multiplier * (1 + skill_bonus)
-    
-    # Create range (±12%)
-    min_salary = estimated_salary * 0.88
-    max_salary = estimated_salary * 1.12
-    
-    # Round to nearest 10,000
-    min_salary = round(min_salary / 10000) * 10000
-    max_salary = round(max_salary / 10000) * 10000
-    
-    # Format for Indian numbering system
-    def format_inr(amount):
-        """Format amount in Indian numbering system"""
-        amount = int(amount)
-        if amount >= 10000000:  # 1 Crore+
-            crores = amount / 10000000
-            return f"₹{crores:.2f} Cr"
-        elif amount >= 100000:  # 1 Lakh+
-            lakhs = amount / 100000
-            return f"₹{lakhs:.2f} L"
-        else:
-            thousands = amount / 1000
-            return f"₹{thousands:.0f}K"
-    
-    # Prepare result
-    result = {
+    cell = _lookup_cell(target_role, experience, location, salary_data, salary_table)
+    min_salary, max_salary, skill_bonus = _salary_range(cell, fit_score)
+    
+    factors = dict(cell.factors)
+    factors['skill_bonus'] = f"+{int(skill_bonus * 100)}%"
+    
+    return {
         'min': int(min_salary),
         'max': int(max_salary),
         'formatted_range': f"{format_inr(min_salary)} - {format_inr(max_salary)}",
         'annual_range': f"₹{int(min_salary):,} - ₹{int(max_salary):,} per annum",
         'monthly_range': f"₹{int(min_salary/12):,} - ₹{int(max_salary/12):,} per month",
-        'factors': {
-            'base_role_salary': f"₹{int(base_salary):,}",
-            'experience_multiplier': f"{exp_multiplier}x",
-            'location_adjustment': f"{loc_multiplier}x",
-            'skill_bonus': f"+{int(skill_bonus * 100)}%"
-        },
+        'factors': factors,
         'note': get_salary_note(experience, fit_score, location)
     }
+
+
+def salary_projection(target_role, fit_scores, salary_data, salary_table=None,
+                      experience_levels=EXPERIENCE_LEVELS, locations=LOCATIONS):
+    """
+    Salary ranges for every experience level in every location
+    
+    Args:
+        fit_scores: Fit score per entry of experience_levels (the experience
+                    bonus makes the fit score depend on the level)
     
-    return result
+    Returns:
+        {location: {'min': [...], 'max': [...], 'formatted_range': [...]}}
+        with one list entry per experience level, in order
+    """
+    projection = {}
+    for location in locations:
+        mins, maxes, formatted = [], [], []
+        for experience, fit_score in zip(experience_levels, fit_scores):
+            cell = _lookup_cell(target_role, experience, location, salary_data, salary_table)
+            min_salary, max_salary, _ = _salary_range(cell, fit_score)
+            mins.append(int(min_salary))
+            maxes.append(int(max_salary))
+            formatted.append(f"{format_inr(min_salary)} - {format_inr(max_salary)}")
+        projection[location] = {'min': mins, 'max': maxes, 'formatted_range': formatted}
+    return projection
+
 
 def get_salary_note(experience, fit_score, location):
     """
@@ -3,170 +3,606 @@ Job Fit Scoring Algorithm
 Calculates how well a candidate matches a job role
 """
 
+from bisect import bisect_left
+from collections import namedtuple
+import math
+import sys
+from types import MappingProxyType
+
+from algorithms.models import PROFICIENCY_WEIGHTS, Profile, SkillGap, Strength, level_of
+
+# Precomputed, read-only view of one role's required skills - the role's
+# requirements as parallel arrays, plus every response string that does
+# not depend on the user. All tuples are aligned with the skill order of
+# job_roles.json. Build with make_role_index().
+RoleIndex = namedtuple('RoleIndex', [
+    'skills',             # original skill names
+    'keys',               # lowercased skill names (interned skill IDs)
+    'positions',          # {lowercased skill name: position}
+    'importance',         # importance per skill (0-1 scale)
+    'min_levels',         # min_level per skill (defaults to 'intermediate')
+    'min_level_weights',  # proficiency weight of each min_level
+    'notes',              # note per skill, or None
+    'total_weight',       # sum of importance
+    'required_labels',    # capitalized min_level per skill
+    'priorities',         # gap priority per skill: 'High' or 'Medium'
+    'importance_labels',  # strength importance per skill: 'Critical' or 'Important'
+    'strength_notes',     # note of a strength, per skill
+    'improve_notes',      # note of a below-level gap, per skill
+    'missing_gaps'        # per skill: the shared SkillGap when it is missing, or
+                          # None if a missing skill is not flagged
+])
+
+# Output of the fused single-pass analysis (see analyze_fit)
+AnalysisResult = namedtuple('AnalysisResult', [
+    'fit_score',
+    'strengths',
+    'skill_gaps',
+    'high_priority_gaps'
+])
+
+# Fixed-point scale at which every finite float, and any sum of them, is an
+# exact integer. Dividing an exact sum by it rounds correctly, which is what
+# math.fsum does - so incremental and full sums agree bit for bit.
+EXACT_SCALE = 1 << 1074
+
+# Sparse encoding of every role, for batch scoring: postings from each
+# required skill to the rows of the roles requiring it, as in
+# role_matching. Rows are aligned with `roles`.
+RoleMatrix = namedtuple('RoleMatrix', [
+    'roles',              # role names, one per row
+    'postings',           # {skill ID: ((row, importance), ...)}
+    'total_weights',      # per row: sum of importance
+    'gap_candidates'      # per row: (skill ID, min_level_weight, shared skill gap dict)
+                          # for skills important enough to be flagged as gaps
+])
+
+EXPERIENCE_BONUS = MappingProxyType({
+    'fresher': 0,
+    '1-2': 5,
+    '3-5': 10,
+    '5+': 15
+})
+
+EDUCATION_BONUS = MappingProxyType({
+    'phd': 10,
+    'masters': 5,
+    'bachelors': 0,
+    'diploma': -5
+})
+
+
 def get_proficiency_weight(proficiency_level):
     """
     Convert proficiency level to numerical weight
     """
-    weights = {
-        'expert': 1.0,
-        'advanced': 0.75,
-        'intermediate': 0.5,
-        'beginner': 0.25
-    }
-    return weights.get(proficiency_level.lower(), 0.25)
+    return level_of(proficiency_level).weight
 
-def calculate_job_fit(target_role, user_skills, experience, education, job_roles):
+
+def make_role_index(skills, importance, min_levels, min_level_weights, notes, total_weight):
     """
-    Calculate job fit score (0-100)
+    RoleIndex of one role from its per-skill arrays
     
     Args:
-        target_role: Job role the user is targeting
+        skills: Skill names, without duplicates (ignoring case)
+        importance, min_level_weights: Any float sequences, e.g. memoryviews
+    """
+    keys = tuple(sys.intern(skill.lower()) for skill in skills)
+    priorities = tuple('High' if value > 0.8 else 'Medium' for value in importance)
+    required_labels = tuple(level.capitalize() for level in min_levels)
+    missing_notes = tuple(note if note is not None else f'{skill} is essential for this role'
+                          for skill, note in zip(skills, notes))
+    return RoleIndex(
+        skills=tuple(skills),
+        keys=keys,
+        positions=MappingProxyType({key: position for position, key in enumerate(keys)}),
+        importance=importance,
+        min_levels=tuple(min_levels),
+        min_level_weights=min_level_weights,
+        notes=tuple(notes),
+        total_weight=total_weight,
+        required_labels=required_labels,
+        priorities=priorities,
+        importance_labels=tuple('Critical' if value > 0.8 else 'Important' for value in importance),
+        strength_notes=tuple(note if note is not None else f'Strong {skill} skills are valuable for this role'
+                             for skill, note in zip(skills, notes)),
+        improve_notes=tuple(f'Need to improve {skill} to {min_level} level'
+                            for skill, min_level in zip(skills, min_levels)),
+        missing_gaps=tuple(
+            SkillGap(skill, 'None', required_labels[position], priorities[position], missing_notes[position])
+            if importance[position] >= 0.6 else None
+            for position, skill in enumerate(skills)
+        )
+    )
+
+
+def build_role_index(job_roles):
+    """
+    Precompute the scoring index for every role
+
+    Built once when the job roles database is loaded, so that scoring
+    never has to rescan or re-lowercase the role's skill names.
+
+    Returns:
+        Read-only mapping of {role: RoleIndex}
+    """
+    index = {}
+    for role, role_data in job_roles.items():
+        skills = []
+        seen = set()
+        importance = []
+        min_levels = []
+        notes = []
+        for skill, requirements in role_data['required_skills'].items():
+            skill_lower = skill.lower()
+            if skill_lower in seen:
+                # Keep the first definition, as the original linear scans did
+                continue
+            seen.add(skill_lower)
+            skills.append(skill)
+            importance.append(requirements['importance'])
+            min_levels.append(requirements.get('min_level', 'intermediate'))
+            notes.append(requirements.get('note'))
+
+        index[role] = make_role_index(
+            skills,
+            tuple(importance),
+            min_levels,
+            tuple(get_proficiency_weight(level) for level in min_levels),
+            notes,
+            sum(importance)
+        )
+    return MappingProxyType(index)
+
+
+def normalize_profile(user_skills, resolver=None):
+    """
+    Normalize a user's skills once per request
+
+    Args:
         user_skills: Dict of {skill_name: proficiency_level}
-        experience: Experience level (fresher, 1-2, 3-5, 5+)
-        education: Education level
-        job_roles: Job roles database
+        resolver: Optional skill_matching.SkillResolver mapping free-text
+                  names (aliases, typos) to canonical skill IDs; without it
+                  skills are matched by lowercased name only
+
+    Returns:
+        Profile of {skill ID: Level}. When several names resolve to the
+        same skill, the highest proficiency is kept.
+    """
+    levels = {}
+    for skill, level in user_skills.items():
+        if resolver is not None:
+            skill_id = resolver.resolve(skill).skill_id
+        else:
+            skill_id = skill.lower()
+        level = level_of(level)
+        current = levels.get(skill_id)
+        if current is None or level.weight > current.weight:
+            levels[skill_id] = level
+    return Profile(levels)
+
+
+def build_role_matrix(role_index):
+    """
+    Encode every role sparsely, by the skills it requires
+    
+    Args:
+        role_index: Index from build_role_index()
     
     Returns:
-        Float score between 0-100
+        RoleMatrix
     """
-    if target_role not in job_roles:
-        return 0.0
+    roles = tuple(role_index.keys())
+    postings = {}
+    gap_rows = []
+    for row, role_name in enumerate(roles):
+        role = role_index[role_name]
+        gaps = []
+        for position, skill_id in enumerate(role.keys):
+            postings.setdefault(skill_id, []).append((row, role.importance[position]))
+            if role.importance[position] >= 0.6:
+                gaps.append((skill_id, role.min_level_weights[position], {
+                    'skill': role.skills[position],
+                    'required_level': role.required_labels[position],
+                    'priority': role.priorities[position]
+                }))
+        # High priority gaps first, as in analyze_fit
+        gaps.sort(key=lambda gap: 0 if gap[2]['priority'] == 'High' else 1)
+        gap_rows.append(tuple(gaps))
     
-    role_requirements = job_roles[target_role]['required_skills']
+    return RoleMatrix(
+        roles=roles,
+        postings=MappingProxyType({skill_id: tuple(plist) for skill_id, plist in postings.items()}),
+        total_weights=tuple(role_index[name].total_weight for name in roles),
+        gap_candidates=tuple(gap_rows)
+    )
+
+
+def batch_job_fit(profiles, role_matrix, roles=None, resolver=None):
+    """
+    Score many profiles against many roles at once
+    
+    Only the postings of the profile's skills are visited, and each role's
+    contributions are summed with the arithmetic of analyze_fit (fsum is
+    independent of order), so scores match /api/analyze exactly.
+    
+    Args:
+        profiles: List of dicts with 'skills', 'experience' and 'education'
+                  (validated by the caller)
+        role_matrix: Matrix from build_role_matrix()
+        roles: Optional list of role names to restrict scoring to
+        resolver: Optional skill_matching.SkillResolver for the skill names
     
-    # Base score from skills matching
-    skill_score = 0
-    total_weight = 0
+    Returns:
+        One list per profile of dicts with role, fit_score and skill_gaps,
+        ranked by fit_score (highest first). The skill gap dicts are shared
+        between calls - do not modify them.
+    """
+    if roles is None:
+        rows = range(len(role_matrix.roles))
+    else:
+        row_of = {name: row for row, name in enumerate(role_matrix.roles)}
+        rows = [row_of[name] for name in roles]
     
-    for skill, requirements in role_requirements.items():
-        importance = requirements['importance']  # 0-1 scale
-        required_level = requirements.get('min_level', 'beginner')
+    results = []
+    for user_profile in profiles:
+        profile = normalize_profile(user_profile.get('skills', {}), resolver)
+        weights = {skill_id: level.weight for skill_id, level in profile.items()}
+        weight_of = weights.get
+        experience_bonus = EXPERIENCE_BONUS.get(user_profile.get('experience', 'fresher'), 0)
+        education_bonus = EDUCATION_BONUS.get(user_profile.get('education', 'bachelors').lower(), 0)
         
-        total_weight += importance
+        contributions = [[] for _ in role_matrix.roles]
+        for skill_id, proficiency_weight in weights.items():
+            for row, importance in role_matrix.postings.get(skill_id, ()):
+                contributions[row].append(proficiency_weight * importance * 100)
         
-        if skill.lower() in [s.lower() for s in user_skills.keys()]:
-            # Find the matching skill (case-insensitive)
-            user_skill = next(s for s in user_skills.keys() if s.lower() == skill.lower())
-            user_level = user_skills[user_skill]
+        rankings = []
+        for row in rows:
+            # The arithmetic of _final_score, with the bonuses looked up once
+            total_weight = role_matrix.total_weights[row]
+            base_score = math.fsum(contributions[row]) / total_weight if total_weight > 0 else 0
+            fit_score = max(min(base_score + experience_bonus + education_bonus, 100), 0)
             
-            # Get proficiency weight
-            proficiency_weight = get_proficiency_weight(user_level)
-            
-            # Calculate contribution to score
-            skill_score += (proficiency_weight * importance * 100)
+            # Gap mask: required skills below their minimum level
+            skill_gaps = [
+                gap for skill_id, min_weight, gap in role_matrix.gap_candidates[row]
+                if weight_of(skill_id, 0.0) < min_weight
+            ]
+            rankings.append({
+                'role': role_matrix.roles[row],
+                'fit_score': fit_score,
+                'skill_gaps': skill_gaps
+            })
+        
+        rankings.sort(key=lambda entry: entry['fit_score'], reverse=True)
+        results.append(rankings)
     
+    return results
+
+
+def _resolve_role(target_role, job_roles, role_index):
+    """
+    Get the RoleIndex for a role, building it on the fly when no index is given
+    """
+    if role_index is None:
+        if target_role not in job_roles:
+            return None
+        return build_role_index({target_role: job_roles[target_role]})[target_role]
+    return role_index.get(target_role)
+
+def _final_score(skill_score, total_weight, experience, education):
+    """Fit score from the summed skill contributions"""
     # Normalize skill score
     if total_weight > 0:
         base_score = skill_score / total_weight
     else:
         base_score = 0
     
-    # Adjust for experience
-    experience_bonus = {
-        'fresher': 0,
-        '1-2': 5,
-        '3-5': 10,
-        '5+': 15
-    }.get(experience, 0)
-    
-    # Adjust for education
-    education_bonus = {
-        'phd': 10,
-        'masters': 5,
-        'bachelors': 0,
-        'diploma': -5
-    }.get(education.lower(), 0)
+    # Adjust for experience and education
+    experience_bonus = EXPERIENCE_BONUS.get(experience, 0)
+    education_bonus = EDUCATION_BONUS.get(education.lower(), 0)
     
     # Calculate final score
     final_score = min(base_score + experience_bonus + education_bonus, 100)
-    final_score = max(final_score, 0)  # Ensure non-negative
+    return max(final_score, 0)  # Ensure non-negative
+
+def analyze_fit(target_role, user_skills, experience, education, job_roles,
+                role_index=None, profile=None, resolver=None):
+    """
+    Fused analysis: fit score, strengths and skill gaps in one pass
+    
+    Walks the role's required skills once, doing a single profile lookup
+    per skill, and derives every scoring output from that traversal.
+    
+    Args:
+        target_role: Job role the user is targeting
+        user_skills: Dict of {skill_name: proficiency_level}
+        experience: Experience level (fresher, 1-2, 3-5, 5+)
+        education: Education level
+        job_roles: Job roles database
+        role_index: Optional prebuilt index from build_role_index()
+        profile: Optional user_skills already passed through normalize_profile()
+        resolver: Optional SkillResolver used when profile is not given
+    
+    Returns:
+        AnalysisResult, or None if the role is unknown
+    """
+    role = _resolve_role(target_role, job_roles, role_index)
+    if role is None:
+        return None
+    if profile is None:
+        profile = normalize_profile(user_skills, resolver)
+    
+    contributions = []
+    critical_strengths = []
+    other_strengths = []
+    high_gaps = []
+    medium_gaps = []
+    
+    importance = role.importance
+    min_level_weights = role.min_level_weights
+    missing_gaps = role.missing_gaps
+    
+    for position, skill_id in enumerate(role.keys):
+        level = profile.get(skill_id)
+        
+        if level is None:
+            # Missing skill - only important ones have a (shared) gap
+            gap = missing_gaps[position]
+            if gap is not None:
+                (high_gaps if gap.priority == 'High' else medium_gaps).append(gap)
+            continue
+        
+        skill_importance = importance[position]
+        proficiency_weight = level.weight
+        
+        # Contribution to the fit score
+        contributions.append(proficiency_weight * skill_importance * 100)
+        
+        # Consider it a strength if proficiency >= 0.5 (intermediate+) 
+        # and importance >= 0.5
+        if proficiency_weight >= 0.5 and skill_importance >= 0.5:
+            strength = Strength(role.skills[position], level.label, role.importance_labels[position],
+                                role.strength_notes[position])
+            (critical_strengths if skill_importance > 0.8 else other_strengths).append(strength)
+        
+        # Proficiency below required level
+        if skill_importance >= 0.6 and proficiency_weight < min_level_weights[position]:
+            gap = SkillGap(role.skills[position], level.label, role.required_labels[position],
+                           role.priorities[position], role.improve_notes[position])
+            (high_gaps if skill_importance > 0.8 else medium_gaps).append(gap)
+    
+    # Correctly rounded sum, independent of summation order
+    skill_score = math.fsum(contributions)
+    
+    # Bucketing by priority during the walk keeps the original stable sort order
+    return AnalysisResult(
+        fit_score=_final_score(skill_score, role.total_weight, experience, education),
+        strengths=critical_strengths + other_strengths,
+        skill_gaps=high_gaps + medium_gaps,
+        high_priority_gaps=high_gaps
+    )
+
+def calculate_job_fit(target_role, user_skills, experience, education, job_roles,
+                      role_index=None, profile=None, resolver=None):
+    """
+    Calculate job fit score (0-100)
     
-    return final_score
+    Args:
+        target_role: Job role the user is targeting
+        user_skills: Dict of {skill_name: proficiency_level}
+        experience: Experience level (fresher, 1-2, 3-5, 5+)
+        education: Education level
+        job_roles: Job roles database
+        role_index: Optional prebuilt index from build_role_index()
+        profile: Optional user_skills already passed through normalize_profile()
+        resolver: Optional SkillResolver used when profile is not given
+    
+    Returns:
+        Float score between 0-100
+    """
+    result = analyze_fit(target_role, user_skills, experience, education, job_roles,
+                         role_index, profile, resolver)
+    return result.fit_score if result is not None else 0.0
 
-def analyze_strengths(target_role, user_skills, job_roles):
+def analyze_strengths(target_role, user_skills, job_roles, role_index=None, profile=None,
+                      resolver=None):
     """
     Identify user's key strengths for the role
     
     Returns:
-        List of dicts with skill strengths
+        List of Strength
     """
-    if target_role not in job_roles:
-        return []
+    result = analyze_fit(target_role, user_skills, 'fresher', 'bachelors', job_roles,
+                         role_index, profile, resolver)
+    return result.strengths if result is not None else []
+
+def identify_skill_gaps(target_role, user_skills, job_roles, role_index=None, profile=None,
+                        resolver=None):
+    """
+    Identify missing or weak skills
     
-    role_requirements = job_roles[target_role]['required_skills']
-    strengths = []
+    Returns:
+        List of SkillGap
+    """
+    result = analyze_fit(target_role, user_skills, 'fresher', 'bachelors', job_roles,
+                         role_index, profile, resolver)
+    return result.skill_gaps if result is not None else []
+
+
+def _exact(value):
+    numerator, denominator = value.as_integer_ratio()
+    return numerator * (EXACT_SCALE // denominator)
+
+
+def _assess_skill(role, position, level):
+    """
+    The per-skill step of analyze_fit, for one required skill
     
-    for skill, requirements in role_requirements.items():
-        if skill.lower() in [s.lower() for s in user_skills.keys()]:
-            user_skill = next(s for s in user_skills.keys() if s.lower() == skill.lower())
-            user_level = user_skills[user_skill]
-            proficiency_weight = get_proficiency_weight(user_level)
-            importance = requirements['importance']
-            
-            # Consider it a strength if proficiency >= 0.5 (intermediate+) 
-            # and importance >= 0.6
-            if proficiency_weight >= 0.5 and importance >= 0.5:
-                strengths.append({
-                    'skill': skill,
-                    'your_level': user_level.capitalize(),
-                    'importance': 'Critical' if importance > 0.8 else 'Important',
-                    'note': requirements.get('note', f'Strong {skill} skills are valuable for this role')
-                })
+    Args:
+        level: The user's Level of the skill, or None if missing
     
-    # Sort by importance
-    strengths.sort(key=lambda x: 1 if x['importance'] == 'Critical' else 0, reverse=True)
+    Returns:
+        (exact fit score contribution, Strength or None, SkillGap or None)
+    """
+    if level is None:
+        return 0, None, role.missing_gaps[position]
     
-    return strengths
+    importance = role.importance[position]
+    proficiency_weight = level.weight
+    strength = gap = None
+    if proficiency_weight >= 0.5 and importance >= 0.5:
+        strength = Strength(role.skills[position], level.label, role.importance_labels[position],
+                            role.strength_notes[position])
+    if importance >= 0.6 and proficiency_weight < role.min_level_weights[position]:
+        gap = SkillGap(role.skills[position], level.label, role.required_labels[position],
+                       role.priorities[position], role.improve_notes[position])
+    return _exact(proficiency_weight * importance * 100), strength, gap
+
+
+def _strength_key(role, position):
+    """Response order of a strength: critical skills first, then role order"""
+    return (0 if role.importance[position] > 0.8 else 1, position)
 
-def identify_skill_gaps(target_role, user_skills, job_roles):
+
+def _gap_key(role, position):
+    """Response order of a gap: high priority first, then role order"""
+    return (0 if role.priorities[position] == 'High' else 1, position)
+
+
+class FitState:
     """
-    Identify missing or weak skills
+    Incrementally updatable analysis of one profile against one role
+
+    Built by build_fit_state() and changed in place by update_fit_state(),
+    so a state must not be shared by concurrent updates. Per-position lists
+    are aligned with the role's RoleIndex.
+    """
+
+    __slots__ = ('target_role', 'role', 'profile', 'names', 'contributions', 'exact_score',
+                 'strengths', 'gaps')
+
+    def __init__(self, target_role, role, profile, names, contributions, strengths, gaps):
+        self.target_role = target_role
+        self.role = role                    # RoleIndex
+        self.profile = profile              # {skill ID: Level}
+        self.names = names                  # {skill ID: skill name as the user gave it}
+        self.contributions = contributions  # per position: exact fixed-point fit score contribution
+        self.exact_score = sum(contributions)
+        self.strengths = strengths          # {_strength_key(): Strength}
+        self.gaps = gaps                    # {_gap_key(): SkillGap}
+
+    def __repr__(self):
+        return f'FitState({self.target_role!r}, {len(self.profile)} skills)'
+
+
+def build_fit_state(target_role, user_skills, job_roles, role_index=None, resolver=None):
+    """
+    Analyze a profile into a FitState that update_fit_state() can revise
+    
+    Args:
+        user_skills: Dict of {skill_name: proficiency_level}
+        role_index: Optional prebuilt index from build_role_index()
+        resolver: Optional SkillResolver (see normalize_profile)
     
     Returns:
-        List of dicts with skill gaps
+        FitState, or None if the role is unknown
     """
-    if target_role not in job_roles:
-        return []
+    role = _resolve_role(target_role, job_roles, role_index)
+    if role is None:
+        return None
     
-    role_requirements = job_roles[target_role]['required_skills']
-    gaps = []
+    # normalize_profile, also remembering the name behind each skill ID
+    profile = {}
+    names = {}
+    for skill, level in user_skills.items():
+        skill_id = resolver.resolve(skill).skill_id if resolver is not None else skill.lower()
+        level = level_of(level)
+        current = profile.get(skill_id)
+        if current is None or level.weight > current.weight:
+            profile[skill_id] = level
+            names[skill_id] = skill
     
-    # Normalize user skills to lowercase for comparison
-    user_skills_lower = {k.lower(): v for k, v in user_skills.items()}
+    contributions = []
+    strengths = {}
+    gaps = {}
+    for position, skill_id in enumerate(role.keys):
+        contribution, strength, gap = _assess_skill(role, position, profile.get(skill_id))
+        contributions.append(contribution)
+        if strength is not None:
+            strengths[_strength_key(role, position)] = strength
+        if gap is not None:
+            gaps[_gap_key(role, position)] = gap
+    return FitState(target_role, role, profile, names, contributions, strengths, gaps)
+
+
+def update_fit_state(state, changes, resolver=None):
+    """
+    Apply skill changes to a FitState in place, touching only the changed
+    skills - the cost does not depend on the role or profile size
     
-    for skill, requirements in role_requirements.items():
-        importance = requirements['importance']
-        min_level = requirements.get('min_level', 'intermediate')
-        
-        skill_lower = skill.lower()
-        
-        # Check if skill is missing
-        if skill_lower not in user_skills_lower:
-            if importance >= 0.6:  # Only flag important skills
-                gaps.append({
-                    'skill': skill,
-                    'current_level': 'None',
-                    'required_level': min_level.capitalize(),
-                    'priority': 'High' if importance > 0.8 else 'Medium',
-                    'note': requirements.get('note', f'{skill} is essential for this role')
-                })
+    A change replaces every name the profile had for that skill, so the
+    result matches a full analysis of fit_state_skills() of the new state.
+    
+    Args:
+        changes: Dict of {skill_name: new proficiency_level, or None to remove}
+    
+    Returns:
+        state
+    """
+    role = state.role
+    profile = state.profile
+    names = state.names
+    contributions = state.contributions
+    
+    for skill, level in changes.items():
+        skill_id = resolver.resolve(skill).skill_id if resolver is not None else skill.lower()
+        if level is None:
+            profile.pop(skill_id, None)
+            names.pop(skill_id, None)
         else:
-            # Check if proficiency is below required
-            user_level = user_skills_lower[skill_lower]
-            user_weight = get_proficiency_weight(user_level)
-            required_weight = get_proficiency_weight(min_level)
-            
-            if user_weight < required_weight and importance >= 0.6:
-                gaps.append({
-                    'skill': skill,
-                    'current_level': user_level.capitalize(),
-                    'required_level': min_level.capitalize(),
-                    'priority': 'High' if importance > 0.8 else 'Medium',
-                    'note': f'Need to improve {skill} to {min_level} level'
-                })
-    
-    # Sort by priority
-    priority_order = {'High': 0, 'Medium': 1, 'Low': 2}
-    gaps.sort(key=lambda x: priority_order.get(x['priority'], 3))
-    
-    return gaps
+            profile[skill_id] = level_of(level)
+            names[skill_id] = skill
+        
+        position = role.positions.get(skill_id)
+        if position is not None:
+            contribution, strength, gap = _assess_skill(role, position, profile.get(skill_id))
+            if strength is None:
+                state.strengths.pop(_strength_key(role, position), None)
+            else:
+                state.strengths[_strength_key(role, position)] = strength
+            if gap is None:
+                state.gaps.pop(_gap_key(role, position), None)
+            else:
+                state.gaps[_gap_key(role, position)] = gap
+            state.exact_score += contribution - contributions[position]
+            contributions[position] = contribution
+    return state
+
+
+def fit_state_skills(state):
+    """The {skill_name: proficiency_level} dict a FitState represents"""
+    return {state.names[skill_id]: level.text for skill_id, level in state.profile.items()}
+
+
+def fit_state_result(state, experience, education):
+    """
+    AnalysisResult of a FitState - identical to analyze_fit() on the same
+    profile, in the same order
+    
+    Only the current strengths and gaps are sorted, so the cost depends on
+    the size of the result rather than on the number of role skills.
+    """
+    strengths = state.strengths
+    gaps = state.gaps
+    gap_order = sorted(gaps)
+    skill_gaps = [gaps[key] for key in gap_order]
+    return AnalysisResult(
+        fit_score=_final_score(state.exact_score / EXACT_SCALE, state.role.total_weight,
+                               experience, education),
+        strengths=[strengths[key] for key in sorted(strengths)],
+        skill_gaps=skill_gaps,
+        # Rank 1 keys sort after every rank 0 key
+        high_priority_gaps=skill_gaps[:bisect_left(gap_order, (1,))]
+    )
@@ -0,0 +1,215 @@
+"""
+Skill Name Matching
+Resolves free-text skill names to canonical skill IDs
+
+Canonical IDs are the lowercased skill names used by the role index.
+Resolution tries, in order:
+    1. exact match on the compacted name ('PowerBI' == 'Power BI')
+    2. the alias table ('postgres' -> SQL)
+    3. single typos, via a precomputed deletion-neighbourhood index
+    4. trigram similarity, via an inverted trigram index
+
+Fuzzy matches are only tried where one edit is a small share of the name:
+a one-character difference between short names ('Stata' / 'stats') or
+at either end of a name ('Jython' / 'Python', 'postgre' / 'postgres')
+usually means a different word, and would add credit for a skill the
+user does not have.
+"""
+
+from collections import namedtuple
+from math import ceil
+import re
+
+# Dice coefficient over character trigrams needed to accept a similarity match
+FUZZY_THRESHOLD = 0.8
+
+# Typos are matched between names (and aliases) at least this long once
+# compacted, and must keep the first and last character of the target
+MIN_TYPO_LENGTH = 6
+
+# Trigram similarity is tried for names at least this long; in shorter
+# names a single changed character can already reach FUZZY_THRESHOLD
+MIN_SIMILAR_LENGTH = 8
+
+# Resolved names remembered per resolver
+MEMO_SIZE = 65536
+
+_NON_ALNUM = re.compile(r'[^0-9a-z+#]+')
+
+# How a name was resolved
+MATCH_EXACT = 'exact'
+MATCH_ALIAS = 'alias'
+MATCH_TYPO = 'typo'
+MATCH_SIMILAR = 'similar'
+MATCH_NONE = 'none'
+
+Resolution = namedtuple('Resolution', ['skill_id', 'match'])
+
+
+def compact_skill_name(name):
+    """
+    Reduce a skill name to lowercase letters, digits, '+' and '#'
+    
+    'Power BI', 'PowerBI' and 'power-bi' all become 'powerbi'.
+    """
+    return _NON_ALNUM.sub('', name.lower())
+
+
+def deletions(compact_name):
+    """Every string obtained by deleting one character"""
+    return {compact_name[:i] + compact_name[i + 1:] for i in range(len(compact_name))}
+
+
+def within_one_edit(a, b):
+    """
+    True if a and b differ by at most one insertion, deletion,
+    substitution or swap of adjacent characters
+    """
+    if a == b:
+        return True
+    if abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) > len(b):
+        a, b = b, a
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    if len(a) < len(b):
+        return a[i:] == b[i + 1:]
+    return (a[i + 1:] == b[i + 1:] or
+            (i + 1 < len(a) and a[i] == b[i + 1] and a[i + 1] == b[i] and a[i + 2:] == b[i + 2:]))
+
+
+def trigrams(compact_name):
+    """Set of character trigrams of a compacted name, padded at both ends"""
+    padded = f'  {compact_name} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SkillResolver:
+    """
+    Precomputed lookup tables for skill name resolution
+    
+    Built once per data snapshot; resolve() only reads the tables (plus a
+    bounded memo of past answers), so a resolver can be shared by
+    concurrent requests.
+    """
+    
+    def __init__(self, canonical_names, aliases=None):
+        """
+        Args:
+            canonical_names: Iterable of canonical skill names (any casing)
+            aliases: Dict of {canonical skill name: [alias, ...]}
+        """
+        self._exact = {}      # compacted canonical name -> skill ID
+        self._aliases = {}    # compacted alias -> skill ID
+        for name in canonical_names:
+            self._exact.setdefault(compact_skill_name(name), name.lower())
+        for name, alias_list in (aliases or {}).items():
+            skill_id = name.lower()
+            for alias in alias_list:
+                key = compact_skill_name(alias)
+                if key and key not in self._exact:
+                    self._aliases.setdefault(key, skill_id)
+        
+        # Every compacted canonical name and alias is a fuzzy match target
+        self._targets = []    # (compacted name, trigram set, skill ID)
+        self._deletes = {}    # name or one-deletion variant -> [target, ...]
+        self._postings = {}   # trigram -> [target, ...]
+        for key, skill_id in list(self._exact.items()) + list(self._aliases.items()):
+            target = len(self._targets)
+            grams = frozenset(trigrams(key))
+            self._targets.append((key, grams, skill_id))
+            if len(key) >= MIN_TYPO_LENGTH:
+                for variant in deletions(key) | {key}:
+                    self._deletes.setdefault(variant, []).append(target)
+            for gram in grams:
+                self._postings.setdefault(gram, []).append(target)
+        
+        self._memo = {}
+    
+    def resolve(self, name):
+        """
+        Resolve a free-text skill name
+        
+        Returns:
+            Resolution(skill_id, match); unknown names resolve to their own
+            lowercased form with MATCH_NONE
+        """
+        resolution = self._memo.get(name)
+        if resolution is None:
+            resolution = self._resolve(name)
+            if len(self._memo) >= MEMO_SIZE:
+                self._memo.clear()
+            self._memo[name] = resolution
+        return resolution
+    
+    def _resolve(self, name):
+        key = compact_skill_name(name)
+        skill_id = self._exact.get(key)
+        if skill_id is not None:
+            return Resolution(skill_id, MATCH_EXACT)
+        skill_id = self._aliases.get(key)
+        if skill_id is not None:
+            return Resolution(skill_id, MATCH_ALIAS)
+        if len(key) >= MIN_TYPO_LENGTH:
+            skill_id = self._typo(key)
+            if skill_id is not None:
+                return Resolution(skill_id, MATCH_TYPO)
+        if len(key) >= MIN_SIMILAR_LENGTH:
+            skill_id = self._similar(key)
+            if skill_id is not None:
+                return Resolution(skill_id, MATCH_SIMILAR)
+        return Resolution(name.lower(), MATCH_NONE)
+    
+    def _typo(self, key):
+        """
+        Target within one edit of key that starts and ends like key, or None
+        
+        Two strings within one edit share the longer one's deletion
+        variants, so candidates come from O(len(key)) dict lookups and are
+        then verified exactly.
+        """
+        best = None
+        for variant in deletions(key) | {key}:
+            for target in self._deletes.get(variant, ()):
+                if best is not None and target >= best:
+                    continue
+                target_key = self._targets[target][0]
+                if (target_key[0] == key[0] and target_key[-1] == key[-1]
+                        and within_one_edit(key, target_key)):
+                    best = target
+        return self._targets[best][2] if best is not None else None
+    
+    def _similar(self, key):
+        """
+        Target with the highest trigram Dice coefficient >= FUZZY_THRESHOLD, or None
+        
+        Uses prefix filtering: a target reaching the threshold must share at
+        least `overlap` trigrams with key, so it has to contain one of the
+        key's len(grams) - overlap + 1 rarest trigrams. Only those postings
+        are scanned; candidates are then scored against their full sets.
+        """
+        grams = sorted(trigrams(key), key=lambda gram: len(self._postings.get(gram, ())))
+        size = len(grams)
+        min_size = size * FUZZY_THRESHOLD / (2 - FUZZY_THRESHOLD)
+        max_size = size * (2 - FUZZY_THRESHOLD) / FUZZY_THRESHOLD
+        overlap = ceil(FUZZY_THRESHOLD * (size + min_size) / 2)
+        
+        query = set(grams)
+        best_score = FUZZY_THRESHOLD
+        best = None
+        seen = set()
+        for gram in grams[:size - overlap + 1]:
+            for target in self._postings.get(gram, ()):
+                if target in seen:
+                    continue
+                seen.add(target)
+                target_grams = self._targets[target][1]
+                if not min_size <= len(target_grams) <= max_size:
+                    continue
+                score = 2.0 * len(query & target_grams) / (size + len(target_grams))
+                if score > best_score or (score == best_score and (best is None or target < best)):
+                    best_score = score
+                    best = target
+        return self._targets[best][2] if best is not None else None
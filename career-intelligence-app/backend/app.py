@@ -3,28 +3,243 @@ Career Intelligence App - Backend API
 A Flask-based backend for career analysis and job fit predictions
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, g, request, jsonify, stream_with_context
 from flask_cors import CORS
-import json
-from algorithms.scoring import calculate_job_fit, analyze_strengths, identify_skill_gaps
-from algorithms.salary_estimation import estimate_salary
+from werkzeug.http import http_date
+from algorithms.scoring import (
+    analyze_fit, batch_job_fit, build_fit_state, fit_state_result, fit_state_skills,
+    normalize_profile, update_fit_state
+)
+from algorithms.role_matching import match_roles
+from algorithms.salary_estimation import EXPERIENCE_LEVELS, LOCATIONS, estimate_salary, salary_projection
 from algorithms.recommendations import generate_recommendations
+from algorithms.planner import MAX_PLAN_ROLES, MAX_PLAN_WEEKS, plan_learning_path
+from admission import (
+    AdmissionController, LatencyBudget, Overloaded, RequestCoalescer, SectionCosts, parse_latency_budget
+)
+from datastore import DataStore
+from peers import DEFAULT_PEER_COUNT, MAX_PEER_COUNT, MIN_PEERS, PEER_STORE_FILENAME, PeerStore
+from metrics import NULL_TIMER, BootTimer, MetricsRegistry, ProfileStore, SamplingProfiler
+from result_cache import ResultCache, decode_result_token, encode_result_token, make_profile_key
+from serialization import dumps, encode_object, negotiate
+from warmup import WARM_START_FILENAME, candidate_profiles, load_warm_start, rank_profiles
+import io
+import json
+import math
 import os
+import time
 
 app = Flask(__name__)
-CORS(app)  # Enable cross-origin requests from frontend
+CORS(app, expose_headers=['Retry-After'])  # Enable cross-origin requests from frontend
+
+# Memoized /api/analyze responses, keyed by the canonical profile
+RESULT_CACHE = ResultCache(
+    maxsize=int(os.environ.get('RESULT_CACHE_SIZE', 1024)),
+    ttl=float(os.environ.get('RESULT_CACHE_TTL', 300))
+)
+
+# Job market data: versioned snapshots, hot-reloaded when the files change.
+# Handlers read DATA_STORE.snapshot once and use it for the whole request.
+DATA_STORE = DataStore(poll_interval=float(os.environ.get('DATA_RELOAD_INTERVAL', 5)))
+
+# Incremental analysis state behind /api/analyze/delta, keyed by
+# (data version, result token)
+FIT_STATES = ResultCache(
+    maxsize=int(os.environ.get('DELTA_STATE_CACHE_SIZE', 4096)),
+    ttl=float(os.environ.get('DELTA_STATE_CACHE_TTL', 600))
+)
+
+# Admission control in front of /api/analyze: at most ANALYZE_MAX_CONCURRENCY
+# analyses are computed at once; a request that finds no free slot within
+# ANALYZE_QUEUE_WAIT_MS gets a 503 with Retry-After. Cache hits and requests
+# joining an identical analysis already in flight do not take a slot.
+ADMISSION = AdmissionController(
+    max_concurrency=int(os.environ.get('ANALYZE_MAX_CONCURRENCY', 32)),
+    wait=float(os.environ.get('ANALYZE_QUEUE_WAIT_MS', 0)) / 1000,
+    retry_after=int(os.environ.get('ANALYZE_RETRY_AFTER', 1))
+)
+COALESCER = RequestCoalescer()
+
+# Observed cost of each recommendations variant, for latency_budget_ms.
+# Variants are tried most complete first; None omits recommendations.
+SECTION_COSTS = SectionCosts()
+RECOMMENDATION_VARIANTS = ('recommendations', 'recommendations_without_resources')
+
+# Warm start (see warmup.py): restore loads the results precomputed by
+# `python warmup.py` into RESULT_CACHE at boot, if they match the data;
+# compute computes the candidate profiles at boot instead; off does neither.
+# Warm results do not expire, but are evicted like any other entry.
+WARM_START = os.environ.get('WARM_START', 'restore')
+WARM_START_LIMIT = int(os.environ.get('WARM_START_LIMIT', RESULT_CACHE.maxsize))
+WARM_PAYLOADS = []
+
+# Peer comparison (see peers.py): /api/analyze requests with
+# "share_profile": true are stored anonymized in PEER_STORE_PATH and
+# compared against by /api/peers. PEERS_ENABLED=0 turns both off.
+PEERS_ENABLED = os.environ.get('PEERS_ENABLED', '1') != '0'
+PEER_STORE = PeerStore(
+    os.environ.get('PEER_STORE_PATH', os.path.join(DATA_STORE.data_dir, PEER_STORE_FILENAME)),
+    DATA_STORE.snapshot.role_index
+) if PEERS_ENABLED else None
+
+# Process uptime when the app was loaded and when this process first responded
+BOOT = BootTimer()
+
+# Cached results were computed from the previous data
+DATA_STORE.add_listener(lambda snapshot: RESULT_CACHE.clear())
+DATA_STORE.add_listener(lambda snapshot: FIT_STATES.clear())
+if PEER_STORE is not None:
+    DATA_STORE.add_listener(lambda snapshot: PEER_STORE.rebuild(snapshot.role_index))
+DATA_STORE.start_watching()
+
+# Request metrics, scraped from /metrics. METRICS_ENABLED=0 turns the
+# per-stage timers into no-ops.
+METRICS = MetricsRegistry(enabled=os.environ.get('METRICS_ENABLED', '1') != '0')
+STAGE_SECONDS = METRICS.histogram(
+    'career_analyze_stage_seconds',
+    'Time spent in each stage of /api/analyze',
+    ('role', 'stage')
+)
+REQUESTS = METRICS.counter('career_http_requests_total', 'HTTP requests by endpoint and status',
+                           ('endpoint', 'status'))
+ERRORS = METRICS.counter('career_http_errors_total', 'HTTP responses with a 4xx/5xx status',
+                         ('endpoint', 'status'))
+METRICS.add_collector(lambda: [
+    ('career_result_cache_hits_total', 'counter', 'Result cache hits', RESULT_CACHE.hits),
+    ('career_result_cache_misses_total', 'counter', 'Result cache misses', RESULT_CACHE.misses),
+    ('career_result_cache_entries', 'gauge', 'Entries in the result cache',
+     RESULT_CACHE.stats()['size']),
+    ('career_data_reloads_total', 'counter', 'Market data snapshots loaded', DATA_STORE.reloads),
+    ('career_data_reload_failures_total', 'counter', 'Market data reloads that failed',
+     DATA_STORE.reload_failures),
+    ('career_admission_admitted_total', 'counter', 'Analyses admitted for computation', ADMISSION.admitted),
+    ('career_admission_rejected_total', 'counter', 'Analyses turned away with a 503', ADMISSION.rejected),
+    ('career_admission_in_flight', 'gauge', 'Analyses being computed', ADMISSION.in_flight),
+    ('career_coalesced_requests_total', 'counter', 'Requests served by an identical in-flight analysis',
+     COALESCER.coalesced),
+    ('career_warm_start_results', 'gauge', 'Results put in the result cache by the last warm start',
+     len(WARM_PAYLOADS)),
+])
+if PEER_STORE is not None:
+    METRICS.add_collector(lambda: [
+        (name, kind, help_text, PEER_STORE.stats()[key]) for name, kind, help_text, key in (
+            ('career_peer_profiles', 'gauge', 'Shared profiles indexed for /api/peers', 'rows'),
+            ('career_peer_record_failures_total', 'counter', 'Shared profiles that could not be stored',
+             'record_failures'),
+        )
+    ])
+METRICS.add_collector(lambda: [
+    (name, 'gauge', help_text, value) for name, help_text, value in (
+        ('career_boot_seconds', 'Process uptime when the app finished loading', BOOT.ready_seconds),
+        ('career_time_to_first_response_seconds', 'Process uptime when this process first responded',
+         BOOT.first_response_seconds),
+    ) if value is not None
+])
+DEGRADED = METRICS.counter('career_analyze_degraded_total',
+                           'Analyses that omitted a section to meet latency_budget_ms', ('section',))
+
+# Per-request sampling profiler, requested with an "X-Profile: 1" header.
+# Off unless PROFILING_ENABLED=1 - it costs a sampling thread per request.
+PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED', '0') == '1'
+PROFILES = ProfileStore()
+
+# Upper bound on profiles accepted by a single batch request
+MAX_BATCH_PROFILES = 1000
+
+# /api/analyze/stream: profiles analyzed per output chunk, and the longest
+# accepted input line
+STREAM_BATCH_SIZE = int(os.environ.get('STREAM_BATCH_SIZE', 64))
+STREAM_MAX_LINE_BYTES = 64 * 1024
+
+# Default and maximum number of roles returned by /api/roles/match
+DEFAULT_MATCH_COUNT = 5
+MAX_MATCH_COUNT = 50
+
+# /api/plan: weeks planned when the request gives no budget_weeks
+DEFAULT_PLAN_WEEKS = 12
+
+# Seconds browsers may reuse /api/roles, /api/skills/<role> and
+# /api/catalogue before revalidating them with their ETag
+CATALOGUE_MAX_AGE = int(os.environ.get('CATALOGUE_MAX_AGE', 60))
+CATALOGUE_CACHE_CONTROL = f'public, max-age={CATALOGUE_MAX_AGE}'
+
+def json_body(body, status=200):
+    """Response for an already-encoded JSON body (see serialization.dumps)"""
+    return Response(body, status=status, mimetype='application/json')
+
+def catalogue_etag(version, encoding=None):
+    """Strong ETag of a catalogue body: the data version, plus the content encoding"""
+    return version if encoding is None else f'{version}-{encoding}'
+
+def catalogue_response(snapshot, build_body):
+    """
+    Conditional GET of read-only catalogue data
+    
+    The ETag and Last-Modified come from the snapshot alone, so a client
+    whose copy is current gets a 304 without build_body() being called.
+    
+    Args:
+        build_body: Returns the PrecompressedBody to send otherwise
+    """
+    # If-None-Match takes precedence over If-Modified-Since
+    etag = None
+    headers = request.headers
+    if 'If-None-Match' in headers:
+        for candidate in (None, 'gzip', 'br'):
+            if request.if_none_match.contains_weak(catalogue_etag(snapshot.version, candidate)):
+                etag = catalogue_etag(snapshot.version, candidate)
+                break
+        if etag is None and request.if_none_match.star_tag:
+            etag = catalogue_etag(snapshot.version)
+    elif 'If-Modified-Since' in headers and request.if_modified_since is not None:
+        if int(snapshot.modified_at) <= request.if_modified_since.timestamp():
+            etag = catalogue_etag(snapshot.version)
+    
+    if etag is not None:
+        response = Response(status=304)
+    else:
+        data, encoding = negotiate(build_body(), request.accept_encodings)
+        response = json_body(data)
+        if encoding is not None:
+            response.headers['Content-Encoding'] = encoding
+        etag = catalogue_etag(snapshot.version, encoding)
+    
+    response.headers['ETag'] = f'"{etag}"'
+    response.headers['Last-Modified'] = http_date(int(snapshot.modified_at))
+    response.headers['Cache-Control'] = CATALOGUE_CACHE_CONTROL
+    response.headers['Vary'] = 'Accept-Encoding'
+    return response
 
-# Load job market data
-def load_data(filename):
-    """Load JSON data files"""
-    filepath = os.path.join('data', filename)
-    with open(filepath, 'r', encoding='utf-8') as f:
-        return json.load(f)
+@app.before_request
+def start_profiler():
+    if PROFILING_ENABLED and request.headers.get('X-Profile') == '1':
+        g.profiler = SamplingProfiler().start()
 
-# Global data stores
-JOB_ROLES = load_data('job_roles.json')
-SALARY_DATA = load_data('salary_data.json')
-SKILLS_DATABASE = load_data('skills_database.json')
+@app.after_request
+def record_request(response):
+    profiler = g.pop('profiler', None)
+    if profiler is not None:
+        response.headers['X-Profile-Id'] = PROFILES.add(profiler.stop())
+    BOOT.responded()
+    if METRICS.enabled:
+        endpoint = request.endpoint or 'unknown'
+        REQUESTS.inc(endpoint, response.status_code)
+        if response.status_code >= 400:
+            ERRORS.inc(endpoint, response.status_code)
+    return response
+
+@app.route('/metrics')
+def metrics():
+    """Prometheus metrics for this process"""
+    return Response(METRICS.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/metrics/profiles/<profile_id>')
+def get_profile(profile_id):
+    """Folded stacks of a profiled request (see the X-Profile-Id header)"""
+    folded = PROFILES.get(profile_id)
+    if folded is None:
+        return jsonify({'error': 'Profile not found'}), 404
+    return Response(folded, mimetype='text/plain')
 
 @app.route('/')
 def home():
@@ -32,91 +247,665 @@ def home():
     return jsonify({
         'status': 'active',
         'message': 'Career Intelligence API is running',
-        'version': '1.0.0'
+        'version': '1.0.0',
+        'data_version': DATA_STORE.snapshot.version,
+        'result_cache': RESULT_CACHE.stats(),
+        'admission': ADMISSION.stats(),
+        'section_cost_estimates_ms': SECTION_COSTS.snapshot(),
+        'warm_start': {'mode': WARM_START, 'results': len(WARM_PAYLOADS)},
+        'peers': PEER_STORE.stats() if PEER_STORE is not None else None,
+        'boot': {
+            'ready_seconds': BOOT.ready_seconds,
+            'time_to_first_response_seconds': BOOT.first_response_seconds
+        }
     })
 
 @app.route('/api/roles', methods=['GET'])
 def get_roles():
     """Get list of available job roles"""
-    roles = list(JOB_ROLES.keys())
-    return jsonify({'roles': roles})
+    snapshot = DATA_STORE.snapshot
+    return catalogue_response(snapshot, lambda: snapshot.response_fragments.roles)
+
+@app.route('/api/catalogue', methods=['GET'])
+def get_catalogue():
+    """Every role with its required skills, for bootstrapping the frontend in one request"""
+    snapshot = DATA_STORE.snapshot
+    return catalogue_response(snapshot, snapshot.response_fragments.catalogue)
+
+@app.route('/api/roles/match', methods=['GET', 'POST'])
+def match_profile_roles():
+    """
+    Top-K roles closest to a skill set
+    POST: JSON with skills, experience, education and optional top_k
+    GET: ?skills=SQL:advanced,Excel:expert&experience=...&education=...&top_k=...
+    """
+    try:
+        if request.method == 'POST':
+            data = request.get_json()
+            user_skills = data.get('skills', {})
+        else:
+            data = request.args
+            user_skills = {}
+            for item in data.get('skills', '').split(','):
+                name, _, level = item.partition(':')
+                if name.strip():
+                    user_skills[name.strip()] = level.strip() or 'intermediate'
+        
+        try:
+            top_k = int(data.get('top_k', DEFAULT_MATCH_COUNT))
+        except (TypeError, ValueError):
+            return jsonify({'error': 'top_k must be an integer'}), 400
+        top_k = max(1, min(top_k, MAX_MATCH_COUNT))
+        
+        snapshot = DATA_STORE.snapshot
+        profile = normalize_profile(user_skills, snapshot.skill_resolver)
+        matches = match_roles(
+            profile,
+            snapshot.inverted_index,
+            snapshot.role_index,
+            data.get('experience', 'fresher'),
+            data.get('education', 'bachelors'),
+            top_k
+        )
+        for entry in matches:
+            entry['job_fit_score'] = round(entry.pop('fit_score'), 1)
+        
+        return json_body(dumps({'matches': matches}))
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+def profile_fields(data):
+    """(role, skills, experience, education, location) of a profile payload, with their defaults"""
+    return (
+        data.get('role'),
+        data.get('skills', {}),
+        data.get('experience', 'fresher'),
+        data.get('education', 'bachelors'),
+        data.get('location', 'tier3')
+    )
+
+def profile_error(data):
+    """Why a profile payload's fields have the wrong types, or None if they are fine"""
+    if not isinstance(data, dict):
+        return 'Each profile must be a JSON object'
+    _, user_skills, experience, education, location = profile_fields(data)
+    if not isinstance(user_skills, dict) or not all(isinstance(level, str) for level in user_skills.values()):
+        return 'skills must map skill names to levels'
+    if not all(isinstance(value, str) for value in (experience, education, location)):
+        return 'experience, education and location must be strings'
+    return None
+
+def profile_key(data, snapshot):
+    """RESULT_CACHE key of a profile payload, or None if the payload is not analyzable"""
+    target_role, user_skills, experience, education, location = profile_fields(data)
+    if target_role not in snapshot.job_roles or not isinstance(user_skills, dict):
+        return None
+    if not all(isinstance(value, str) for value in (experience, education, location, *user_skills.values())):
+        return None
+    profile = normalize_profile(user_skills, snapshot.skill_resolver)
+    return make_profile_key(target_role, profile, experience, education, location, snapshot.version)
+
+def warm_start(snapshot, fallback=()):
+    """
+    Fill RESULT_CACHE with warm-start results for snapshot (see WARM_START)
+    
+    Args:
+        fallback: Profiles to compute when WARM_START=restore finds no
+                  results for snapshot, e.g. the previous ones after a reload
+    
+    Returns:
+        The payloads now cached
+    """
+    if WARM_START == 'restore':
+        results = load_warm_start(os.path.join(DATA_STORE.data_dir, WARM_START_FILENAME), snapshot.version)
+        if results is None:
+            results = [(payload, None) for payload in fallback]
+    elif WARM_START == 'compute':
+        payloads = rank_profiles(candidate_profiles(snapshot.role_index), (),
+                                 lambda payload: profile_key(payload, snapshot), WARM_START_LIMIT)
+        results = [(payload, None) for payload in payloads]
+    else:
+        return []
+    
+    cached = []
+    for payload, body in results[:WARM_START_LIMIT]:
+        key = profile_key(payload, snapshot)
+        if key is None:
+            continue
+        profile = normalize_profile(payload.get('skills', {}), snapshot.skill_resolver)
+        if body is None:
+            entry = _compute_analysis(payload, snapshot, key, NULL_TIMER, None)
+        else:
+            target_role, user_skills, experience, education, _ = profile_fields(payload)
+            fit_score = analyze_fit(target_role, user_skills, experience, education, snapshot.job_roles,
+                                    role_index=snapshot.role_index, profile=profile).fit_score
+            entry = (body, fit_score)
+        RESULT_CACHE.put(key, entry, ttl=math.inf)
+        cached.append(payload)
+    return cached
+
+def rewarm(snapshot):
+    """Data reload listener: warm the cache again for the new snapshot"""
+    WARM_PAYLOADS[:] = warm_start(snapshot, list(WARM_PAYLOADS))
+
+def run_analysis(data, snapshot, timer=NULL_TIMER, admission=None, budget=None, share=False):
+    """
+    Full analysis of one profile payload - shared by /api/analyze and
+    /api/analyze/stream
+    
+    Concurrent identical requests are coalesced into one computation.
+    
+    Args:
+        data: Decoded profile payload; its role must exist in snapshot
+        snapshot: DataStore snapshot to analyze against
+        timer: Stage timer; marks every stage after decoding
+        admission: Optional AdmissionController the computation needs a slot of
+        budget: Optional LatencyBudget; sections that would not fit in it
+                are left out (listed in the response's omitted_sections)
+        share: Also keep the profile, anonymized, in PEER_STORE
+    
+    Returns:
+        The encoded JSON response (serialization.Fragment), shared with the
+        result cache
+    
+    Raises:
+        Overloaded: if admission has no free slot
+    """
+    target_role, user_skills, experience, education, location = profile_fields(data)
+    
+    # Normalize the profile once per request
+    profile = normalize_profile(user_skills, snapshot.skill_resolver)
+    timer.mark('normalize')
+    
+    # Identical profiles are answered from the cache
+    cache_key = make_profile_key(target_role, profile, experience, education, location,
+                                 snapshot.version)
+    cached = RESULT_CACHE.get(cache_key)
+    timer.mark('cache_lookup')
+    
+    def compute():
+        if admission is None:
+            return _compute_analysis(data, snapshot, cache_key, timer, budget)
+        admission.acquire()
+        try:
+            return _compute_analysis(data, snapshot, cache_key, timer, budget)
+        finally:
+            admission.release()
+    
+    if cached is None:
+        # A budgeted computation may leave sections out, so it is only shared
+        # with requests that have the same budget
+        cached = COALESCER.run(cache_key if budget is None else cache_key + (budget.budget_ms,), compute)
+    response, fit_score = cached
+    
+    # The profile and fit score of this analysis, not a second one
+    if share:
+        PEER_STORE.record(target_role, profile, fit_score)
+    return response
+
+def _compute_analysis(data, snapshot, cache_key, timer, budget):
+    """
+    The uncached part of run_analysis
+    
+    Returns:
+        (encoded response, fit score), as kept in RESULT_CACHE
+    """
+    target_role, user_skills, experience, education, location = profile_fields(data)
+    
+    # Fit score, strengths and gaps in a single pass over the role. The fit
+    # state is kept so that a follow-up /api/analyze/delta starts from it.
+    state = build_fit_state(target_role, user_skills, snapshot.job_roles, snapshot.role_index,
+                            snapshot.skill_resolver)
+    analysis = fit_state_result(state, experience, education)
+    result_token = encode_result_token(target_role, user_skills, experience, education, location)
+    FIT_STATES.put((snapshot.version, result_token), state)
+    fit_score = analysis.fit_score
+    strengths = analysis.strengths
+    skill_gaps = analysis.skill_gaps
+    timer.mark('analyze_fit')
+    
+    # Estimate salary
+    salary_range = estimate_salary(
+        target_role,
+        location,
+        experience,
+        fit_score,
+        snapshot.salary_data,
+        snapshot.salary_table
+    )
+    timer.mark('estimate_salary')
+    
+    # Generate recommendations - the most complete variant the latency
+    # budget allows. Timing every variant keeps the cost estimates current.
+    fragments = snapshot.response_fragments
+    variant = RECOMMENDATION_VARIANTS[0] if budget is None else budget.choose(RECOMMENDATION_VARIANTS)
+    recommendations = None
+    if variant is not None:
+        start = time.perf_counter()
+        recommendations = fragments.shared(generate_recommendations(
+            target_role,
+            user_skills,
+            skill_gaps,
+            experience,
+            snapshot.job_roles,
+            snapshot.skills_database,
+            high_priority_gaps=analysis.high_priority_gaps,
+            recommendation_index=snapshot.recommendation_index,
+            include_resources=variant == 'recommendations'
+        ))
+        SECTION_COSTS.observe(variant, time.perf_counter() - start)
+    timer.mark('generate_recommendations')
+    
+    # Prepare response; the static parts are spliced in pre-encoded
+    fields = {
+        'job_fit_score': round(fit_score, 1),
+        'strengths': strengths,
+        'skill_gaps': skill_gaps,
+        'salary_estimate': salary_range,
+        'recommendations': recommendations,
+        'role_info': fragments.role_info(target_role),
+        'result_token': result_token
+    }
+    omitted = []
+    if variant is None:
+        del fields['recommendations']
+        omitted.append('recommendations')
+    elif variant != 'recommendations':
+        omitted.append('learning_resources')
+    if omitted:
+        fields['omitted_sections'] = omitted
+        for section in omitted:
+            DEGRADED.inc(section)
+    response = encode_object(fields)
+    timer.mark('serialize')
+    
+    # Only complete responses are cached
+    if not omitted:
+        RESULT_CACHE.put(cache_key, (response, fit_score))
+    return response, fit_score
 
 @app.route('/api/analyze', methods=['POST'])
 def analyze_profile():
     """
     Main endpoint for career analysis
-    Expects JSON payload with user profile data
+    Expects JSON payload with user profile data, plus an optional
+    latency_budget_ms and share_profile
     """
     try:
+        start = time.perf_counter()
+        timer = METRICS.stage_timer(STAGE_SECONDS)
         data = request.get_json()
+        timer.mark('decode')
+        snapshot = DATA_STORE.snapshot
         
-        # Extract user data
+        # Validate role
         target_role = data.get('role')
-        user_skills = data.get('skills', {})
-        experience = data.get('experience', 'fresher')
-        education = data.get('education', 'bachelors')
-        location = data.get('location', 'tier3')
+        if target_role not in snapshot.job_roles:
+            return jsonify({'error': 'Invalid job role'}), 400
+        try:
+            budget_ms = parse_latency_budget(data.get('latency_budget_ms'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        budget = LatencyBudget(budget_ms, SECTION_COSTS, start) if budget_ms is not None else None
         
-        # Validate role
-        if target_role not in JOB_ROLES:
+        # Opted in: keep the profile, anonymized, for /api/peers
+        share = PEER_STORE is not None and data.get('share_profile') is True
+        try:
+            result = json_body(run_analysis(data, snapshot, timer, ADMISSION, budget, share))
+        except Overloaded as e:
+            return jsonify({'error': str(e)}), 503, {'Retry-After': str(e.retry_after)}
+        timer.finish(target_role)
+        return result
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/analyze/delta', methods=['POST'])
+def analyze_delta():
+    """
+    Rescore a previous analysis after a few skill changes
+    Expects JSON with result_token (from a previous response) and changes
+    ({skill: level, or null to remove}); experience, education and
+    location may be changed too
+    """
+    try:
+        data = request.get_json()
+        snapshot = DATA_STORE.snapshot
+        
+        token = data.get('result_token')
+        try:
+            target_role, user_skills, experience, education, location = decode_result_token(token)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        if target_role not in snapshot.job_roles:
             return jsonify({'error': 'Invalid job role'}), 400
         
-        # Calculate job fit score
-        fit_score = calculate_job_fit(
-            target_role, 
-            user_skills, 
-            experience, 
-            education,
-            JOB_ROLES
-        )
+        changes = data.get('changes', {})
+        if (not isinstance(changes, dict)
+                or not all(level is None or isinstance(level, str) for level in changes.values())):
+            return jsonify({'error': 'changes must map skill names to a level or null'}), 400
+        experience = data.get('experience', experience)
+        education = data.get('education', education)
+        location = data.get('location', location)
+        if not all(isinstance(value, str) for value in (experience, education, location)):
+            return jsonify({'error': 'experience, education and location must be strings'}), 400
         
-        # Analyze strengths
-        strengths = analyze_strengths(
-            target_role,
-            user_skills,
-            JOB_ROLES
-        )
+        # Only the changed skills are re-assessed, in place. The state of the
+        # previous result is taken out of the cache, so no other request sees
+        # it change; one that wants it too rebuilds it from the token, as
+        # when this process does not have it.
+        state = FIT_STATES.pop((snapshot.version, token))
+        if state is None:
+            state = build_fit_state(target_role, user_skills, snapshot.job_roles,
+                                    snapshot.role_index, snapshot.skill_resolver)
+        update_fit_state(state, changes, snapshot.skill_resolver)
         
-        # Identify skill gaps
-        skill_gaps = identify_skill_gaps(
-            target_role,
-            user_skills,
-            JOB_ROLES
-        )
+        new_token = encode_result_token(target_role, fit_state_skills(state), experience, education,
+                                        location)
+        FIT_STATES.put((snapshot.version, new_token), state)
         
-        # Estimate salary
+        analysis = fit_state_result(state, experience, education)
         salary_range = estimate_salary(
             target_role,
             location,
             experience,
-            fit_score,
-            SALARY_DATA
+            analysis.fit_score,
+            snapshot.salary_data,
+            snapshot.salary_table
         )
         
-        # Generate recommendations
-        recommendations = generate_recommendations(
+        return json_body(dumps({
+            'job_fit_score': round(analysis.fit_score, 1),
+            'strengths': analysis.strengths,
+            'skill_gaps': analysis.skill_gaps,
+            'salary_estimate': salary_range,
+            'result_token': new_token
+        }))
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+def analyze_stream_records(stream, snapshot):
+    """
+    Analyze newline-delimited JSON profiles, yielding NDJSON output chunks
+    
+    Reads at most STREAM_BATCH_SIZE lines (each capped at
+    STREAM_MAX_LINE_BYTES) before yielding their results, so memory use
+    does not grow with the size of the upload.
+    """
+    line_number = 0
+    while True:
+        lines = []
+        while len(lines) < STREAM_BATCH_SIZE:
+            line = stream.readline(STREAM_MAX_LINE_BYTES + 1)
+            if not line:
+                break
+            line_number += 1
+            if len(line) > STREAM_MAX_LINE_BYTES and not line.endswith(b'\n'):
+                # Skip the rest of an oversized line
+                while line and not line.endswith(b'\n'):
+                    line = stream.readline(STREAM_MAX_LINE_BYTES + 1)
+                lines.append((line_number, None))
+            elif line.strip():
+                lines.append((line_number, line))
+        if not lines:
+            return
+        
+        output = []
+        for number, line in lines:
+            record = {'line': number}
+            try:
+                if line is None:
+                    raise ValueError(f'Line longer than {STREAM_MAX_LINE_BYTES} bytes')
+                timer = METRICS.stage_timer(STAGE_SECONDS)
+                data = json.loads(line)
+                timer.mark('decode')
+                if not isinstance(data, dict):
+                    raise ValueError('Each line must be a JSON object')
+                if 'id' in data:
+                    record['id'] = data['id']
+                target_role = data.get('role')
+                if target_role not in snapshot.job_roles:
+                    raise ValueError('Invalid job role')
+                record['result'] = run_analysis(data, snapshot, timer)
+                output.append(encode_object(record))
+                timer.finish(target_role)
+            except Exception as e:
+                output.append(stream_error_line(number, record, str(e)))
+        output.append(b'')
+        yield b'\n'.join(output)
+
+def stream_error_line(number, record, message):
+    """
+    NDJSON error line of an /api/analyze/stream input line
+    
+    Built afresh rather than from the partly filled record: the client's id
+    is echoed if it can be encoded, sent as a string otherwise (e.g. an
+    integer wider than 64 bits under orjson) and dropped as a last resort,
+    so an error never cuts the response short.
+    """
+    candidates = []
+    if 'id' in record:
+        candidates.append({'line': number, 'id': record['id'], 'error': message})
+        candidates.append({'line': number, 'id': str(record['id']), 'error': message})
+    candidates.append({'line': number, 'error': message})
+    for error in candidates:
+        try:
+            return dumps(error)
+        except (TypeError, ValueError):
+            continue
+    return dumps({'line': number, 'error': 'The error message could not be encoded'})
+
+@app.route('/api/analyze/stream', methods=['POST'])
+def analyze_stream():
+    """
+    Bulk analysis: newline-delimited JSON profiles in, NDJSON results out
+    Results are streamed back in input order as each batch completes
+    """
+    snapshot = DATA_STORE.snapshot
+    # request.stream reads byte by byte on readline(); buffer it
+    stream = io.BufferedReader(request.stream, STREAM_MAX_LINE_BYTES)
+    return Response(
+        stream_with_context(analyze_stream_records(stream, snapshot)),
+        mimetype='application/x-ndjson'
+    )
+
+@app.route('/api/analyze/batch', methods=['POST'])
+def analyze_batch():
+    """
+    Score one or many profiles against every role (or a subset of roles)
+    Expects either a single profile payload or {"profiles": [...]};
+    an optional "roles" list restricts the roles scored
+    """
+    try:
+        data = request.get_json()
+        snapshot = DATA_STORE.snapshot
+        
+        roles = data.get('roles')
+        if roles is not None:
+            if not isinstance(roles, list) or any(role not in snapshot.job_roles for role in roles):
+                return jsonify({'error': 'Invalid job role'}), 400
+        
+        single = 'profiles' not in data
+        profiles = [data] if single else data['profiles']
+        if not isinstance(profiles, list):
+            return jsonify({'error': 'profiles must be a list'}), 400
+        if len(profiles) > MAX_BATCH_PROFILES:
+            return jsonify({'error': f'At most {MAX_BATCH_PROFILES} profiles per request'}), 400
+        for number, user_profile in enumerate(profiles):
+            error = profile_error(user_profile)
+            if error is not None:
+                return jsonify({'error': error if single else f'profiles[{number}]: {error}'}), 400
+        
+        all_rankings = batch_job_fit(profiles, snapshot.role_matrix, roles, snapshot.skill_resolver)
+        
+        results = []
+        for user_profile, rankings in zip(profiles, all_rankings):
+            location = user_profile.get('location', 'tier3')
+            experience = user_profile.get('experience', 'fresher')
+            for entry in rankings:
+                salary_range = estimate_salary(
+                    entry['role'],
+                    location,
+                    experience,
+                    entry['fit_score'],
+                    snapshot.salary_data,
+                    snapshot.salary_table
+                )
+                entry['job_fit_score'] = round(entry.pop('fit_score'), 1)
+                entry['salary_estimate'] = {
+                    'min': salary_range['min'],
+                    'max': salary_range['max'],
+                    'formatted_range': salary_range['formatted_range']
+                }
+            results.append({'rankings': rankings})
+        
+        return json_body(dumps(results[0] if single else {'results': results}))
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/salary/projection', methods=['POST'])
+def project_salary():
+    """
+    Salary ranges for a role across experience levels and locations
+    Expects JSON with role and either skills (plus education) or fit_score;
+    optional experience_levels and locations lists restrict the grid
+    """
+    try:
+        data = request.get_json()
+        snapshot = DATA_STORE.snapshot
+        
+        target_role = data.get('role')
+        if target_role not in snapshot.job_roles:
+            return jsonify({'error': 'Invalid job role'}), 400
+        
+        experience_levels = data.get('experience_levels', list(EXPERIENCE_LEVELS))
+        locations = data.get('locations', list(LOCATIONS))
+        if (not isinstance(experience_levels, list)
+                or any(level not in EXPERIENCE_LEVELS for level in experience_levels)):
+            return jsonify({'error': f'experience_levels must be a list of {list(EXPERIENCE_LEVELS)}'}), 400
+        if not isinstance(locations, list) or any(location not in LOCATIONS for location in locations):
+            return jsonify({'error': f'locations must be a list of {list(LOCATIONS)}'}), 400
+        
+        fit_score = data.get('fit_score')
+        if 'skills' in data:
+            error = profile_error(data)
+            if error is not None:
+                return jsonify({'error': error}), 400
+            # The experience bonus makes the fit score differ per level
+            user_skills = data['skills']
+            education = data.get('education', 'bachelors')
+            profile = normalize_profile(user_skills, snapshot.skill_resolver)
+            fit_scores = [
+                analyze_fit(target_role, user_skills, experience, education, snapshot.job_roles,
+                            role_index=snapshot.role_index, profile=profile).fit_score
+                for experience in experience_levels
+            ]
+        elif (not isinstance(fit_score, bool) and isinstance(fit_score, (int, float))
+              and 0 <= fit_score <= 100):
+            fit_scores = [fit_score] * len(experience_levels)
+        else:
+            return jsonify({'error': 'Provide skills or a fit_score between 0 and 100'}), 400
+        
+        projection = salary_projection(
             target_role,
-            user_skills,
-            skill_gaps,
+            fit_scores,
+            snapshot.salary_data,
+            snapshot.salary_table,
+            experience_levels,
+            locations
+        )
+        
+        return json_body(dumps({
+            'role': target_role,
+            'experience_levels': experience_levels,
+            'locations': locations,
+            'fit_scores': [round(score, 1) for score in fit_scores],
+            'projection': projection
+        }))
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/plan', methods=['POST'])
+def plan_learning():
+    """
+    Which skills to learn first to raise the fit score the most in a time budget
+    Expects JSON with role (or a roles list), skills, experience, education,
+    location and optional budget_weeks
+    """
+    try:
+        data = request.get_json()
+        snapshot = DATA_STORE.snapshot
+        
+        error = profile_error(data)
+        if error is not None:
+            return jsonify({'error': error}), 400
+        target_roles = data.get('roles', [data.get('role')])
+        if not isinstance(target_roles, list) or not 1 <= len(target_roles) <= MAX_PLAN_ROLES:
+            return jsonify({'error': f'roles must be a list of 1 to {MAX_PLAN_ROLES} job roles'}), 400
+        if any(role not in snapshot.job_roles for role in target_roles):
+            return jsonify({'error': 'Invalid job role'}), 400
+        target_roles = list(dict.fromkeys(target_roles))
+        
+        budget_weeks = data.get('budget_weeks', DEFAULT_PLAN_WEEKS)
+        if (isinstance(budget_weeks, bool) or not isinstance(budget_weeks, int)
+                or not 1 <= budget_weeks <= MAX_PLAN_WEEKS):
+            return jsonify({'error': f'budget_weeks must be a whole number from 1 to {MAX_PLAN_WEEKS}'}), 400
+        
+        _, user_skills, experience, education, location = profile_fields(data)
+        profile = normalize_profile(user_skills, snapshot.skill_resolver)
+        plan = plan_learning_path(
+            target_roles,
+            profile,
+            budget_weeks,
+            snapshot.job_roles,
+            snapshot.role_index,
+            snapshot.planner_index,
             experience,
-            JOB_ROLES,
-            SKILLS_DATABASE
+            education,
+            location,
+            snapshot.salary_data,
+            snapshot.salary_table
         )
         
-        # Prepare response
-        response = {
-            'job_fit_score': round(fit_score, 1),
-            'strengths': strengths,
-            'skill_gaps': skill_gaps,
-            'salary_estimate': salary_range,
-            'recommendations': recommendations,
-            'role_info': {
-                'title': target_role,
-                'description': JOB_ROLES[target_role].get('description', '')
-            }
-        }
+        return json_body(dumps(plan))
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/peers', methods=['POST'])
+def compare_peers():
+    """
+    Fit score percentile and the common strengths of the nearest peers among
+    the profiles shared for the same role
+    Expects JSON with role, skills, experience, education and optional k
+    """
+    try:
+        if PEER_STORE is None:
+            return jsonify({'error': 'Peer comparison is disabled'}), 404
+        data = request.get_json()
+        snapshot = DATA_STORE.snapshot
+        
+        error = profile_error(data)
+        if error is not None:
+            return jsonify({'error': error}), 400
+        target_role, user_skills, experience, education, _ = profile_fields(data)
+        if target_role not in snapshot.job_roles:
+            return jsonify({'error': 'Invalid job role'}), 400
         
-        return jsonify(response)
+        k = data.get('k', DEFAULT_PEER_COUNT)
+        if isinstance(k, bool) or not isinstance(k, int) or not MIN_PEERS <= k <= MAX_PEER_COUNT:
+            return jsonify({'error': f'k must be a whole number from {MIN_PEERS} to {MAX_PEER_COUNT}'}), 400
+        
+        profile = normalize_profile(user_skills, snapshot.skill_resolver)
+        fit_score = analyze_fit(target_role, user_skills, experience, education, snapshot.job_roles,
+                                role_index=snapshot.role_index, profile=profile).fit_score
+        comparison = PEER_STORE.compare(target_role, profile, fit_score, k)
+        
+        return json_body(dumps({'role': target_role, 'job_fit_score': round(fit_score, 1), **comparison}))
     
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -124,13 +913,17 @@ def analyze_profile():
 @app.route('/api/skills/<role>', methods=['GET'])
 def get_role_skills(role):
     """Get required skills for a specific role"""
-    if role not in JOB_ROLES:
+    snapshot = DATA_STORE.snapshot
+    if role not in snapshot.job_roles:
         return jsonify({'error': 'Role not found'}), 404
     
-    return jsonify({
-        'role': role,
-        'required_skills': JOB_ROLES[role]['required_skills']
-    })
+    return catalogue_response(snapshot, lambda: snapshot.response_fragments.role_skills(role))
+
+# Warm the result cache before the first request (in the gunicorn master,
+# so forked workers share it), and again for every new data snapshot
+WARM_PAYLOADS[:] = warm_start(DATA_STORE.snapshot)
+DATA_STORE.add_listener(rewarm)
+BOOT.ready()
 
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=5000)
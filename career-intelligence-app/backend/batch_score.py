@@ -0,0 +1,323 @@
+"""
+Offline Batch Scorer
+Scores large profile files with the algorithms package directly - no HTTP
+
+Input is CSV or JSONL, read in fixed-size chunks that are scored in
+parallel by a process pool. Every worker loads the market data once.
+Results are written as one columnar part file per chunk:
+
+    output_dir/
+        _run.json               input path and chunk size of the run
+        part-00000.json         {"columns": {"row": [...], "fit_score": [...], ...}}
+        part-00001.json
+        _SUCCESS                written once every chunk has a part file
+
+Part files are written atomically, so an interrupted run can be started
+again with the same arguments and only the missing chunks are scored.
+--start-chunk skips everything before a given chunk offset; _SUCCESS is
+only written once the earlier chunks have part files too, e.g. from the
+run that was interrupted.
+
+Input rows carry the /api/analyze fields: id (optional), role, skills,
+experience, education, location. In JSONL, skills is an object of
+{name: level}. In CSV it is either such a JSON object or
+"SQL:advanced;Excel:expert" pairs.
+
+Usage (from the backend folder):
+    python batch_score.py profiles.csv results/ --workers 4 --chunk-size 10000
+"""
+
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+import argparse
+import csv
+import itertools
+import json
+import os
+import sys
+import time
+
+from algorithms.salary_estimation import estimate_salary
+from algorithms.scoring import analyze_fit, normalize_profile
+
+DEFAULT_CHUNK_SIZE = 10000
+
+# Output columns, in order
+COLUMNS = (
+    'row',                 # 0-based row number in the input
+    'id',                  # the row's id, or None
+    'role',
+    'fit_score',           # rounded to 1 decimal, like /api/analyze
+    'skill_gaps',          # names of every gap, most important first
+    'high_priority_gaps',  # names of the high priority gaps
+    'salary_min',
+    'salary_max',
+    'salary_band',         # market band the estimate was placed in, or None
+    'error'                # why the row could not be scored, or None
+)
+
+RUN_FILENAME = '_run.json'
+SUCCESS_FILENAME = '_SUCCESS'
+
+# Market data of this worker process, set by _init_worker
+_snapshot = None
+
+
+def part_path(output_dir, chunk_index):
+    return os.path.join(output_dir, f'part-{chunk_index:05d}.json')
+
+
+def parse_csv_skills(text):
+    """
+    Parse the skills cell of a CSV row
+    
+    Returns:
+        {skill name: level}
+    """
+    text = (text or '').strip()
+    if text.startswith('{'):
+        return json.loads(text)
+    skills = {}
+    for item in text.split(';'):
+        name, _, level = item.partition(':')
+        if name.strip():
+            skills[name.strip()] = level.strip() or 'intermediate'
+    return skills
+
+
+def read_rows(path, input_format):
+    """
+    Yield the rows of an input file
+    
+    CSV rows come out as /api/analyze-style dicts; rows that cannot be
+    parsed keep their fields and get an '_error' message, so row numbers
+    stay aligned with the input and the error keeps the row's id and
+    role. JSONL rows come out as the raw line, to be decoded by the
+    workers rather than the single reading process.
+    """
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        if input_format == 'csv':
+            for record in csv.DictReader(f):
+                try:
+                    record['skills'] = parse_csv_skills(record.get('skills'))
+                    yield record
+                except ValueError as e:
+                    yield {**record, '_error': f'Invalid skills: {e}'}
+        else:
+            for line in f:
+                if line.strip():
+                    yield line
+
+
+def _init_worker(data_dir):
+    global _snapshot
+    from datastore import DataStore
+    
+    _snapshot = DataStore(data_dir, poll_interval=0).snapshot
+
+
+def score_rows(first_row, rows, snapshot):
+    """
+    Score a chunk of rows
+    
+    Args:
+        rows: Output of read_rows()
+    
+    Returns:
+        {column: [value per row]} for every name in COLUMNS
+    """
+    columns = {name: [] for name in COLUMNS}
+    for offset, record in enumerate(rows):
+        values = dict.fromkeys(COLUMNS)
+        values['row'] = first_row + offset
+        if isinstance(record, str):
+            try:
+                record = json.loads(record)
+            except ValueError as e:
+                record = {'_error': f'Invalid JSON: {e}'}
+            if not isinstance(record, dict):
+                record = {'_error': 'Row must be a JSON object'}
+        target_role = record.get('role')
+        values['id'] = record.get('id')
+        values['role'] = target_role
+        try:
+            if '_error' in record:
+                raise ValueError(record['_error'])
+            if target_role not in snapshot.job_roles:
+                raise ValueError('Invalid job role')
+            user_skills = record.get('skills') or {}
+            experience = record.get('experience') or 'fresher'
+            education = record.get('education') or 'bachelors'
+            location = record.get('location') or 'tier3'
+            
+            profile = normalize_profile(user_skills, snapshot.skill_resolver)
+            analysis = analyze_fit(target_role, user_skills, experience, education, snapshot.job_roles,
+                                   role_index=snapshot.role_index, profile=profile)
+            salary_range = estimate_salary(target_role, location, experience, analysis.fit_score,
+                                           snapshot.salary_data, snapshot.salary_table)
+            
+            values['fit_score'] = round(analysis.fit_score, 1)
+            values['skill_gaps'] = [gap.skill for gap in analysis.skill_gaps]
+            values['high_priority_gaps'] = [gap.skill for gap in analysis.high_priority_gaps]
+            values['salary_min'] = salary_range['min']
+            values['salary_max'] = salary_range['max']
+            values['salary_band'] = salary_range['factors'].get('market_band')
+        except Exception as e:
+            values['error'] = str(e)
+        for name in COLUMNS:
+            columns[name].append(values[name])
+    return columns
+
+
+def _score_chunk(output_dir, chunk_index, first_row, rows):
+    """Worker task: score one chunk and write its part file atomically"""
+    columns = score_rows(first_row, rows, _snapshot)
+    path = part_path(output_dir, chunk_index)
+    tmp_path = f'{path}.tmp-{os.getpid()}'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'chunk': chunk_index,
+            'first_row': first_row,
+            'rows': len(rows),
+            'data_version': _snapshot.version,
+            'columns': columns
+        }, f, separators=(',', ':'))
+    os.replace(tmp_path, path)
+    return chunk_index, len(rows), sum(error is not None for error in columns['error'])
+
+
+def _check_run(output_dir, input_path, chunk_size):
+    """Record the run settings, or check that a resumed run uses the same ones"""
+    settings = {'input': os.path.abspath(input_path), 'chunk_size': chunk_size}
+    path = os.path.join(output_dir, RUN_FILENAME)
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            previous = json.load(f)
+        if previous != settings:
+            raise ValueError(f'{output_dir} holds a run with different settings {previous}; '
+                             'use a new output directory')
+    else:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(settings, f)
+    
+    # Part files left half-written by an interrupted run
+    for name in os.listdir(output_dir):
+        if name.startswith('part-') and '.tmp-' in name:
+            os.remove(os.path.join(output_dir, name))
+
+
+def run(input_path, output_dir, input_format=None, chunk_size=DEFAULT_CHUNK_SIZE, workers=None,
+        start_chunk=0, data_dir=None, progress=None):
+    """
+    Score every row of input_path into output_dir
+    
+    Chunks whose part file already exists, and chunks before start_chunk,
+    are skipped. _SUCCESS is written only if every chunk of the input then
+    has a part file.
+    
+    Args:
+        input_format: 'csv' or 'jsonl'; guessed from the file extension if None
+        workers: Worker processes (default: CPU count)
+        progress: Optional callback(chunk_index, rows, errors) per finished chunk
+    
+    Returns:
+        Dict with the number of chunks scored and skipped, rows, errors and
+        missing_chunks (skipped chunks that have no part file)
+    """
+    from datastore import DATA_DIR
+    
+    if input_format is None:
+        input_format = 'csv' if input_path.lower().endswith('.csv') else 'jsonl'
+    os.makedirs(output_dir, exist_ok=True)
+    _check_run(output_dir, input_path, chunk_size)
+    workers = workers or os.cpu_count() or 1
+    
+    totals = {'chunks': 0, 'skipped_chunks': 0, 'missing_chunks': 0, 'rows': 0, 'errors': 0}
+    rows = read_rows(input_path, input_format)
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(data_dir or DATA_DIR,)) as pool:
+        pending = set()
+        for chunk_index in itertools.count():
+            chunk = list(itertools.islice(rows, chunk_size))
+            if not chunk:
+                break
+            if os.path.exists(part_path(output_dir, chunk_index)):
+                totals['skipped_chunks'] += 1
+                continue
+            if chunk_index < start_chunk:
+                totals['skipped_chunks'] += 1
+                totals['missing_chunks'] += 1
+                continue
+            
+            # Bound the chunks held in memory
+            if len(pending) >= workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    _record(future.result(), totals, progress)
+            pending.add(pool.submit(_score_chunk, output_dir, chunk_index, chunk_index * chunk_size, chunk))
+        
+        for future in pending:
+            _record(future.result(), totals, progress)
+    
+    if not totals['missing_chunks']:
+        with open(os.path.join(output_dir, SUCCESS_FILENAME), 'w', encoding='utf-8') as f:
+            json.dump(totals, f)
+    return totals
+
+
+def _record(result, totals, progress):
+    chunk_index, rows, errors = result
+    totals['chunks'] += 1
+    totals['rows'] += rows
+    totals['errors'] += errors
+    if progress is not None:
+        progress(chunk_index, rows, errors)
+
+
+def load_results(output_dir):
+    """
+    Read every part file of a run back
+    
+    Returns:
+        {column: [value per row]}, ordered by chunk
+    """
+    columns = {name: [] for name in COLUMNS}
+    parts = sorted(name for name in os.listdir(output_dir)
+                   if name.startswith('part-') and name.endswith('.json'))
+    for name in parts:
+        with open(os.path.join(output_dir, name), 'r', encoding='utf-8') as f:
+            part = json.load(f)
+        for column in COLUMNS:
+            columns[column].extend(part['columns'][column])
+    return columns
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Score a CSV or JSONL file of profiles offline')
+    parser.add_argument('input', help='CSV or JSONL file of profiles')
+    parser.add_argument('output_dir', help='directory for the columnar part files')
+    parser.add_argument('--format', choices=('csv', 'jsonl'), help='input format (default: from extension)')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='rows per chunk')
+    parser.add_argument('--workers', type=int, help='worker processes (default: CPU count)')
+    parser.add_argument('--start-chunk', type=int, default=0, help='skip the chunks before this offset')
+    parser.add_argument('--data-dir', help='market data folder (default: backend/data)')
+    args = parser.parse_args(argv)
+    
+    def progress(chunk_index, rows, errors):
+        print(f'chunk {chunk_index}: {rows} rows, {errors} errors', file=sys.stderr)
+    
+    start = time.perf_counter()
+    try:
+        totals = run(args.input, args.output_dir, args.format, args.chunk_size, args.workers,
+                     args.start_chunk, args.data_dir, progress)
+    except ValueError as e:
+        parser.exit(1, f'error: {e}\n')
+    elapsed = time.perf_counter() - start
+    print(f"Scored {totals['rows']} rows in {totals['chunks']} chunks "
+          f"({totals['skipped_chunks']} skipped, {totals['errors']} errors) "
+          f"in {elapsed:.1f}s - {totals['rows'] / max(elapsed, 1e-9):,.0f} rows/s")
+    if totals['missing_chunks']:
+        print(f"{totals['missing_chunks']} chunks before --start-chunk have no part file; "
+              f"{SUCCESS_FILENAME} was not written", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
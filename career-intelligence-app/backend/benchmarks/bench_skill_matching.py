@@ -0,0 +1,92 @@
+"""
+Benchmark: skill name resolution against a large synthetic skill catalogue
+
+Builds a SkillResolver over tens of thousands of made-up canonical skills
+plus an alias table, then resolves a list of synthetic user spellings
+(case changes, missing spaces, aliases and single typos). Each spelling is
+resolved once, so the memo never helps and the timings are cold lookups.
+
+Run from the backend folder:
+    python benchmarks/bench_skill_matching.py [canonical_skill_count]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from algorithms.skill_matching import SkillResolver
+
+SYLLABLES = ['da', 'ta', 'vis', 'ual', 'cloud', 'net', 'work', 'sec', 'ur', 'ity', 'ana',
+             'lyt', 'ics', 'dev', 'ops', 'mach', 'ine', 'learn', 'ing', 'graph', 'des',
+             'ign', 'mark', 'et', 'fin', 'ance', 'sys', 'tem', 'pro', 'duct', 'qu', 'ery']
+
+
+def make_name(rng):
+    words = []
+    for _ in range(rng.randint(1, 3)):
+        words.append(''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    return ' '.join(words).title()
+
+
+def misspell(rng, name):
+    """Apply one random edit to a letter of the name"""
+    letters = [i for i, ch in enumerate(name) if ch.isalpha()]
+    i = rng.choice(letters)
+    edit = rng.randrange(3)
+    if edit == 0:
+        return name[:i] + name[i + 1:]
+    if edit == 1:
+        return name[:i] + rng.choice('aeiou') + name[i:]
+    if i + 1 < len(name):
+        return name[:i] + name[i + 1] + name[i] + name[i + 2:]
+    return name + 'e'
+
+
+def main(count):
+    rng = random.Random(42)
+    canonical = list({make_name(rng): None for _ in range(count)})
+    aliases = {name: [f'{name} Pro', f'MS {name}'] for name in rng.sample(canonical, len(canonical) // 10)}
+    
+    start = time.perf_counter()
+    resolver = SkillResolver(canonical, aliases)
+    build_seconds = time.perf_counter() - start
+    
+    queries = []
+    for name in rng.sample(canonical, min(5000, len(canonical))):
+        variant = rng.randrange(4)
+        if variant == 0:
+            queries.append((name.upper(), name.lower()))
+        elif variant == 1:
+            queries.append((name.replace(' ', ''), name.lower()))
+        elif variant == 2 and name in aliases:
+            queries.append((rng.choice(aliases[name]).lower(), name.lower()))
+        else:
+            queries.append((misspell(rng, name), name.lower()))
+    
+    timings = []
+    correct = 0
+    for query, expected in queries:
+        start = time.perf_counter()
+        resolution = resolver.resolve(query)
+        timings.append(time.perf_counter() - start)
+        correct += resolution.skill_id == expected
+    
+    timings.sort()
+    
+    def percentile(p):
+        return timings[min(len(timings) - 1, int(p / 100 * len(timings)))] * 1e6
+    
+    print(f'canonical skills: {len(canonical)}, aliases: {sum(map(len, aliases.values()))}')
+    print(f'index build:      {build_seconds * 1000:.0f} ms')
+    print(f'queries:          {len(queries)}')
+    print(f'accuracy:         {correct / len(queries) * 100:.1f} %')
+    print(f'resolve p50:      {percentile(50):.1f} us')
+    print(f'resolve p99:      {percentile(99):.1f} us')
+    print(f'resolve max:      {timings[-1] * 1e6:.1f} us')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
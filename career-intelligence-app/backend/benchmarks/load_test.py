@@ -0,0 +1,131 @@
+"""
+HTTP load test for the analysis API
+
+Drives a running server with concurrent keep-alive clients posting
+/api/analyze requests and reports throughput and latency percentiles.
+
+Run against a server started with e.g.
+    gunicorn -c gunicorn.conf.py app:app
+then:
+    python benchmarks/load_test.py --url http://127.0.0.1:5000 --concurrency 16 --duration 10
+
+--unique sends a different profile on every request so that the result
+cache never answers; without it a small fixed set of profiles is reused.
+503 responses from admission control are counted as rejected, not as
+errors. --latency-budget-ms adds latency_budget_ms to every request.
+"""
+
+import argparse
+import http.client
+import json
+import random
+import threading
+import time
+from urllib.parse import urlparse
+
+ROLES = ['Data Analyst', 'Software Engineer', 'Product Manager',
+         'Digital Marketing Specialist', 'Business Analyst']
+SKILLS = ['SQL', 'Excel', 'Python', 'Power BI', 'Statistics', 'Tableau', 'Communication',
+          'Git/Version Control', 'Google Analytics', 'Data Structures & Algorithms',
+          'Product Strategy', 'SEO/SEM', 'Requirements Gathering', 'Testing']
+LEVELS = ['beginner', 'intermediate', 'advanced', 'expert']
+
+
+def make_profile(rng):
+    return {
+        'role': rng.choice(ROLES),
+        'skills': {skill: rng.choice(LEVELS) for skill in rng.sample(SKILLS, rng.randint(1, 8))},
+        'experience': rng.choice(['fresher', '1-2', '3-5', '5+']),
+        'education': rng.choice(['diploma', 'bachelors', 'masters', 'phd']),
+        'location': rng.choice(['tier1', 'tier2', 'tier3', 'remote'])
+    }
+
+
+def client(url, deadline, unique, seed, latencies, errors, rejected, budget_ms=None):
+    rng = random.Random(seed)
+    
+    def make_body():
+        profile = make_profile(rng)
+        if budget_ms is not None:
+            profile['latency_budget_ms'] = budget_ms
+        return json.dumps(profile)
+    
+    fixed = [make_body() for _ in range(20)]
+    connection = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=30)
+    headers = {'Content-Type': 'application/json'}
+    while time.perf_counter() < deadline:
+        body = make_body() if unique else rng.choice(fixed)
+        start = time.perf_counter()
+        try:
+            connection.request('POST', '/api/analyze', body, headers)
+            response = connection.getresponse()
+            response.read()
+            if response.status == 503:
+                rejected.append(time.perf_counter() - start)
+                continue
+            if response.status != 200:
+                errors.append(response.status)
+        except (OSError, http.client.HTTPException) as e:
+            errors.append(repr(e))
+            connection.close()
+            connection = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=30)
+            continue
+        latencies.append(time.perf_counter() - start)
+    connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--url', default='http://127.0.0.1:5000')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--unique', action='store_true', help='never repeat a profile')
+    parser.add_argument('--latency-budget-ms', type=float, help='latency_budget_ms sent with every request')
+    parser.add_argument('--json', action='store_true', help='print machine-readable results')
+    args = parser.parse_args()
+    
+    url = urlparse(args.url)
+    latencies = []
+    errors = []
+    rejected = []
+    deadline = time.perf_counter() + args.duration
+    threads = [
+        threading.Thread(target=client, args=(url, deadline, args.unique, seed, latencies, errors, rejected,
+                                              args.latency_budget_ms))
+        for seed in range(args.concurrency)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    
+    latencies.sort()
+    
+    def percentile(p):
+        if not latencies:
+            return None
+        return round(latencies[min(len(latencies) - 1, int(p / 100 * len(latencies)))] * 1000, 2)
+    
+    result = {
+        'requests': len(latencies),
+        'errors': len(errors),
+        'rejected': len(rejected),
+        'concurrency': args.concurrency,
+        'duration_seconds': round(elapsed, 2),
+        'requests_per_second': round(len(latencies) / elapsed, 1),
+        'latency_ms': {'p50': percentile(50), 'p95': percentile(95), 'p99': percentile(99)}
+    }
+    if args.json:
+        print(json.dumps(result))
+    else:
+        print(f"requests:   {result['requests']} ({result['errors']} errors, "
+              f"{result['rejected']} rejected with 503)")
+        print(f"throughput: {result['requests_per_second']} req/s at concurrency {args.concurrency}")
+        print(f"latency:    p50 {result['latency_ms']['p50']} ms, "
+              f"p95 {result['latency_ms']['p95']} ms, p99 {result['latency_ms']['p99']} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,1016 @@
+"""
+Benchmark suite for the algorithms package and the HTTP endpoints
+
+Microbenchmarks every public function of the algorithms package on the
+real market data and on synthetic catalogues (varying role counts, skill
+counts and skill name casing), plus end-to-end /api/analyze requests
+through Flask's test client. All inputs are seeded, so runs are
+reproducible.
+
+Results are written as JSON with p50/p95/p99 per benchmark (microseconds
+per call), plus the response sizes of the serialization layer and the
+CPU it saves per request, and the allocations and memory per call of the
+analysis pipeline (tracemalloc). Given a baseline file, the run fails (exit status 1) when any
+benchmark's p50 is slower than the baseline by more than the threshold.
+
+Timings on a shared machine vary by tens of percent from run to run.
+--repeat N runs the whole suite N times and keeps each benchmark's median
+percentiles, which is what both a baseline refresh and a check should use.
+Benchmarks over the threshold are timed again before they count as
+regressions.
+The baseline is refreshed deliberately, in a commit of its own; a change
+that adds benchmarks only adds their entries (--add-to-baseline) and
+leaves every recorded value alone.
+
+Run from the backend folder:
+    python benchmarks/run.py                                  # print results
+    python benchmarks/run.py --output results.json
+    python benchmarks/run.py --repeat 5 --baseline benchmarks/baseline.json --threshold 0.3
+    python benchmarks/run.py --repeat 5 --save-baseline benchmarks/baseline.json
+    python benchmarks/run.py --filter peers. --add-to-baseline benchmarks/baseline.json
+    python benchmarks/run.py --filter scoring.                # subset by name
+"""
+
+import argparse
+import gc
+import itertools
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DATA_RELOAD_INTERVAL', '0')
+
+from algorithms import models, planner, recommendations, role_matching, salary_estimation, scoring, skill_matching
+from datastore import DataStore
+from metrics import MetricsRegistry
+import admission
+import peers
+import serialization
+import warmup
+from synthetic import make_job_roles, make_profiles
+
+# Target wall time of one timed round, rounds per benchmark, and the
+# time budget that caps the rounds of slow benchmarks
+ROUND_SECONDS = 0.002
+ROUNDS = 60
+MIN_ROUNDS = 10
+BENCHMARK_SECONDS = 1.0
+
+# Requests per end-to-end benchmark
+HTTP_REQUESTS = 400
+
+BENCHMARKS = []
+
+
+def benchmark(name):
+    """Register a setup function returning the zero-argument callable to time"""
+    def register(setup):
+        BENCHMARKS.append((name, setup))
+        return setup
+    return register
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    
+    def pick(p):
+        return samples[min(len(samples) - 1, int(p / 100 * len(samples)))]
+    
+    return {
+        'p50': round(pick(50), 3),
+        'p95': round(pick(95), 3),
+        'p99': round(pick(99), 3),
+        'samples': len(samples)
+    }
+
+
+def time_callable(func):
+    """
+    Per-call time samples in microseconds
+    
+    The call count per round is calibrated so each round lasts about
+    ROUND_SECONDS; every round gives one sample (its mean per call).
+    """
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= ROUND_SECONDS / 4 or number >= 1 << 20:
+            break
+        number *= 2
+    per_call = elapsed / number
+    number = max(1, int(ROUND_SECONDS / per_call))
+    rounds = max(MIN_ROUNDS, min(ROUNDS, int(BENCHMARK_SECONDS / (number * per_call))))
+    
+    samples = []
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(rounds):
+            start = time.perf_counter()
+            for _ in range(number):
+                func()
+            samples.append((time.perf_counter() - start) / number * 1e6)
+    finally:
+        if gc_enabled:
+            gc.enable()
+    return samples
+
+
+# ---------------------------------------------------------------------------
+# Fixtures
+
+SNAPSHOT = DataStore(poll_interval=0).snapshot
+REAL_ROLES = list(SNAPSHOT.job_roles.keys())
+REAL_SKILLS = sorted({skill for role in SNAPSHOT.role_index.values() for skill in role.skills})
+
+
+def real_profile(skill_count, casing='exact', seed=1):
+    return make_profiles(1, REAL_SKILLS, skill_count, casing, seed)[0]
+
+
+SYNTHETIC = {}
+
+
+def synthetic(role_count):
+    """Synthetic catalogue with role_count roles, plus its indexes (memoized)"""
+    if role_count not in SYNTHETIC:
+        job_roles = make_job_roles(role_count, skill_pool_size=max(50, role_count * 2), seed=role_count)
+        role_index = scoring.build_role_index(job_roles)
+        skills = sorted({skill for role in role_index.values() for skill in role.skills})
+        SYNTHETIC[role_count] = {
+            'job_roles': job_roles,
+            'role_index': role_index,
+            'role_matrix': scoring.build_role_matrix(role_index),
+            'inverted_index': role_matching.build_inverted_index(role_index),
+            'skills': skills
+        }
+    return SYNTHETIC[role_count]
+
+
+# ---------------------------------------------------------------------------
+# algorithms.scoring
+
+@benchmark('scoring.get_proficiency_weight')
+def _():
+    return lambda: scoring.get_proficiency_weight('Advanced')
+
+
+for _count in (5, 500):
+    @benchmark(f'scoring.build_role_index[roles={_count}]')
+    def _(count=_count):
+        job_roles = SNAPSHOT.job_roles if count == 5 else synthetic(count)['job_roles']
+        return lambda: scoring.build_role_index(job_roles)
+
+
+for _skills in (3, 10, 30):
+    for _casing in ('exact', 'mixed'):
+        @benchmark(f'scoring.normalize_profile[skills={_skills},casing={_casing}]')
+        def _(skills=_skills, casing=_casing):
+            user_skills = real_profile(skills, casing)['skills']
+            resolver = SNAPSHOT.skill_resolver
+            return lambda: scoring.normalize_profile(user_skills, resolver)
+
+
+for _skills in (3, 10, 30):
+    @benchmark(f'scoring.analyze_fit[skills={_skills}]')
+    def _(skills=_skills):
+        user = real_profile(skills)
+        profile = scoring.normalize_profile(user['skills'])
+        return lambda: scoring.analyze_fit(
+            'Data Analyst', user['skills'], user['experience'], user['education'],
+            SNAPSHOT.job_roles, SNAPSHOT.role_index, profile
+        )
+
+
+@benchmark('scoring.calculate_job_fit')
+def _():
+    user = real_profile(8)
+    return lambda: scoring.calculate_job_fit(
+        'Data Analyst', user['skills'], user['experience'], user['education'],
+        SNAPSHOT.job_roles, SNAPSHOT.role_index
+    )
+
+
+@benchmark('scoring.analyze_strengths')
+def _():
+    user = real_profile(8)
+    return lambda: scoring.analyze_strengths('Data Analyst', user['skills'], SNAPSHOT.job_roles,
+                                             SNAPSHOT.role_index)
+
+
+@benchmark('scoring.identify_skill_gaps')
+def _():
+    user = real_profile(8)
+    return lambda: scoring.identify_skill_gaps('Data Analyst', user['skills'], SNAPSHOT.job_roles,
+                                               SNAPSHOT.role_index)
+
+
+@benchmark('scoring.build_role_matrix[roles=500]')
+def _():
+    role_index = synthetic(500)['role_index']
+    return lambda: scoring.build_role_matrix(role_index)
+
+
+for _count in (5, 500):
+    @benchmark(f'scoring.batch_job_fit[roles={_count},profiles=10]')
+    def _(count=_count):
+        if count == 5:
+            matrix, skills = SNAPSHOT.role_matrix, REAL_SKILLS
+        else:
+            matrix, skills = synthetic(count)['role_matrix'], synthetic(count)['skills']
+        profiles = make_profiles(10, skills, 10, seed=count)
+        return lambda: scoring.batch_job_fit(profiles, matrix)
+
+
+@benchmark('scoring.build_fit_state')
+def _():
+    user = real_profile(10)
+    return lambda: scoring.build_fit_state('Data Analyst', user['skills'], SNAPSHOT.job_roles,
+                                           SNAPSHOT.role_index, SNAPSHOT.skill_resolver)
+
+
+@benchmark('scoring.update_fit_state[changes=1]')
+def _():
+    user = real_profile(10)
+    state = scoring.build_fit_state('Data Analyst', user['skills'], SNAPSHOT.job_roles,
+                                    SNAPSHOT.role_index, SNAPSHOT.skill_resolver)
+    return lambda: scoring.update_fit_state(state, {'SQL': 'expert'}, SNAPSHOT.skill_resolver)
+
+
+# One change to a profile holding half of a role's skills - flat as the role grows
+for _role_skills in (10, 100, 1000):
+    @benchmark(f'scoring.update_fit_state[role_skills={_role_skills}]')
+    def _(role_skills=_role_skills):
+        job_roles = make_job_roles(1, role_skills, skills_per_role=role_skills, seed=role_skills)
+        role_index = scoring.build_role_index(job_roles)
+        skills = list(job_roles['Role 00000']['required_skills'])
+        user_skills = {skill: 'intermediate' for skill in skills[::2]}
+        state = scoring.build_fit_state('Role 00000', user_skills, job_roles, role_index)
+        changes = [{skills[0]: 'expert'}, {skills[0]: None}, {skills[1]: 'advanced'}, {skills[1]: None}]
+        calls = itertools.cycle(changes)
+        return lambda: scoring.update_fit_state(state, next(calls))
+
+
+@benchmark('scoring.fit_state_result')
+def _():
+    user = real_profile(10)
+    state = scoring.build_fit_state('Data Analyst', user['skills'], SNAPSHOT.job_roles,
+                                    SNAPSHOT.role_index, SNAPSHOT.skill_resolver)
+    return lambda: scoring.fit_state_result(state, 'fresher', 'bachelors')
+
+
+# ---------------------------------------------------------------------------
+# algorithms.role_matching
+
+@benchmark('role_matching.build_inverted_index[roles=500]')
+def _():
+    role_index = synthetic(500)['role_index']
+    return lambda: role_matching.build_inverted_index(role_index)
+
+
+for _count in (5, 500, 5000):
+    @benchmark(f'role_matching.match_roles[roles={_count}]')
+    def _(count=_count):
+        if count == 5:
+            data = {'inverted_index': SNAPSHOT.inverted_index, 'role_index': SNAPSHOT.role_index,
+                    'skills': REAL_SKILLS}
+        else:
+            data = synthetic(count)
+        profile = scoring.normalize_profile(make_profiles(1, data['skills'], 10, seed=count)[0]['skills'])
+        return lambda: role_matching.match_roles(profile, data['inverted_index'], data['role_index'])
+
+
+# ---------------------------------------------------------------------------
+# algorithms.skill_matching
+
+@benchmark('skill_matching.compact_skill_name')
+def _():
+    return lambda: skill_matching.compact_skill_name('Data Structures & Algorithms')
+
+
+@benchmark('skill_matching.SkillResolver.resolve[memoized]')
+def _():
+    resolver = SNAPSHOT.skill_resolver
+    resolver.resolve('MS Excel')
+    return lambda: resolver.resolve('MS Excel')
+
+
+for _kind, _name in (('exact', 'power bi'), ('alias', 'postgres'), ('typo', 'Tablaeu'),
+                     ('similar', 'Presentation skill'), ('unknown', 'Underwater Welding')):
+    @benchmark(f'skill_matching.SkillResolver.resolve[cold,{_kind}]')
+    def _(name=_name):
+        resolver = SNAPSHOT.skill_resolver
+        return lambda: resolver._resolve(name)
+
+
+# ---------------------------------------------------------------------------
+# algorithms.salary_estimation
+
+@benchmark('salary_estimation.estimate_salary')
+def _():
+    return lambda: salary_estimation.estimate_salary('Data Analyst', 'tier2', '1-2', 62.5,
+                                                     SNAPSHOT.salary_data, SNAPSHOT.salary_table)
+
+
+@benchmark('salary_estimation.estimate_salary[no table]')
+def _():
+    return lambda: salary_estimation.estimate_salary('Data Analyst', 'tier2', '1-2', 62.5,
+                                                     SNAPSHOT.salary_data)
+
+
+@benchmark('salary_estimation.build_salary_table')
+def _():
+    return lambda: salary_estimation.build_salary_table(SNAPSHOT.salary_data)
+
+
+@benchmark('salary_estimation.salary_projection')
+def _():
+    fit_scores = [40.0, 45.0, 50.0, 55.0]
+    return lambda: salary_estimation.salary_projection('Data Analyst', fit_scores, SNAPSHOT.salary_data,
+                                                       SNAPSHOT.salary_table)
+
+
+@benchmark('salary_estimation.get_salary_note')
+def _():
+    return lambda: salary_estimation.get_salary_note('fresher', 45.0, 'tier3')
+
+
+# ---------------------------------------------------------------------------
+# algorithms.recommendations
+
+@benchmark('recommendations.build_recommendation_index')
+def _():
+    return lambda: recommendations.build_recommendation_index(SNAPSHOT.job_roles, SNAPSHOT.skills_database,
+                                                              SNAPSHOT.recommendation_content)
+
+
+@benchmark('recommendations.generate_recommendations')
+def _():
+    user = real_profile(5)
+    analysis = scoring.analyze_fit('Data Analyst', user['skills'], 'fresher', 'bachelors',
+                                   SNAPSHOT.job_roles, SNAPSHOT.role_index)
+    return lambda: recommendations.generate_recommendations(
+        'Data Analyst', user['skills'], analysis.skill_gaps, 'fresher',
+        SNAPSHOT.job_roles, SNAPSHOT.skills_database, analysis.high_priority_gaps,
+        SNAPSHOT.recommendation_index
+    )
+
+
+@benchmark('recommendations.generate_recommendations[unmemoized]')
+def _():
+    user = real_profile(5)
+    analysis = scoring.analyze_fit('Data Analyst', user['skills'], 'fresher', 'bachelors',
+                                   SNAPSHOT.job_roles, SNAPSHOT.role_index)
+    index = SNAPSHOT.recommendation_index
+    
+    def call():
+        index.memo.clear()
+        return recommendations.generate_recommendations(
+            'Data Analyst', user['skills'], analysis.skill_gaps, 'fresher',
+            SNAPSHOT.job_roles, SNAPSHOT.skills_database, analysis.high_priority_gaps, index
+        )
+    return call
+
+
+@benchmark('recommendations.get_learning_time')
+def _():
+    return lambda: recommendations.get_learning_time('Beginner', 'Advanced')
+
+
+@benchmark('recommendations.generate_timeline')
+def _():
+    gaps = [models.SkillGap(skill, 'None', 'Intermediate', priority, '')
+            for skill, priority in (('SQL', 'High'), ('Excel', 'Medium'), ('Python', 'High'))]
+    return lambda: recommendations.generate_timeline(gaps, 'fresher')
+
+
+@benchmark('recommendations.generate_job_search_tips')
+def _():
+    return lambda: recommendations.generate_job_search_tips('Data Analyst', 'fresher', 4)
+
+
+# ---------------------------------------------------------------------------
+# algorithms.planner
+
+for _count in (1, 5):
+    for _memoized in (True, False):
+        @benchmark(f'planner.plan_learning_path[roles={_count},weeks=52'
+                   f'{"" if _memoized else ",unmemoized"}]')
+        def _(count=_count, memoized=_memoized):
+            profile = scoring.normalize_profile(real_profile(5)['skills'])
+            index = SNAPSHOT.planner_index
+            
+            def call():
+                if not memoized:
+                    index.memo.clear()
+                return planner.plan_learning_path(
+                    REAL_ROLES[:count], profile, 52, SNAPSHOT.job_roles, SNAPSHOT.role_index, index,
+                    salary_data=SNAPSHOT.salary_data, salary_table=SNAPSHOT.salary_table
+                )
+            return call
+
+
+# Hundreds of candidate skills: synthetic roles requiring 300 skills each
+for _count in (1, 5):
+    @benchmark(f'planner.plan_learning_path[roles={_count},skills=300,weeks=104,unmemoized]')
+    def _(count=_count):
+        job_roles = make_job_roles(count, 600, skills_per_role=300, seed=3)
+        role_index = scoring.build_role_index(job_roles)
+        skills = sorted({skill for role in role_index.values() for skill in role.skills})
+        profile = scoring.normalize_profile({skill: 'Beginner' for skill in skills[::3]})
+        index = planner.build_planner_index(SNAPSHOT.skills_database, SNAPSHOT.recommendation_content)
+        
+        def call():
+            index.memo.clear()
+            return planner.plan_learning_path(list(job_roles), profile, 104, job_roles, role_index, index)
+        return call
+
+
+# ---------------------------------------------------------------------------
+# Warm start: ranking the candidate profiles and restoring precomputed results
+
+def _warm_start_key(payload):
+    import app as app_module
+    
+    return app_module.profile_key(payload, SNAPSHOT)
+
+
+@benchmark('warmup.rank_profiles[candidates=960]')
+def _():
+    candidates = warmup.candidate_profiles(SNAPSHOT.role_index)
+    traffic = _analyze_payloads(200, 7)
+    return lambda: warmup.rank_profiles(candidates, traffic, _warm_start_key)
+
+
+@benchmark('warmup.load_warm_start[results=960]')
+def _():
+    import app as app_module
+    
+    payloads = warmup.candidate_profiles(SNAPSHOT.role_index)
+    results = [(payload, app_module.run_analysis(payload, SNAPSHOT)) for payload in payloads]
+    path = os.path.join(tempfile.mkdtemp(), warmup.WARM_START_FILENAME)
+    warmup.save_warm_start(path, SNAPSHOT.version, results)
+    return lambda: warmup.load_warm_start(path, SNAPSHOT.version)
+
+
+# ---------------------------------------------------------------------------
+# Peer comparison: a million shared profiles of one role, as distinct
+# vectors with row counts
+
+# Share of rows at each quarter (missing, beginner ... expert)
+PEER_QUARTER_WEIGHTS = (0.3, 0.15, 0.25, 0.2, 0.1)
+
+
+def _peer_index(role, rows, distinct, seed):
+    rng = random.Random(seed)
+    index = peers.RolePeers(role)
+    for _ in range(distinct):
+        vector = bytes(rng.choices(range(5), PEER_QUARTER_WEIGHTS, k=len(role.keys)))
+        index.add(vector, rng.randrange(peers.SCORE_BUCKETS), max(1, rows // distinct))
+    return index
+
+
+def _peer_queries(role, count, seed):
+    rng = random.Random(seed)
+    return [bytes(rng.choices(range(5), PEER_QUARTER_WEIGHTS, k=len(role.keys))) for _ in range(count)]
+
+
+for _rows, _distinct in ((2000, 2000), (1000000, 50000)):
+    @benchmark(f'peers.RolePeers.nearest[rows={_rows},distinct={_distinct},k=10]')
+    def _(rows=_rows, distinct=_distinct):
+        role = SNAPSHOT.role_index['Data Analyst']
+        index = _peer_index(role, rows, distinct, 8)
+        queries = iter(_peer_queries(role, 100000, 9))
+        return lambda: index.nearest(next(queries), 10)
+
+
+# Hundreds of skills: the lattice search runs out of probes and is approximate
+@benchmark('peers.RolePeers.nearest[rows=1000000,distinct=50000,skills=300,k=10]')
+def _():
+    role = next(iter(scoring.build_role_index(make_job_roles(1, 600, skills_per_role=300, seed=3)).values()))
+    index = _peer_index(role, 1000000, 50000, 8)
+    queries = iter(_peer_queries(role, 100000, 9))
+    return lambda: index.nearest(next(queries), 10)
+
+
+@benchmark('peers.PeerStore.compare[rows=1000000]')
+def _():
+    role = SNAPSHOT.role_index['Data Analyst']
+    store = peers.PeerStore(os.path.join(tempfile.mkdtemp(), peers.PEER_STORE_FILENAME), SNAPSHOT.role_index)
+    store._indexes['Data Analyst'] = _peer_index(role, 1000000, 50000, 8)
+    profile = scoring.normalize_profile(real_profile(5)['skills'])
+    return lambda: store.compare('Data Analyst', profile, 42.0)
+
+
+@benchmark('peers.PeerStore.rebuild[rows=100000]')
+def _():
+    path = os.path.join(tempfile.mkdtemp(), peers.PEER_STORE_FILENAME)
+    store = peers.PeerStore(path, SNAPSHOT.role_index)
+    for payload in _analyze_payloads(200, 10):
+        store.record(payload['role'], scoring.normalize_profile(payload['skills']), 50.0)
+    with open(path, 'rb') as f:
+        lines = f.read()
+    with open(path, 'wb') as f:
+        f.write(lines * 500)
+    return lambda: store.rebuild(SNAPSHOT.role_index)
+
+
+@benchmark('peers.PeerStore.record')
+def _():
+    store = peers.PeerStore(os.path.join(tempfile.mkdtemp(), peers.PEER_STORE_FILENAME), SNAPSHOT.role_index)
+    profile = scoring.normalize_profile(real_profile(5)['skills'])
+    return lambda: store.record('Data Analyst', profile, 42.0)
+
+
+# ---------------------------------------------------------------------------
+# Instrumentation overhead: the stage timers of one /api/analyze request
+
+ANALYZE_STAGES = ('decode', 'normalize', 'cache_lookup', 'analyze_fit', 'estimate_salary',
+                  'generate_recommendations', 'serialize')
+
+for _enabled in (True, False):
+    @benchmark(f"metrics.stage_timer[{'enabled' if _enabled else 'disabled'}]")
+    def _(enabled=_enabled):
+        registry = MetricsRegistry(enabled=enabled)
+        histogram = registry.histogram('bench_stage_seconds', 'bench', ('role', 'stage'))
+        
+        def request():
+            timer = registry.stage_timer(histogram)
+            for stage in ANALYZE_STAGES:
+                timer.mark(stage)
+            timer.finish('Data Analyst')
+        
+        return request
+
+
+# ---------------------------------------------------------------------------
+# Admission control: the per-request overhead in front of an uncached analysis
+
+@benchmark('admission.AdmissionController.acquire+release')
+def _():
+    controller = admission.AdmissionController(max_concurrency=4)
+    
+    def request():
+        controller.acquire()
+        controller.release()
+    
+    return request
+
+
+@benchmark('admission.RequestCoalescer.run')
+def _():
+    coalescer = admission.RequestCoalescer()
+    key = ('v1', 'Data Analyst', (('sql', 'advanced'),), 'fresher', 'bachelors', 'tier3')
+    return lambda: coalescer.run(key, tuple)
+
+
+@benchmark('admission.LatencyBudget.choose')
+def _():
+    costs = admission.SectionCosts()
+    costs.observe('full', 0.001)
+    costs.observe('lite', 0.0001)
+    return lambda: admission.LatencyBudget(5.0, costs).choose(('full', 'lite'))
+
+
+# ---------------------------------------------------------------------------
+# Serialization: one /api/analyze response encoded like jsonify does, and
+# with pre-encoded fragments spliced in
+
+def _analyze_response_parts():
+    user = real_profile(5)
+    role = 'Data Analyst'
+    analysis = scoring.analyze_fit(role, user['skills'], 'fresher', 'bachelors',
+                                   SNAPSHOT.job_roles, SNAPSHOT.role_index)
+    fields = {
+        'job_fit_score': round(analysis.fit_score, 1),
+        'strengths': analysis.strengths,
+        'skill_gaps': analysis.skill_gaps,
+        'salary_estimate': salary_estimation.estimate_salary(role, 'tier3', 'fresher', analysis.fit_score,
+                                                             SNAPSHOT.salary_data, SNAPSHOT.salary_table),
+        'recommendations': recommendations.generate_recommendations(
+            role, user['skills'], analysis.skill_gaps, 'fresher', SNAPSHOT.job_roles,
+            SNAPSHOT.skills_database, analysis.high_priority_gaps, SNAPSHOT.recommendation_index
+        ),
+        'role_info': {'title': role, 'description': SNAPSHOT.job_roles[role].get('description', '')},
+        'result_token': 'x' * 80
+    }
+    return role, fields
+
+
+def _jsonify_dumps():
+    import app as app_module
+    
+    # The analysis types are encoded through their to_dict(), as the app does
+    return lambda value: app_module.app.json.dumps(value, default=serialization._default).encode('utf-8')
+
+
+def _spliced(role, fields):
+    fragments = SNAPSHOT.response_fragments
+    return serialization.encode_object(dict(
+        fields,
+        recommendations=fragments.shared(fields['recommendations']),
+        role_info=fragments.role_info(role)
+    ))
+
+
+@benchmark('serialization.analyze_response[jsonify]')
+def _():
+    _, fields = _analyze_response_parts()
+    encode = _jsonify_dumps()
+    return lambda: encode(fields)
+
+
+@benchmark('serialization.analyze_response[fragments]')
+def _():
+    role, fields = _analyze_response_parts()
+    return lambda: _spliced(role, fields)
+
+
+@benchmark('serialization.precompress[/api/skills]')
+def _():
+    body = SNAPSHOT.response_fragments.role_skills('Data Analyst').identity
+    return lambda: serialization.precompress(body)
+
+
+def response_sizes():
+    """Bytes per response: jsonify vs the serialization layer, and precompressed"""
+    role, fields = _analyze_response_parts()
+    sizes = {
+        '/api/analyze': {
+            'jsonify': len(_jsonify_dumps()(fields)),
+            'fragments': len(_spliced(role, fields))
+        }
+    }
+    fragments = SNAPSHOT.response_fragments
+    for path, body in (('/api/roles', fragments.roles),
+                       ('/api/skills/Data Analyst', fragments.role_skills('Data Analyst'))):
+        sizes[path] = {encoding: len(data) if data is not None else None
+                       for encoding, data in body._asdict().items()}
+    return sizes
+
+
+def savings(results, sizes):
+    """CPU microseconds and bytes saved per /api/analyze response"""
+    baseline = results.get('serialization.analyze_response[jsonify]')
+    spliced = results.get('serialization.analyze_response[fragments]')
+    analyze = sizes['/api/analyze']
+    return {
+        'cpu_us_per_response': round(baseline['p50'] - spliced['p50'], 3) if baseline and spliced else None,
+        'bytes_per_response': analyze['jsonify'] - analyze['fragments']
+    }
+
+
+# ---------------------------------------------------------------------------
+# End to end
+
+def http_benchmark(path, payloads, clear_cache, metrics_enabled=True, method='POST', status=200):
+    """
+    Per-request latency samples (microseconds) through the Flask test client
+    
+    POST payloads are sent as NDJSON bodies if they are bytes, as JSON
+    otherwise. GET payloads are the request headers.
+    """
+    import app as app_module
+    
+    def post(payload):
+        if method == 'GET':
+            return client.get(path, headers=payload)
+        if isinstance(payload, bytes):
+            response = client.post(path, data=payload, content_type='application/x-ndjson')
+            response.get_data()  # drain the streamed body
+            return response
+        return client.post(path, json=payload)
+    
+    app_module.METRICS.enabled = metrics_enabled
+    client = app_module.app.test_client()
+    post(payloads[0])
+    samples = []
+    for i in range(HTTP_REQUESTS):
+        payload = payloads[i % len(payloads)]
+        if clear_cache:
+            app_module.RESULT_CACHE.clear()
+        start = time.perf_counter()
+        response = post(payload)
+        samples.append((time.perf_counter() - start) * 1e6)
+        if response.status_code != status:
+            raise RuntimeError(f'{path} returned {response.status_code}: {response.get_data(as_text=True)}')
+    return samples
+
+
+def _analyze_payloads(count, seed):
+    payloads = make_profiles(count, REAL_SKILLS, 6, casing='mixed', seed=seed)
+    for i, payload in enumerate(payloads):
+        payload['role'] = REAL_ROLES[i % len(REAL_ROLES)]
+    return payloads
+
+
+def _delta_payloads(count, seed):
+    import app as app_module
+    
+    client = app_module.app.test_client()
+    payloads = []
+    for i, payload in enumerate(_analyze_payloads(count, seed)):
+        token = client.post('/api/analyze', json=payload).get_json()['result_token']
+        skill = REAL_SKILLS[i % len(REAL_SKILLS)]
+        payloads.append({'result_token': token, 'changes': {skill: 'expert'}})
+    return payloads
+
+
+def _catalogue_etag():
+    import app as app_module
+    
+    return app_module.app.test_client().get('/api/catalogue').headers['ETag']
+
+
+HTTP_BENCHMARKS = {
+    'http./api/analyze[uncached]': lambda: http_benchmark('/api/analyze', _analyze_payloads(50, 1), True),
+    'http./api/analyze[uncached,metrics=off]':
+        lambda: http_benchmark('/api/analyze', _analyze_payloads(50, 1), True, metrics_enabled=False),
+    'http./api/analyze[uncached,latency_budget_ms=50]': lambda: http_benchmark(
+        '/api/analyze', [dict(payload, latency_budget_ms=50) for payload in _analyze_payloads(50, 1)], True
+    ),
+    'http./api/analyze[cached]': lambda: http_benchmark('/api/analyze', _analyze_payloads(5, 2), False),
+    'http./api/analyze/delta': lambda: http_benchmark('/api/analyze/delta', _delta_payloads(20, 5), False),
+    'http./api/analyze/batch': lambda: http_benchmark('/api/analyze/batch', _analyze_payloads(20, 3), False),
+    'http./api/analyze/stream[profiles=50]': lambda: http_benchmark(
+        '/api/analyze/stream',
+        [''.join(json.dumps(payload) + '\n' for payload in _analyze_payloads(50, 4)).encode()],
+        False
+    ),
+    'http./api/plan[roles=2]': lambda: http_benchmark('/api/plan', [
+        dict(payload, roles=REAL_ROLES[:2], budget_weeks=26) for payload in _analyze_payloads(20, 6)
+    ], False),
+    'http./api/peers': lambda: http_benchmark('/api/peers', _analyze_payloads(20, 4), False),
+    'http./api/roles': lambda: http_benchmark('/api/roles', [{}], False, method='GET'),
+    'http./api/skills/<role>': lambda: http_benchmark('/api/skills/Data Analyst', [{}], False, method='GET'),
+    'http./api/skills/<role>[gzip]': lambda: http_benchmark(
+        '/api/skills/Data Analyst', [{'Accept-Encoding': 'gzip, br'}], False, method='GET'
+    ),
+    'http./api/catalogue[gzip]': lambda: http_benchmark(
+        '/api/catalogue', [{'Accept-Encoding': 'gzip, br'}], False, method='GET'
+    ),
+    'http./api/catalogue[304]': lambda: http_benchmark(
+        '/api/catalogue', [{'Accept-Encoding': 'gzip, br', 'If-None-Match': _catalogue_etag()}], False,
+        method='GET', status=304
+    ),
+}
+
+
+# ---------------------------------------------------------------------------
+# Memory: allocations and bytes per call, traced with tracemalloc
+
+ALLOCATION_CALLS = 200
+
+
+def allocation_profile(func, calls=ALLOCATION_CALLS):
+    """
+    Memory allocated per call of func
+    
+    The results of all calls are kept alive until they are counted, so
+    what a call returns is included even if real callers free it soon
+    after. Objects shared between calls (memoized or precompiled) are not.
+    
+    Returns:
+        Dict with blocks_per_call and bytes_per_call (held by one result)
+        and peak_bytes (high-water mark during one call)
+    """
+    func()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        func()
+        peak_bytes = tracemalloc.get_traced_memory()[1] - current
+        
+        before = tracemalloc.take_snapshot()
+        results = [func() for _ in range(calls)]
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    del results
+    
+    stats = after.compare_to(before, 'filename')
+    return {
+        'blocks_per_call': round(sum(stat.count_diff for stat in stats) / calls, 1),
+        'bytes_per_call': round(sum(stat.size_diff for stat in stats) / calls),
+        'peak_bytes': peak_bytes
+    }
+
+
+def _analysis_pipeline():
+    """normalize_profile -> analyze_fit -> generate_recommendations, as /api/analyze runs them"""
+    user = real_profile(10, 'mixed')
+    role = 'Data Analyst'
+    
+    def analyze():
+        profile = scoring.normalize_profile(user['skills'], SNAPSHOT.skill_resolver)
+        analysis = scoring.analyze_fit(role, user['skills'], user['experience'], user['education'],
+                                       SNAPSHOT.job_roles, SNAPSHOT.role_index, profile)
+        recommendations.generate_recommendations(
+            role, user['skills'], analysis.skill_gaps, user['experience'], SNAPSHOT.job_roles,
+            SNAPSHOT.skills_database, analysis.high_priority_gaps, SNAPSHOT.recommendation_index
+        )
+        return profile, analysis
+    return analyze
+
+
+def _http_analyze():
+    import app as app_module
+    
+    client = app_module.app.test_client()
+    payloads = _analyze_payloads(50, 1)
+    requests = iter(range(1 << 62))
+    
+    def post():
+        app_module.RESULT_CACHE.clear()
+        return client.post('/api/analyze', json=payloads[next(requests) % len(payloads)]).get_data()
+    return post
+
+
+def _normalize_profile():
+    user_skills = real_profile(10, 'mixed')['skills']
+    return lambda: scoring.normalize_profile(user_skills, SNAPSHOT.skill_resolver)
+
+
+def _analyze_fit():
+    user = real_profile(10)
+    profile = scoring.normalize_profile(user['skills'])
+    return lambda: scoring.analyze_fit('Data Analyst', user['skills'], user['experience'], user['education'],
+                                       SNAPSHOT.job_roles, SNAPSHOT.role_index, profile)
+
+
+ALLOCATION_BENCHMARKS = {
+    'scoring.normalize_profile[skills=10]': _normalize_profile,
+    'scoring.analyze_fit[skills=10]': _analyze_fit,
+    'pipeline.analyze[skills=10]': _analysis_pipeline,
+    'http./api/analyze[uncached]': _http_analyze,
+}
+
+
+def allocations(name_filter=None):
+    results = {}
+    for name, setup in ALLOCATION_BENCHMARKS.items():
+        if name_filter and name_filter not in name:
+            continue
+        results[name] = allocation_profile(setup())
+        print(f"{name:60s} {results[name]['bytes_per_call']:10d} B/call", file=sys.stderr)
+    return results
+
+
+# ---------------------------------------------------------------------------
+
+def median_percentiles(runs):
+    """Per-percentile median of several percentiles() results of one benchmark"""
+    merged = {key: round(statistics.median(stats[key] for stats in runs), 3) for key in ('p50', 'p95', 'p99')}
+    merged['samples'] = sum(stats['samples'] for stats in runs)
+    return merged
+
+
+def run(name_filter=None, repeat=1, names=None):
+    """
+    Time every benchmark matching name_filter (and in names, if given)
+    
+    The whole suite is run repeat times, so a slow or fast spell of the
+    machine hits some passes of a benchmark rather than all of them, and
+    each benchmark gets the median of its passes.
+    """
+    runs = {}
+    for _ in range(repeat):
+        for name, setup in BENCHMARKS:
+            if (name_filter and name_filter not in name) or (names is not None and name not in names):
+                continue
+            runs.setdefault(name, []).append(percentiles(time_callable(setup())))
+            print(f"{name:60s} p50 {runs[name][-1]['p50']:10.2f} us", file=sys.stderr)
+        for name, measure in HTTP_BENCHMARKS.items():
+            if (name_filter and name_filter not in name) or (names is not None and name not in names):
+                continue
+            runs.setdefault(name, []).append(percentiles(measure()))
+            print(f"{name:60s} p50 {runs[name][-1]['p50']:10.2f} us", file=sys.stderr)
+    return {name: median_percentiles(stats) for name, stats in runs.items()}
+
+
+def compare(results, baseline, threshold):
+    """Names of benchmarks whose p50 regressed by more than threshold (a fraction)"""
+    regressions = []
+    for name, stats in results.items():
+        reference = baseline.get('results', {}).get(name)
+        if reference is None or reference['p50'] <= 0:
+            continue
+        change = stats['p50'] / reference['p50'] - 1
+        stats['change_vs_baseline'] = round(change, 3)
+        if change > threshold:
+            regressions.append(name)
+    return regressions
+
+
+def save_baseline(path, report, partial, add_only=False):
+    """
+    Write report's timings and allocations into the baseline file at path
+    
+    Args:
+        partial: Report of a filtered run; only its entries are written
+                 and the rest of the file is kept
+        add_only: Only add the benchmarks the file has no entry for
+    """
+    baseline = None
+    if partial or add_only:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                baseline = json.load(f)
+        except FileNotFoundError:
+            pass
+    if baseline is None:
+        baseline = {key: value for key, value in report.items()
+                    if key not in ('results', 'allocations', 'regressions')}
+    for section in ('results', 'allocations'):
+        entries = baseline.setdefault(section, {})
+        for name, stats in report[section].items():
+            if not add_only or name not in entries:
+                entries[name] = {key: value for key, value in stats.items() if key != 'change_vs_baseline'}
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(json.dumps(baseline, indent=2, sort_keys=True) + '\n')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the algorithms package and HTTP endpoints')
+    parser.add_argument('--output', help='write JSON results to this file (default: stdout)')
+    parser.add_argument('--baseline', help='baseline JSON to compare against')
+    parser.add_argument('--threshold', type=float, default=0.3,
+                        help='allowed p50 slowdown vs the baseline, as a fraction (default 0.3)')
+    parser.add_argument('--save-baseline',
+                        help='write the results as the baseline (with --filter, only the matching entries)')
+    parser.add_argument('--add-to-baseline',
+                        help='add the benchmarks this baseline has no entry for, keeping every other entry')
+    parser.add_argument('--repeat', type=int, default=1,
+                        help='run the suite this many times and keep the median per benchmark (default 1)')
+    parser.add_argument('--filter', help='only run benchmarks whose name contains this text')
+    args = parser.parse_args()
+    if args.repeat < 1:
+        parser.error('--repeat must be at least 1')
+    
+    results = run(args.filter, args.repeat)
+    sizes = response_sizes()
+    report = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'json_backend': serialization.JSON_BACKEND,
+        'unit': 'microseconds per call',
+        'repeat': args.repeat,
+        'results': results,
+        'response_bytes': sizes,
+        'serialization_savings': savings(results, sizes),
+        'allocations': allocations(args.filter)
+    }
+    
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(report['results'], baseline, args.threshold)
+        if regressions:
+            # A real slowdown reproduces; a noisy pass does not. Time the
+            # flagged benchmarks again and keep the faster measurement.
+            print(f'Re-timing {len(regressions)} benchmark(s) over the threshold', file=sys.stderr)
+            for name, stats in run(repeat=args.repeat, names=set(regressions)).items():
+                if stats['p50'] < report['results'][name]['p50']:
+                    report['results'][name] = stats
+            regressions = compare(report['results'], baseline, args.threshold)
+        report['regressions'] = regressions
+        # Memory is reported against the baseline, but does not fail the run
+        for name, stats in report['allocations'].items():
+            reference = baseline.get('allocations', {}).get(name)
+            if reference and reference['bytes_per_call'] > 0:
+                stats['change_vs_baseline'] = round(stats['bytes_per_call'] / reference['bytes_per_call'] - 1, 3)
+    
+    output = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+    if args.save_baseline:
+        save_baseline(args.save_baseline, report, partial=bool(args.filter))
+    if args.add_to_baseline:
+        save_baseline(args.add_to_baseline, report, partial=True, add_only=True)
+    
+    if regressions:
+        print(f'{len(regressions)} benchmark(s) regressed by more than {args.threshold:.0%}:',
+              file=sys.stderr)
+        for name in regressions:
+            print(f"  {name}: {report['results'][name]['change_vs_baseline']:+.0%}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
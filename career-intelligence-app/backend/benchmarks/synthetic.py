@@ -0,0 +1,70 @@
+"""
+Synthetic data for benchmarks
+
+Everything is generated from a seeded random.Random, so a given seed
+always produces the same catalogue and profiles.
+"""
+
+import random
+
+LEVELS = ('beginner', 'intermediate', 'advanced', 'expert')
+EXPERIENCE = ('fresher', '1-2', '3-5', '5+')
+EDUCATION = ('diploma', 'bachelors', 'masters', 'phd')
+LOCATIONS = ('tier1', 'tier2', 'tier3', 'remote')
+CASINGS = ('exact', 'lower', 'upper', 'mixed')
+
+
+def apply_casing(name, casing, rng):
+    """Re-case a skill name the way users type it"""
+    if casing == 'lower':
+        return name.lower()
+    if casing == 'upper':
+        return name.upper()
+    if casing == 'mixed':
+        return ''.join(ch.upper() if rng.random() < 0.5 else ch.lower() for ch in name)
+    return name
+
+
+def make_job_roles(role_count, skill_pool_size, skills_per_role=8, seed=0):
+    """
+    A job_roles.json-shaped catalogue of synthetic roles
+    
+    Roles draw their required skills from a shared pool of
+    skill_pool_size names, so roles overlap the way real ones do.
+    """
+    rng = random.Random(seed)
+    pool = [f'Skill {i:05d}' for i in range(skill_pool_size)]
+    job_roles = {}
+    for i in range(role_count):
+        required_skills = {}
+        for skill in rng.sample(pool, min(skills_per_role, skill_pool_size)):
+            required_skills[skill] = {
+                'importance': round(rng.uniform(0.4, 1.0), 2),
+                'min_level': rng.choice(LEVELS),
+                'note': f'{skill} note'
+            }
+        job_roles[f'Role {i:05d}'] = {
+            'description': f'Synthetic role {i}',
+            'required_skills': required_skills,
+            'certifications': []
+        }
+    return job_roles
+
+
+def make_profiles(count, skill_names, skill_count, casing='exact', seed=0):
+    """
+    Request-shaped profiles with skill_count skills each, drawn from skill_names
+    
+    casing is one of CASINGS; 'mixed' picks a random casing per letter.
+    """
+    rng = random.Random(seed)
+    profiles = []
+    for _ in range(count):
+        names = rng.sample(list(skill_names), min(skill_count, len(skill_names)))
+        profiles.append({
+            'skills': {apply_casing(name, casing, rng): rng.choice(LEVELS) for name in names},
+            'experience': rng.choice(EXPERIENCE),
+            'education': rng.choice(EDUCATION),
+            'location': rng.choice(LOCATIONS)
+        })
+    return profiles
@@ -0,0 +1,333 @@
+"""
+Market Data Store
+Versioned, hot-reloadable snapshots of the JSON data files
+"""
+
+from collections import namedtuple
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+from algorithms.planner import build_planner_index
+from algorithms.recommendations import build_recommendation_index
+from algorithms.role_matching import build_inverted_index
+from algorithms.salary_estimation import build_salary_table
+from algorithms.scoring import build_role_index, build_role_matrix
+from algorithms.skill_matching import SkillResolver
+from serialization import ResponseFragments
+from snapshot_format import SNAPSHOT_FILENAME, MappedSnapshot
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+
+# Small files that are always parsed from JSON, even when the large ones
+# are read from a compiled snapshot
+AUXILIARY_FILES = ('skill_aliases.json', 'recommendation_content.json')
+
+DATA_FILES = ('job_roles.json', 'salary_data.json', 'skills_database.json') + AUXILIARY_FILES
+
+# One immutable, internally consistent view of the market data.
+# Requests read DataStore.snapshot once and use it throughout.
+Snapshot = namedtuple('Snapshot', [
+    'version',          # content hash of the data files
+    'loaded_at',        # unix timestamp of the load
+    'modified_at',      # unix timestamp of the newest data file (or loaded_at)
+    'job_roles',
+    'salary_data',
+    'salary_table',     # salary_estimation.build_salary_table(salary_data)
+    'skills_database',
+    'skill_aliases',    # {canonical skill name: [alias, ...]}
+    'recommendation_content',  # tips, timelines and learning times
+    'recommendation_index',    # recommendations.build_recommendation_index(...)
+    'planner_index',    # planner.build_planner_index(skills_database, recommendation_content)
+    'role_index',       # scoring.build_role_index(job_roles)
+    'role_matrix',      # scoring.build_role_matrix(role_index)
+    'inverted_index',   # role_matching.build_inverted_index(role_index)
+    'skill_resolver',   # skill_matching.SkillResolver over every known skill
+    'response_fragments'  # serialization.ResponseFragments(job_roles)
+])
+
+
+def validate_data(job_roles, salary_data, skills_database):
+    """
+    Sanity-check freshly parsed data before it is allowed to go live
+    
+    Raises:
+        ValueError describing the first problem found
+    """
+    if not isinstance(job_roles, dict) or not job_roles:
+        raise ValueError('job_roles.json must be a non-empty object')
+    for role, role_data in job_roles.items():
+        required_skills = role_data.get('required_skills') if isinstance(role_data, dict) else None
+        if not isinstance(required_skills, dict):
+            raise ValueError(f'{role}: required_skills must be an object')
+        for skill, requirements in required_skills.items():
+            importance = requirements.get('importance') if isinstance(requirements, dict) else None
+            if not isinstance(importance, (int, float)) or not 0 <= importance <= 1:
+                raise ValueError(f'{role}/{skill}: importance must be a number between 0 and 1')
+    if not isinstance(salary_data, dict):
+        raise ValueError('salary_data.json must be an object')
+    if not isinstance(skills_database, dict):
+        raise ValueError('skills_database.json must be an object')
+
+
+def validate_aliases(skill_aliases):
+    """
+    Sanity-check the alias table
+    
+    Raises:
+        ValueError describing the first problem found
+    """
+    if not isinstance(skill_aliases, dict):
+        raise ValueError('skill_aliases.json must be an object')
+    for skill, aliases in skill_aliases.items():
+        if not isinstance(aliases, list) or not all(isinstance(alias, str) for alias in aliases):
+            raise ValueError(f'{skill}: aliases must be a list of strings')
+
+
+def validate_recommendation_content(content):
+    """
+    Sanity-check the tips, timelines and learning times
+    
+    Raises:
+        ValueError describing the first problem found
+    """
+    if not isinstance(content, dict):
+        raise ValueError('recommendation_content.json must be an object')
+    tips = content.get('job_search_tips')
+    if not isinstance(tips, dict) or not isinstance(tips.get('roles'), dict):
+        raise ValueError('job_search_tips.roles must be an object')
+    for key in ('default', 'fresher', 'many_gaps', 'few_gaps'):
+        if not isinstance(tips.get(key), list):
+            raise ValueError(f'job_search_tips.{key} must be a list')
+    timelines = content.get('timelines')
+    for key in ('fresher_few_gaps', 'fresher_many_gaps', 'experienced'):
+        if not isinstance(timelines, dict) or not isinstance(timelines.get(key), dict):
+            raise ValueError(f'timelines.{key} must be an object')
+    learning_time = content.get('learning_time')
+    if (not isinstance(learning_time, dict) or not isinstance(learning_time.get('levels'), list)
+            or not isinstance(learning_time.get('estimates'), dict)
+            or not isinstance(learning_time.get('default'), str)):
+        raise ValueError('learning_time must have levels, estimates and default')
+
+
+def content_version(raw_files):
+    """
+    Version string of the data: a hash of the raw bytes of every data file
+    
+    Args:
+        raw_files: Dict of {filename: bytes} for every name in DATA_FILES
+    """
+    digest = hashlib.sha256()
+    for filename in DATA_FILES:
+        digest.update(filename.encode('utf-8'))
+        digest.update(raw_files[filename])
+    return digest.hexdigest()[:16]
+
+
+def _assemble_snapshot(version, loaded_at, job_roles, salary_data, skills_database,
+                       role_index, raw_files):
+    """
+    Parse the auxiliary files and build the structures derived from the data
+    """
+    skill_aliases = json.loads(raw_files['skill_aliases.json'])
+    validate_aliases(skill_aliases)
+    recommendation_content = json.loads(raw_files['recommendation_content.json'])
+    validate_recommendation_content(recommendation_content)
+    
+    canonical_names = [skill for role in role_index.values() for skill in role.skills]
+    canonical_names.extend(skills_database.keys())
+    canonical_names.extend(skill_aliases.keys())
+    
+    loaded_at = loaded_at if loaded_at is not None else time.time()
+    return Snapshot(
+        version=version,
+        loaded_at=loaded_at,
+        modified_at=loaded_at,
+        job_roles=job_roles,
+        salary_data=salary_data,
+        salary_table=build_salary_table(salary_data),
+        skills_database=skills_database,
+        skill_aliases=skill_aliases,
+        recommendation_content=recommendation_content,
+        recommendation_index=build_recommendation_index(job_roles, skills_database, recommendation_content),
+        planner_index=build_planner_index(skills_database, recommendation_content),
+        role_index=role_index,
+        role_matrix=build_role_matrix(role_index),
+        inverted_index=build_inverted_index(role_index),
+        skill_resolver=SkillResolver(canonical_names, skill_aliases),
+        response_fragments=ResponseFragments(job_roles)
+    )
+
+
+def build_snapshot(raw_files, loaded_at=None):
+    """
+    Parse, validate and index the raw bytes of the data files
+    
+    Args:
+        raw_files: Dict of {filename: bytes} for every name in DATA_FILES
+    
+    Returns:
+        Snapshot
+    """
+    job_roles = json.loads(raw_files['job_roles.json'])
+    salary_data = json.loads(raw_files['salary_data.json'])
+    skills_database = json.loads(raw_files['skills_database.json'])
+    validate_data(job_roles, salary_data, skills_database)
+    
+    return _assemble_snapshot(
+        content_version(raw_files), loaded_at, job_roles, salary_data, skills_database,
+        build_role_index(job_roles), raw_files
+    )
+
+
+def load_compiled_snapshot(path, raw_files, loaded_at=None):
+    """
+    Map a compiled snapshot file if it was built from these data files
+    
+    Args:
+        raw_files: Dict of {filename: bytes} for every name in DATA_FILES
+    
+    Returns:
+        Snapshot reading straight from the mapping, or None if the file is
+        missing, unreadable or stale
+    """
+    version = content_version(raw_files)
+    try:
+        mapped = MappedSnapshot(path)
+    except (OSError, ValueError):
+        return None
+    if mapped.data_version != version:
+        return None
+    
+    return _assemble_snapshot(
+        version, loaded_at, mapped.job_roles(), mapped.salary_data(),
+        mapped.skills_database(), mapped.role_index(), raw_files
+    )
+
+
+class DataStore:
+    """
+    Holds the current Snapshot and swaps in new ones when the files change
+    
+    Readers never take a lock: they read the `snapshot` attribute once (a
+    single atomic reference read) and keep using that object, so in-flight
+    requests always see one consistent version even while a reload happens.
+    Only reloads are serialized against each other.
+    
+    When data_dir holds an up-to-date compiled snapshot (see snapshot_format)
+    it is memory-mapped instead of parsing the JSON files.
+    """
+    
+    def __init__(self, data_dir=DATA_DIR, poll_interval=5.0, use_compiled=True):
+        self.data_dir = data_dir
+        self.poll_interval = poll_interval
+        self.use_compiled = use_compiled
+        self.snapshot = None
+        self.reloads = 0
+        self.reload_failures = 0
+        self._signature = None
+        self._failed_signature = None
+        self._listeners = []
+        self._reload_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher = None
+        self.reload(force=True)
+    
+    def add_listener(self, callback):
+        """Call callback(new_snapshot) after every successful swap"""
+        self._listeners.append(callback)
+    
+    def _file_signature(self):
+        signature = []
+        for filename in DATA_FILES:
+            stat = os.stat(os.path.join(self.data_dir, filename))
+            signature.append((filename, stat.st_mtime_ns, stat.st_size))
+        if self.use_compiled:
+            try:
+                stat = os.stat(os.path.join(self.data_dir, SNAPSHOT_FILENAME))
+                signature.append((SNAPSHOT_FILENAME, stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                pass
+        return tuple(signature)
+    
+    def reload(self, force=False):
+        """
+        Load a new snapshot if the data files changed
+        
+        A file that fails to parse or validate leaves the current snapshot
+        in place (or raises on the very first load).
+        
+        Returns:
+            True if a new snapshot was swapped in
+        """
+        with self._reload_lock:
+            signature = self._file_signature()
+            if not force and signature in (self._signature, self._failed_signature):
+                return False
+            
+            try:
+                raw_files = {}
+                for filename in DATA_FILES:
+                    with open(os.path.join(self.data_dir, filename), 'rb') as f:
+                        raw_files[filename] = f.read()
+                snapshot = None
+                if self.use_compiled:
+                    snapshot = load_compiled_snapshot(
+                        os.path.join(self.data_dir, SNAPSHOT_FILENAME),
+                        raw_files
+                    )
+                if snapshot is None:
+                    snapshot = build_snapshot(raw_files)
+                snapshot = snapshot._replace(
+                    modified_at=max(mtime_ns for name, mtime_ns, _ in signature if name in DATA_FILES) / 1e9
+                )
+            except (OSError, ValueError) as e:
+                if self.snapshot is None:
+                    raise
+                self._failed_signature = signature
+                self.reload_failures += 1
+                logger.error('Keeping data version %s, reload failed: %s', self.snapshot.version, e)
+                return False
+            
+            self._signature = signature
+            if (self.snapshot is not None and snapshot.version == self.snapshot.version
+                    and type(snapshot.job_roles) is type(self.snapshot.job_roles)):
+                # Touched but unchanged - nothing to swap
+                return False
+            
+            # Copy-on-write swap: a single reference assignment
+            self.snapshot = snapshot
+            self.reloads += 1
+        
+        logger.info('Loaded market data version %s', snapshot.version)
+        for callback in self._listeners:
+            callback(snapshot)
+        return True
+    
+    def start_watching(self):
+        """Poll the data files for changes in a background thread"""
+        if self.poll_interval <= 0 or (self._watcher is not None and self._watcher.is_alive()):
+            return
+        self._stop.clear()
+        self._watcher = threading.Thread(target=self._watch, name='datastore-watcher', daemon=True)
+        self._watcher.start()
+    
+    def stop_watching(self):
+        """Stop the background polling thread"""
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+    
+    def _watch(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.reload()
+            except Exception:
+                self.reload_failures += 1
+                logger.exception('Market data reload failed')
@@ -0,0 +1,55 @@
+"""
+Production serving configuration (pre-fork, multi-process)
+
+Run from the backend folder:
+    gunicorn -c gunicorn.conf.py app:app
+
+Settings come from environment variables so the same file works locally
+and on hosting platforms:
+    PORT              port to listen on (default 5000)
+    WEB_CONCURRENCY   worker processes (default: CPU count)
+    THREADS           threads per worker (default 4)
+    GRACEFUL_TIMEOUT  seconds in-flight requests get to finish on shutdown
+                      (default 30)
+
+The app is imported once in the master process (preload_app), so the
+market data snapshot and every index built from it are loaded before the
+workers fork and their pages are shared copy-on-write between workers.
+"""
+
+import gc
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+threads = int(os.environ.get('THREADS', 4))
+worker_class = 'gthread'
+preload_app = True
+
+# SIGTERM lets workers finish in-flight requests for up to this long
+graceful_timeout = int(os.environ.get('GRACEFUL_TIMEOUT', 30))
+timeout = 60
+keepalive = 5
+
+accesslog = os.environ.get('ACCESS_LOG') or None
+errorlog = '-'
+
+
+def when_ready(server):
+    """Master, after the app is loaded and before any worker forks"""
+    from app import DATA_STORE
+    
+    # Threads do not survive fork; each worker runs its own watcher instead
+    DATA_STORE.stop_watching()
+    
+    # Move the loaded data out of the GC's tracked generations so collections
+    # in the workers do not touch (and un-share) those pages
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    """Worker, right after fork"""
+    from app import DATA_STORE
+    
+    DATA_STORE.start_watching()
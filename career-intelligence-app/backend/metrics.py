@@ -0,0 +1,296 @@
+"""
+Metrics
+Low-overhead counters, latency histograms and an on-demand sampling
+profiler, exposed in the Prometheus text format
+"""
+
+from bisect import bisect_left
+from collections import OrderedDict
+import collections
+import itertools
+import os
+import sys
+import threading
+import time
+
+# Histogram bucket upper bounds, in seconds (+Inf is implicit)
+LATENCY_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+                   0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+# Sampling profiler defaults
+PROFILE_INTERVAL = 0.001
+MAX_STORED_PROFILES = 32
+
+# Fallback origin of process_uptime() where /proc is unavailable
+_IMPORTED_AT = time.monotonic()
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names, values, extra=''):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic counter with a fixed set of label names"""
+    
+    def __init__(self, name, help_text, label_names=()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self._values = {}
+        self._lock = threading.Lock()
+    
+    def inc(self, *label_values, amount=1):
+        # The read and the write of the new value must not interleave with
+        # another thread's, or its increment is lost
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+    
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} counter']
+        with self._lock:
+            values = sorted(self._values.items())
+        for label_values, value in values:
+            lines.append(f'{self.name}{_labels(self.label_names, label_values)} {_number(value)}')
+        return lines
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram with a fixed set of label names"""
+    
+    def __init__(self, name, help_text, label_names=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        # label values -> [per-bucket counts (+Inf last), sum]
+        self._series = {}
+        self._lock = threading.Lock()
+    
+    def observe_many(self, label_prefix, observations):
+        """
+        Record (last_label_value, seconds) pairs under a single lock acquisition
+        
+        Each pair is labelled label_prefix + (last_label_value,).
+        """
+        buckets = self.buckets
+        all_series = self._series
+        with self._lock:
+            for last_label, seconds in observations:
+                label_values = label_prefix + (last_label,)
+                series = all_series.get(label_values)
+                if series is None:
+                    series = all_series[label_values] = [[0] * (len(buckets) + 1), 0.0]
+                series[0][bisect_left(buckets, seconds)] += 1
+                series[1] += seconds
+    
+    def observe(self, seconds, *label_values):
+        self.observe_many(label_values[:-1], ((label_values[-1], seconds),))
+    
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            series = sorted((key, list(counts), total) for key, (counts, total) in self._series.items())
+        for label_values, counts, total in series:
+            cumulative = list(itertools.accumulate(counts))
+            for bound, count in zip(self.buckets + (float('inf'),), cumulative):
+                labels = _labels(self.label_names, label_values, f'le="{_number(bound)}"')
+                lines.append(f'{self.name}_bucket{labels} {count}')
+            labels = _labels(self.label_names, label_values)
+            lines.append(f'{self.name}_sum{labels} {_number(total)}')
+            lines.append(f'{self.name}_count{labels} {cumulative[-1]}')
+        return lines
+
+
+class StageTimer:
+    """
+    Times consecutive stages of one request
+    
+    mark(stage) closes the stage that ran since the previous mark; finish()
+    records every stage at once, so the other labels (e.g. the role) can
+    be decided after timing started. The histogram's last label is the stage.
+    """
+    
+    __slots__ = ('_histogram', '_last', '_stages')
+    
+    def __init__(self, histogram):
+        self._histogram = histogram
+        self._stages = []
+        self._last = time.perf_counter()
+    
+    def mark(self, stage):
+        now = time.perf_counter()
+        self._stages.append((stage, now - self._last))
+        self._last = now
+    
+    def finish(self, *label_values):
+        self._histogram.observe_many(label_values, self._stages)
+
+
+class _NullTimer:
+    """Stand-in for StageTimer when metrics are disabled"""
+    
+    __slots__ = ()
+    
+    def mark(self, stage):
+        pass
+    
+    def finish(self, *label_values):
+        pass
+
+
+NULL_TIMER = _NullTimer()
+
+
+def process_uptime():
+    """
+    Seconds since this process started
+    
+    Read from /proc on Linux, to clock tick resolution (usually 10 ms), so
+    interpreter startup and imports count; elsewhere measured from when
+    this module was imported. A forked worker counts from its fork.
+    """
+    try:
+        with open('/proc/self/stat', 'rb') as f:
+            # Fields after the parenthesized command name; starttime is field 22
+            start_ticks = int(f.read().rsplit(b')', 1)[1].split()[19])
+        return time.clock_gettime(time.CLOCK_BOOTTIME) - start_ticks / os.sysconf('SC_CLK_TCK')
+    except (OSError, ValueError, IndexError, AttributeError):
+        return time.monotonic() - _IMPORTED_AT
+
+
+class BootTimer:
+    """Process uptime when the app finished loading and when it first responded"""
+    
+    __slots__ = ('ready_seconds', 'first_response_seconds')
+    
+    def __init__(self):
+        self.ready_seconds = None
+        self.first_response_seconds = None
+    
+    def ready(self):
+        self.ready_seconds = process_uptime()
+    
+    def responded(self):
+        """Call after every response; only the first is recorded"""
+        if self.first_response_seconds is None:
+            self.first_response_seconds = process_uptime()
+
+
+class MetricsRegistry:
+    """
+    Named counters and histograms plus scrape-time collectors
+    
+    With enabled=False, stage_timer() hands out a no-op timer and
+    render() still works, so callers never need to branch.
+    """
+    
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self._metrics = OrderedDict()
+        self._collectors = []
+    
+    def counter(self, name, help_text, label_names=()):
+        return self._metrics.setdefault(name, Counter(name, help_text, label_names))
+    
+    def histogram(self, name, help_text, label_names=(), buckets=LATENCY_BUCKETS):
+        return self._metrics.setdefault(name, Histogram(name, help_text, label_names, buckets))
+    
+    def add_collector(self, callback):
+        """
+        Register callback() -> [(name, type, help, value)], called on every scrape
+        
+        For values that already live elsewhere (cache hit counts, reload counts)
+        """
+        self._collectors.append(callback)
+    
+    def stage_timer(self, histogram):
+        if not self.enabled:
+            return NULL_TIMER
+        return StageTimer(histogram)
+    
+    def render(self):
+        """Everything in the Prometheus text exposition format"""
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        for callback in self._collectors:
+            for name, metric_type, help_text, value in callback():
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} {metric_type}')
+                lines.append(f'{name} {_number(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+class SamplingProfiler:
+    """
+    Samples one thread's stack at a fixed interval until stopped
+    
+    The result is in the folded-stack format (one "outer;inner count" line
+    per distinct stack) that flamegraph.pl and speedscope read.
+    """
+    
+    def __init__(self, thread_id=None, interval=PROFILE_INTERVAL):
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.interval = interval
+        self.samples = collections.Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+    
+    def start(self):
+        self._thread.start()
+        return self
+    
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        return self.folded()
+    
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                return
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f'{code.co_name} ({code.co_filename.rsplit("/", 1)[-1]}:{frame.f_lineno})')
+                frame = frame.f_back
+            self.samples[';'.join(reversed(stack))] += 1
+    
+    def folded(self):
+        return ''.join(f'{stack} {count}\n' for stack, count in self.samples.most_common())
+
+
+class ProfileStore:
+    """The most recent folded profiles, by id"""
+    
+    def __init__(self, maxsize=MAX_STORED_PROFILES):
+        self.maxsize = maxsize
+        self._profiles = OrderedDict()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+    
+    def add(self, folded):
+        with self._lock:
+            profile_id = str(next(self._ids))
+            self._profiles[profile_id] = folded
+            while len(self._profiles) > self.maxsize:
+                self._profiles.popitem(last=False)
+        return profile_id
+    
+    def get(self, profile_id):
+        with self._lock:
+            return self._profiles.get(profile_id)
@@ -0,0 +1,372 @@
+"""
+Peer Comparison
+Anonymized profiles of users who chose to share them, kept in a local
+append-only file and indexed in memory per role, for /api/peers
+
+Only the role, the fit score and a quantized skill vector are stored: the
+proficiency weight (scoring.get_proficiency_weight) of each of the role's
+required skills, in quarters - 0 for a missing skill, then 1 (beginner)
+to 4 (expert). Nothing else from the request is kept.
+
+Per role the index holds
+    a histogram of fit scores at the 0.1 resolution responses use, so
+        percentiles are exact and every row is one increment
+    each distinct vector with its number of rows, so memory grows with
+        the number of distinct profiles rather than with the file
+
+Nearest peers are the rows at the smallest L1 distance (in level steps).
+A role with few distinct vectors is scanned; otherwise the vectors at
+distance 0, 1, 2, ... are looked up in the quantized lattice until k rows
+are found, and the search is approximate if it runs out of probes first.
+
+Several processes may append to one file: each tails it for the lines the
+others wrote before answering. Layout (NDJSON):
+    [role, fit score x 10, {skill id: quarter, ...}]   one per shared profile
+"""
+
+import heapq
+import os
+import threading
+from operator import sub
+
+from serialization import dumps, loads
+
+PEER_STORE_FILENAME = 'peer_profiles.ndjson'
+
+# Highest quarter: expert
+MAX_QUARTER = 4
+
+# Fit score histogram buckets: 0.0 to 100.0 in steps of 0.1
+SCORE_BUCKETS = 1001
+
+# No percentile or neighbours are reported for a role with fewer rows, and
+# at least this many neighbours are always aggregated, so no single shared
+# profile can be read back
+MIN_PEERS = 5
+
+# Neighbours aggregated by /api/peers
+DEFAULT_PEER_COUNT = 10
+MAX_PEER_COUNT = 50
+
+# Roles with at most this many distinct vectors are scanned exactly
+SCAN_LIMIT = 512
+
+# Lattice lookups per query before the search gives up on exactness
+MAX_PROBES = 2048
+
+# Strengths shared by at least this fraction of the neighbours are common
+COMMON_STRENGTH_SHARE = 0.5
+
+# Same thresholds as the strengths of scoring.analyze_fit: intermediate or
+# better in a skill of importance 0.5 or more
+STRENGTH_QUARTER = 2
+STRENGTH_IMPORTANCE = 0.5
+
+# Bytes read at a time when replaying the file
+READ_CHUNK = 1 << 20
+
+
+def quarter(level):
+    """Quantized proficiency weight of a models.Level, or 0 for None"""
+    return 0 if level is None else round(level.weight * MAX_QUARTER)
+
+
+def _score_bucket(fit_tenths):
+    return min(max(fit_tenths, 0), SCORE_BUCKETS - 1)
+
+
+def _ring(query, radius):
+    """
+    Every vector of quarters at L1 distance exactly radius from query, as bytes
+    """
+    size = len(query)
+    # Most distance the positions from i onwards can still absorb
+    capacity = [0] * (size + 1)
+    for position in range(size - 1, -1, -1):
+        value = query[position]
+        capacity[position] = capacity[position + 1] + max(value, MAX_QUARTER - value)
+    
+    # Recurse over the changed positions only, in increasing order, so each
+    # vector is produced once and the depth is at most radius
+    def expand(start, remaining, changes):
+        if remaining == 0:
+            vector = bytearray(query)
+            for position, value in changes:
+                vector[position] = value
+            yield bytes(vector)
+            return
+        for position in range(start, size):
+            if remaining > capacity[position]:
+                return
+            value = query[position]
+            for step in range(1, remaining + 1):
+                for changed in (value - step, value + step):
+                    if 0 <= changed <= MAX_QUARTER:
+                        yield from expand(position + 1, remaining - step, changes + [(position, changed)])
+    
+    return expand(0, radius, [])
+
+
+class RolePeers:
+    """Fit score histogram and distinct vectors of the rows of one role"""
+    
+    __slots__ = ('keys', 'names', 'strength_positions', 'histogram', 'total', 'vectors')
+    
+    def __init__(self, role):
+        """
+        Args:
+            role: scoring.RoleIndex entry the vectors are laid out over
+        """
+        self.keys = role.keys
+        self.names = role.skills
+        self.strength_positions = tuple(
+            position for position, value in enumerate(role.importance) if value >= STRENGTH_IMPORTANCE
+        )
+        self.histogram = [0] * SCORE_BUCKETS
+        self.total = 0
+        self.vectors = {}  # bytes -> rows
+    
+    def encode(self, profile):
+        """Vector of a normalized profile"""
+        return bytes(quarter(profile.get(skill_id)) for skill_id in self.keys)
+    
+    def add(self, vector, fit_tenths, count=1):
+        self.histogram[_score_bucket(fit_tenths)] += count
+        self.total += count
+        self.vectors[vector] = self.vectors.get(vector, 0) + count
+    
+    def percentile(self, fit_tenths):
+        """Share of rows scoring below fit_tenths, counting ties as half, in %"""
+        bucket = _score_bucket(fit_tenths)
+        below = sum(self.histogram[:bucket])
+        return (below + self.histogram[bucket] / 2) / self.total * 100
+    
+    def nearest(self, query, k):
+        """
+        Returns:
+            ([(distance, vector, rows)] covering the k nearest rows, nearest
+            first, exact) - exact is False when the probes ran out
+        """
+        if len(self.vectors) <= SCAN_LIMIT:
+            # Every vector holds at least one row, so k vectors are enough
+            found = heapq.nsmallest(k, [
+                (sum(map(abs, map(sub, vector, query))), vector, count)
+                for vector, count in self.vectors.items()
+            ])
+            exact = True
+        else:
+            found, exact = self._probe(query, k)
+            found.sort()
+        
+        nearest = []
+        rows = 0
+        for entry in found:
+            if rows >= k:
+                break
+            nearest.append(entry)
+            rows += entry[2]
+        return nearest, exact
+    
+    def _probe(self, query, k):
+        """Look up whole rings around query until they hold k rows"""
+        vectors = self.vectors
+        found = []
+        rows = 0
+        probes = 0
+        for radius in range(len(query) * MAX_QUARTER + 1):
+            for vector in _ring(query, radius):
+                count = vectors.get(vector)
+                if count is not None:
+                    found.append((radius, vector, count))
+                    rows += count
+                probes += 1
+                if probes >= MAX_PROBES:
+                    return found, False
+            if rows >= k:
+                break
+        return found, True
+
+
+class PeerStore:
+    """
+    Append-only file of shared profiles with a RolePeers index per role
+    
+    The indexes are laid out over the roles of one data snapshot; rebuild()
+    replays the file for a new one.
+    """
+    
+    def __init__(self, path, role_index):
+        self.path = path
+        self.record_failures = 0
+        self._lock = threading.Lock()
+        self._fd = None
+        self._indexes = {}
+        self._role_index = role_index
+        self._offset = 0
+        self.rebuild(role_index)
+    
+    def rebuild(self, role_index):
+        """Index the whole file over role_index, e.g. after a data reload"""
+        # Replay outside the lock, then catch up with rows appended meanwhile
+        indexes = {role_name: RolePeers(role) for role_name, role in role_index.items()}
+        offset = self._replay(indexes, 0)
+        with self._lock:
+            self._indexes = indexes
+            self._role_index = role_index
+            self._offset = offset
+            self._refresh()
+    
+    def record(self, role_name, profile, fit_score):
+        """
+        Append one shared profile; it is indexed on the next refresh
+        
+        A failed write is counted in record_failures rather than raised, so
+        it never fails the analysis that shared the profile.
+        """
+        role = self._role_index.get(role_name)
+        if role is None:
+            return
+        skills = {}
+        for skill_id in role.keys:
+            value = quarter(profile.get(skill_id))
+            if value:
+                skills[skill_id] = value
+        line = dumps([role_name, round(fit_score * 10), skills]) + b'\n'
+        try:
+            with self._lock:
+                if self._fd is None:
+                    self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+                # A single O_APPEND write, so lines from other processes never interleave
+                os.write(self._fd, line)
+        except OSError:
+            self.record_failures += 1
+    
+    def compare(self, role_name, profile, fit_score, k=DEFAULT_PEER_COUNT):
+        """
+        How a profile compares with the shared profiles of its role
+        
+        Args:
+            profile: Output of scoring.normalize_profile()
+            fit_score: The profile's fit score for the role
+            k: Neighbours to aggregate; at least MIN_PEERS are
+        
+        Returns:
+            Dict with peer_count, percentile and nearest_peers; percentile
+            and nearest_peers are None while the role has fewer than
+            MIN_PEERS rows, and nearest_peers also when the probes ran out
+            before finding MIN_PEERS of them
+        """
+        k = max(k, MIN_PEERS)
+        with self._lock:
+            self._refresh()
+            peers = self._indexes.get(role_name)
+            if peers is None or peers.total < MIN_PEERS:
+                return {
+                    'peer_count': 0 if peers is None else peers.total,
+                    'percentile': None,
+                    'nearest_peers': None
+                }
+            query = peers.encode(profile)
+            percentile = peers.percentile(round(fit_score * 10))
+            nearest, exact = peers.nearest(query, k)
+            total = peers.total
+        
+        # Rows of each strength among the k nearest; the farthest vector
+        # only counts as many rows as are needed to reach k
+        rows = 0
+        strength_rows = [0] * len(peers.keys)
+        for _, vector, count in nearest:
+            count = min(count, k - rows)
+            rows += count
+            for position in peers.strength_positions:
+                if vector[position] >= STRENGTH_QUARTER:
+                    strength_rows[position] += count
+        
+        # Never describe fewer profiles than a role needs to be compared at all
+        if rows < MIN_PEERS:
+            return {'peer_count': total, 'percentile': round(percentile, 1), 'nearest_peers': None}
+        
+        common = [
+            {
+                'skill': peers.names[position],
+                'share': round(strength_rows[position] / rows, 2),
+                'yours': query[position] >= STRENGTH_QUARTER
+            }
+            for position in peers.strength_positions
+            if rows and strength_rows[position] / rows >= COMMON_STRENGTH_SHARE
+        ]
+        common.sort(key=lambda entry: -entry['share'])
+        
+        return {
+            'peer_count': total,
+            'percentile': round(percentile, 1),
+            'nearest_peers': {
+                'count': rows,
+                'max_distance': nearest[-1][0] if nearest else None,
+                'exact': exact,
+                'common_strengths': common
+            }
+        }
+    
+    def stats(self):
+        with self._lock:
+            self._refresh()
+            return {
+                'rows': sum(peers.total for peers in self._indexes.values()),
+                'distinct_profiles': sum(len(peers.vectors) for peers in self._indexes.values()),
+                'record_failures': self.record_failures
+            }
+    
+    def _refresh(self):
+        """Index the lines appended since the last refresh (lock held)"""
+        try:
+            size = os.stat(self.path).st_size
+        except FileNotFoundError:
+            size = 0
+        if size < self._offset:
+            # The file was truncated or replaced: start over
+            self._indexes = {role_name: RolePeers(role) for role_name, role in self._role_index.items()}
+            self._offset = 0
+        if size > self._offset:
+            self._offset = self._replay(self._indexes, self._offset)
+    
+    def _replay(self, indexes, offset):
+        """
+        Add the complete lines of the file from offset into indexes
+        
+        Returns:
+            Offset just past the last complete line
+        """
+        try:
+            f = open(self.path, 'rb')
+        except FileNotFoundError:
+            return offset
+        with f:
+            f.seek(offset)
+            pending = b''
+            while True:
+                chunk = f.read(READ_CHUNK)
+                if not chunk:
+                    break
+                lines = (pending + chunk).split(b'\n')
+                # The last piece is an incomplete line, or b''
+                pending = lines.pop()
+                for line in lines:
+                    _index_line(indexes, line)
+                offset += len(chunk)
+        return offset - len(pending)
+
+
+def _index_line(indexes, line):
+    """Add one file line to its role's index; unreadable lines are skipped"""
+    try:
+        role_name, fit_tenths, skills = loads(line)
+        peers = indexes.get(role_name)
+        if peers is None:
+            return
+        vector = bytes([skills.get(skill_id, 0) for skill_id in peers.keys])
+        if vector and max(vector) > MAX_QUARTER:
+            return
+        peers.add(vector, int(fit_tenths))
+    except (ValueError, TypeError, AttributeError):
+        return
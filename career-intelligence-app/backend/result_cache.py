@@ -0,0 +1,144 @@
+"""
+Result Cache
+Bounded LRU + TTL memoization for identical analysis requests
+"""
+
+from collections import OrderedDict
+import base64
+import binascii
+import json
+import threading
+import time
+
+# Longest result token accepted by decode_result_token
+MAX_TOKEN_LENGTH = 16384
+
+
+def make_profile_key(target_role, profile, experience, education, location, data_version=0):
+    """
+    Build a canonical cache key for an analysis request
+    
+    Args:
+        profile: Output of scoring.normalize_profile() - already lowercased
+                 and de-duplicated, so skill order and casing do not matter
+        data_version: Version of the market data the result is computed from,
+                      so results from stale data can never be served
+    
+    Returns:
+        Hashable tuple
+    """
+    skills = tuple(sorted((skill, level.key) for skill, level in profile.items()))
+    return (data_version, target_role, skills, experience, education.lower(), location)
+
+
+def encode_result_token(target_role, user_skills, experience, education, location):
+    """
+    Opaque token naming the inputs of an analysis, for /api/analyze/delta
+    
+    The token carries the inputs themselves, so any worker process can
+    rebuild the analysis from it.
+    """
+    payload = json.dumps([target_role, user_skills, experience, education, location],
+                         separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_result_token(token):
+    """
+    Inverse of encode_result_token
+    
+    Returns:
+        (target_role, user_skills, experience, education, location)
+    
+    Raises:
+        ValueError: if token is not a valid result token
+    """
+    if not isinstance(token, str) or len(token) > MAX_TOKEN_LENGTH:
+        raise ValueError('Invalid result token')
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError('Invalid result token') from None
+    if (not isinstance(payload, list) or len(payload) != 5
+            or not isinstance(payload[1], dict)
+            or not all(isinstance(value, str) for value in payload[1].values())
+            or not all(isinstance(value, str) for value in (payload[0],) + tuple(payload[2:]))):
+        raise ValueError('Invalid result token')
+    return tuple(payload)
+
+
+class ResultCache:
+    """
+    Thread-safe LRU cache with a per-entry time to live
+    
+    Values are shared between requests and must be treated as read-only,
+    unless taken out with pop().
+    """
+    
+    def __init__(self, maxsize=1024, ttl=300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key):
+        """Return the cached value for key, or None on a miss"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return None
+    
+    def put(self, key, value, ttl=None):
+        """
+        Store value under key, evicting the least recently used entry if full
+        
+        Args:
+            ttl: Seconds to keep this entry (default: the cache's ttl)
+        """
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+    
+    def pop(self, key):
+        """
+        Remove and return the cached value for key, or None on a miss - the
+        caller then owns the value and may change it
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None and entry[0] > now:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            return None
+    
+    def clear(self):
+        """Drop every entry (e.g. after the market data is reloaded)"""
+        with self._lock:
+            self._entries.clear()
+    
+    def stats(self):
+        """Hit/miss counters and current size"""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'ttl_seconds': self.ttl
+            }
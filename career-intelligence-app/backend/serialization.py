@@ -0,0 +1,220 @@
+"""
+Response Serialization
+Pre-encoded JSON fragments, an optional faster JSON backend, and
+precompressed bodies for the static endpoints
+"""
+
+from collections import OrderedDict, namedtuple
+from collections.abc import Mapping
+import gzip
+import json
+import os
+import threading
+
+try:
+    import orjson
+except ImportError:  # optional - pip install orjson
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # optional - pip install brotli
+    brotli = None
+
+# 'orjson', 'json', or 'auto' (orjson when it is installed)
+JSON_BACKEND = os.environ.get('JSON_BACKEND', 'auto')
+
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 11
+
+# Encoded recommendation objects kept per ResponseFragments
+SHARED_FRAGMENTS_SIZE = 4096
+
+
+class Fragment(bytes):
+    """Already-encoded JSON value, spliced verbatim by encode_object()"""
+    
+    __slots__ = ()
+
+
+# One static response body with its precompressed variants (None when the
+# encoding is unavailable or does not make the body smaller)
+PrecompressedBody = namedtuple('PrecompressedBody', ['identity', 'gzip', 'br'])
+
+
+def _default(value):
+    # Types the backends do not encode themselves: the slotted analysis
+    # types of algorithms.models, the lazy mappings of a compiled snapshot,
+    # MappingProxyType, and namedtuples
+    to_dict = getattr(value, 'to_dict', None)
+    if to_dict is not None:
+        return to_dict()
+    if isinstance(value, Mapping):
+        return dict(value)
+    if isinstance(value, tuple):
+        return list(value)
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+def _json_dumps(value):
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'), default=_default).encode('utf-8')
+
+
+def _orjson_dumps(value):
+    return orjson.dumps(value, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+def get_dumps(backend=JSON_BACKEND):
+    """
+    The compact value -> UTF-8 bytes encoder of a backend
+    
+    Raises:
+        ValueError: if backend is unknown, or 'orjson' is not installed
+    """
+    if backend == 'auto':
+        backend = 'orjson' if orjson is not None else 'json'
+    if backend == 'orjson':
+        if orjson is None:
+            raise ValueError('JSON_BACKEND=orjson but orjson is not installed')
+        return _orjson_dumps
+    if backend == 'json':
+        return _json_dumps
+    raise ValueError(f'Unknown JSON backend {backend!r}')
+
+
+dumps = get_dumps()
+
+
+def get_loads(backend=JSON_BACKEND):
+    """
+    The JSON bytes -> value decoder of a backend; both raise ValueError on
+    invalid input
+    
+    Raises:
+        ValueError: if backend is unknown, or 'orjson' is not installed
+    """
+    if backend == 'auto':
+        backend = 'orjson' if orjson is not None else 'json'
+    if backend == 'orjson':
+        if orjson is None:
+            raise ValueError('JSON_BACKEND=orjson but orjson is not installed')
+        return orjson.loads
+    if backend == 'json':
+        return json.loads
+    raise ValueError(f'Unknown JSON backend {backend!r}')
+
+
+loads = get_loads()
+
+
+def encode_object(fields):
+    """
+    Encode a dict as a JSON object, splicing Fragment values in as they are
+    
+    Only the top level is inspected, so static parts of a response should
+    be passed as whole Fragments.
+    
+    Returns:
+        Fragment
+    """
+    parts = []
+    for key, value in fields.items():
+        parts.append(dumps(key) + b':' + (value if isinstance(value, Fragment) else dumps(value)))
+    return Fragment(b'{' + b','.join(parts) + b'}')
+
+
+def precompress(body):
+    """PrecompressedBody of body (bytes) in every available encoding"""
+    gzipped = gzip.compress(body, GZIP_LEVEL, mtime=0)
+    brotlied = brotli.compress(body, quality=BROTLI_QUALITY) if brotli is not None else None
+    return PrecompressedBody(
+        identity=body,
+        gzip=gzipped if len(gzipped) < len(body) else None,
+        br=brotlied if brotlied is not None and len(brotlied) < len(body) else None
+    )
+
+
+def negotiate(body, accept_encodings):
+    """
+    Pick the smallest precompressed variant the client accepts
+    
+    Args:
+        body: PrecompressedBody
+        accept_encodings: The request's parsed Accept-Encoding (werkzeug Accept)
+    
+    Returns:
+        (bytes, content encoding or None for identity)
+    """
+    best, encoding = body.identity, None
+    for name in ('gzip', 'br'):
+        data = getattr(body, name)
+        if data is not None and len(data) < len(best) and accept_encodings[name] > 0:
+            best, encoding = data, name
+    return best, encoding
+
+
+class ResponseFragments:
+    """
+    Encoded response parts derived from one snapshot of the market data
+    
+    Per-role bodies are encoded on first use and then kept, so a compiled
+    snapshot does not have to decode every role up front. Recommendation
+    objects are shared between responses (see recommendations.py), so their
+    encoding is cached by identity.
+    """
+    
+    def __init__(self, job_roles, shared_size=SHARED_FRAGMENTS_SIZE):
+        self.job_roles = job_roles
+        self.roles = precompress(dumps({'roles': list(job_roles.keys())}))
+        self.shared_size = shared_size
+        self._catalogue = None
+        self._role_skills = {}
+        self._role_info = {}
+        # id(obj) -> (obj, Fragment); holding obj keeps its id from being reused
+        self._shared = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def role_skills(self, role):
+        """PrecompressedBody of /api/skills/<role>; role must exist"""
+        body = self._role_skills.get(role)
+        if body is None:
+            body = self._role_skills[role] = precompress(dumps({
+                'role': role,
+                'required_skills': self.job_roles[role]['required_skills']
+            }))
+        return body
+    
+    def catalogue(self):
+        """PrecompressedBody of /api/catalogue: every role with its required skills"""
+        body = self._catalogue
+        if body is None:
+            body = self._catalogue = precompress(dumps({
+                'roles': list(self.job_roles.keys()),
+                'skills': {role: role_data['required_skills'] for role, role_data in self.job_roles.items()}
+            }))
+        return body
+    
+    def role_info(self, role):
+        """Fragment of the role_info object of /api/analyze; role must exist"""
+        fragment = self._role_info.get(role)
+        if fragment is None:
+            fragment = self._role_info[role] = Fragment(dumps({
+                'title': role,
+                'description': self.job_roles[role].get('description', '')
+            }))
+        return fragment
+    
+    def shared(self, value):
+        """Fragment of a shared, never-modified object, encoded once"""
+        key = id(value)
+        with self._lock:
+            entry = self._shared.get(key)
+            if entry is not None and entry[0] is value:
+                self._shared.move_to_end(key)
+                return entry[1]
+        fragment = Fragment(dumps(value))
+        with self._lock:
+            self._shared[key] = (value, fragment)
+            while len(self._shared) > self.shared_size:
+                self._shared.popitem(last=False)
+        return fragment
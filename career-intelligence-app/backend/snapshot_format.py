@@ -0,0 +1,281 @@
+"""
+Binary Market Data Snapshot
+Compiles the JSON data files into one compact file that workers mmap
+
+The JSON files in data/ stay the source of truth; the snapshot is a build
+artifact tagged with their content version and ignored when it is stale.
+Small auxiliary files (datastore.AUXILIARY_FILES) are not compiled.
+
+Layout (little-endian, sections 8-byte aligned):
+    header      magic, format version, data version, section count
+    sections    (offset, length) per section, in SECTIONS order
+    strings     string table: u32 offsets + UTF-8 bytes
+    skill_keys  interned skill IDs: u32 string id of the lowercased name
+    roles       per role: name, JSON blob, first/last column row, total weight
+    columns     one row per (role, required skill): skill id, name, note,
+                min_level, importance (f64), min_level weight (f64)
+    salary      per role: name, JSON blob
+    skills      per skill: name, JSON blob
+
+Numeric columns are exposed as memoryviews over the mapping, so their pages
+are shared by every process that maps the same file.
+
+Build with:
+    python snapshot_format.py [data_dir]
+"""
+
+from collections.abc import Mapping
+import json
+import mmap
+import os
+import struct
+import sys
+from types import MappingProxyType
+
+from algorithms.scoring import make_role_index
+
+MAGIC = b'CIMS'
+FORMAT_VERSION = 1
+SNAPSHOT_FILENAME = 'market_data.snap'
+
+HEADER = struct.Struct('<4sI16sI')
+SECTION = struct.Struct('<QQ')
+ROLE_ENTRY = struct.Struct('<IIIId')
+NAMED_BLOB = struct.Struct('<II')
+
+SECTIONS = (
+    'string_offsets', 'string_bytes', 'skill_keys', 'roles',
+    'col_skill_id', 'col_name', 'col_note', 'col_min_level',
+    'col_importance', 'col_min_weight', 'salary', 'skills'
+)
+
+NO_STRING = 0xFFFFFFFF
+
+
+class _StringTable:
+    """Interns strings while a snapshot is being written"""
+    
+    def __init__(self):
+        self.ids = {}
+        self.encoded = []
+    
+    def add(self, text):
+        if text is None:
+            return NO_STRING
+        sid = self.ids.get(text)
+        if sid is None:
+            sid = self.ids[text] = len(self.encoded)
+            self.encoded.append(text.encode('utf-8'))
+        return sid
+    
+    def add_json(self, value):
+        return self.add(json.dumps(value, ensure_ascii=False, separators=(',', ':')))
+
+
+def compile_snapshot(snapshot, path):
+    """
+    Write a datastore.Snapshot built from the JSON files to path
+    
+    The file is written next to its destination and renamed into place, so
+    readers never observe a partial snapshot.
+    """
+    strings = _StringTable()
+    skill_ids = {}
+    
+    def skill_id(skill_lower):
+        return skill_ids.setdefault(skill_lower, len(skill_ids))
+    
+    columns = {name: [] for name in SECTIONS if name.startswith('col_')}
+    roles = []
+    for role_name, role in snapshot.role_index.items():
+        start = len(columns['col_skill_id'])
+        for position, skill_lower in enumerate(role.keys):
+            columns['col_skill_id'].append(skill_id(skill_lower))
+            columns['col_name'].append(strings.add(role.skills[position]))
+            columns['col_note'].append(strings.add(role.notes[position]))
+            columns['col_min_level'].append(strings.add(role.min_levels[position]))
+            columns['col_importance'].append(role.importance[position])
+            columns['col_min_weight'].append(role.min_level_weights[position])
+        roles.append(ROLE_ENTRY.pack(
+            strings.add(role_name),
+            strings.add_json(snapshot.job_roles[role_name]),
+            start,
+            len(columns['col_skill_id']),
+            role.total_weight
+        ))
+    
+    salary = [NAMED_BLOB.pack(strings.add(name), strings.add_json(value))
+              for name, value in snapshot.salary_data.items()]
+    skills = []
+    for name, value in snapshot.skills_database.items():
+        skill_id(name.lower())
+        skills.append(NAMED_BLOB.pack(strings.add(name), strings.add_json(value)))
+    skill_keys = [strings.add(key) for key in skill_ids]
+    
+    offsets = [0]
+    for encoded in strings.encoded:
+        offsets.append(offsets[-1] + len(encoded))
+    
+    payloads = {
+        'string_offsets': struct.pack(f'<{len(offsets)}I', *offsets),
+        'string_bytes': b''.join(strings.encoded),
+        'skill_keys': struct.pack(f'<{len(skill_keys)}I', *skill_keys),
+        'roles': b''.join(roles),
+        'salary': b''.join(salary),
+        'skills': b''.join(skills)
+    }
+    for name, values in columns.items():
+        code = 'd' if name in ('col_importance', 'col_min_weight') else 'I'
+        payloads[name] = struct.pack(f'<{len(values)}{code}', *values)
+    
+    position = HEADER.size + SECTION.size * len(SECTIONS)
+    table = []
+    body = []
+    for name in SECTIONS:
+        padding = -position % 8
+        body.append(b'\0' * padding)
+        position += padding
+        table.append(SECTION.pack(position, len(payloads[name])))
+        body.append(payloads[name])
+        position += len(payloads[name])
+    
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, snapshot.version.encode('ascii'), len(SECTIONS))
+    tmp_path = f'{path}.tmp{os.getpid()}'
+    with open(tmp_path, 'wb') as f:
+        f.write(header)
+        f.write(b''.join(table))
+        f.write(b''.join(body))
+    os.replace(tmp_path, path)
+
+
+class LazyJSONMapping(Mapping):
+    """Read-only mapping whose values are decoded from the snapshot on first access"""
+    
+    def __init__(self, reader, blob_ids):
+        self._reader = reader
+        self._blob_ids = blob_ids
+        self._decoded = {}
+    
+    def __getitem__(self, key):
+        value = self._decoded.get(key)
+        if value is None:
+            value = json.loads(str(self._reader.raw_string(self._blob_ids[key]), 'utf-8'))
+            self._decoded[key] = value
+        return value
+    
+    def __contains__(self, key):
+        return key in self._blob_ids
+    
+    def __iter__(self):
+        return iter(self._blob_ids)
+    
+    def __len__(self):
+        return len(self._blob_ids)
+
+
+class MappedSnapshot:
+    """
+    Memory-mapped view of a compiled snapshot file
+    
+    Raises:
+        ValueError if the file is not a snapshot this code can read
+    """
+    
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        
+        magic, format_version, data_version, section_count = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or format_version != FORMAT_VERSION or section_count != len(SECTIONS):
+            raise ValueError(f'{path} is not a version {FORMAT_VERSION} market data snapshot')
+        self.data_version = data_version.decode('ascii')
+        
+        view = memoryview(self._map)
+        self._sections = {}
+        for i, name in enumerate(SECTIONS):
+            offset, length = SECTION.unpack_from(self._map, HEADER.size + i * SECTION.size)
+            self._sections[name] = view[offset:offset + length]
+        
+        self._string_offsets = self._sections['string_offsets'].cast('I')
+        self._string_bytes = self._sections['string_bytes']
+        self._strings = {}
+    
+    def column(self, name):
+        """Zero-copy numeric column ('I' or 'd' typed memoryview)"""
+        code = 'd' if name in ('col_importance', 'col_min_weight') else 'I'
+        return self._sections[name].cast(code)
+    
+    def raw_string(self, sid):
+        """UTF-8 bytes of a string table entry, without decoding"""
+        return self._string_bytes[self._string_offsets[sid]:self._string_offsets[sid + 1]]
+    
+    def string(self, sid):
+        """Decoded (and memoized) string table entry"""
+        if sid == NO_STRING:
+            return None
+        text = self._strings.get(sid)
+        if text is None:
+            text = self._strings[sid] = str(self.raw_string(sid), 'utf-8')
+        return text
+    
+    def _named_blobs(self, section):
+        return {
+            self.string(name_sid): blob_sid
+            for name_sid, blob_sid in NAMED_BLOB.iter_unpack(self._sections[section])
+        }
+    
+    def role_entries(self):
+        """(name, blob id, first column row, end column row, total weight) per role"""
+        return [
+            (self.string(name_sid), blob_sid, start, end, total_weight)
+            for name_sid, blob_sid, start, end, total_weight
+            in ROLE_ENTRY.iter_unpack(self._sections['roles'])
+        ]
+    
+    def job_roles(self):
+        return LazyJSONMapping(self, {entry[0]: entry[1] for entry in self.role_entries()})
+    
+    def salary_data(self):
+        return LazyJSONMapping(self, self._named_blobs('salary'))
+    
+    def skills_database(self):
+        return LazyJSONMapping(self, self._named_blobs('skills'))
+    
+    def role_index(self):
+        """
+        Build scoring RoleIndex objects straight from the columns
+        
+        importance and min_level_weights are memoryview slices of the
+        mapped file rather than per-process copies.
+        """
+        names = self.column('col_name')
+        notes = self.column('col_note')
+        min_levels = self.column('col_min_level')
+        importance = self.column('col_importance')
+        min_weights = self.column('col_min_weight')
+        
+        index = {}
+        for role_name, _, start, end, total_weight in self.role_entries():
+            index[role_name] = make_role_index(
+                [self.string(names[row]) for row in range(start, end)],
+                importance[start:end],
+                [self.string(min_levels[row]) for row in range(start, end)],
+                min_weights[start:end],
+                [self.string(notes[row]) for row in range(start, end)],
+                total_weight
+            )
+        return MappingProxyType(index)
+
+
+def main(argv):
+    from datastore import DATA_DIR, DataStore
+    
+    data_dir = argv[1] if len(argv) > 1 else DATA_DIR
+    store = DataStore(data_dir, poll_interval=0, use_compiled=False)
+    path = os.path.join(data_dir, SNAPSHOT_FILENAME)
+    compile_snapshot(store.snapshot, path)
+    print(f'Wrote {path} ({os.path.getsize(path)} bytes, data version {store.snapshot.version})')
+
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,59 @@
+"""
+Tests for the peer store: no comparison ever describes fewer than MIN_PEERS profiles
+
+Run from the backend folder:
+    python -m pytest tests
+    python -m unittest discover tests
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import peers
+from algorithms.scoring import normalize_profile
+from datastore import DataStore
+from peers import MIN_PEERS, PeerStore
+
+
+class ProbeExhaustionTest(unittest.TestCase):
+    """The ring probes may stop with fewer neighbours than MIN_PEERS"""
+    
+    def setUp(self):
+        self.snapshot = DataStore(poll_interval=0).snapshot
+        self.directory = tempfile.mkdtemp()
+        self.store = PeerStore(os.path.join(self.directory, 'peers.ndjson'), self.snapshot.role_index)
+    
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+    
+    def test_too_few_neighbours_are_not_described(self):
+        role = 'Data Analyst'
+        skills = list(self.snapshot.job_roles[role]['required_skills'])
+        query = normalize_profile({skill: 'expert' for skill in skills}, self.snapshot.skill_resolver)
+        far = normalize_profile({}, self.snapshot.skill_resolver)
+        
+        # One profile equal to the query, the rest as far from it as can be
+        self.store.record(role, query, 90.0)
+        for _ in range(MIN_PEERS):
+            self.store.record(role, far, 10.0)
+        
+        # Probing only the query's own vector finds a single row
+        with mock.patch.object(peers, 'SCAN_LIMIT', 0), mock.patch.object(peers, 'MAX_PROBES', 1):
+            comparison = self.store.compare(role, query, 90.0, MIN_PEERS)
+        self.assertEqual(comparison['peer_count'], MIN_PEERS + 1)
+        self.assertIsNotNone(comparison['percentile'])
+        self.assertIsNone(comparison['nearest_peers'])
+        
+        # With the probes left alone all of them are found
+        comparison = self.store.compare(role, query, 90.0, MIN_PEERS)
+        self.assertEqual(comparison['nearest_peers']['count'], MIN_PEERS)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+"""
+Tests for the learning path planner: projected scores match a full analysis
+
+Run from the backend folder:
+    python -m pytest tests
+    python -m unittest discover tests
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from algorithms.planner import plan_learning_path
+from algorithms.scoring import analyze_fit, normalize_profile
+from datastore import DataStore
+
+
+class NegativeBonusTest(unittest.TestCase):
+    """A diploma's -5 bonus can put the fit score below 0 before it is clamped"""
+    
+    def setUp(self):
+        self.snapshot = DataStore(poll_interval=0).snapshot
+    
+    def fit_score(self, role, user_skills):
+        snapshot = self.snapshot
+        return analyze_fit(role, user_skills, 'fresher', 'diploma', snapshot.job_roles, snapshot.role_index,
+                           resolver=snapshot.skill_resolver).fit_score
+    
+    def test_steps_are_measured_from_the_clamped_score(self):
+        snapshot = self.snapshot
+        role = 'Data Analyst'
+        user_skills = {skill: 'beginner' for skill in list(snapshot.job_roles[role]['required_skills'])[:1]}
+        start = self.fit_score(role, user_skills)
+        self.assertEqual(start, 0)
+        
+        plan = plan_learning_path([role], normalize_profile(user_skills, snapshot.skill_resolver), 12,
+                                  snapshot.job_roles, snapshot.role_index, snapshot.planner_index,
+                                  'fresher', 'diploma')
+        self.assertTrue(plan['steps'])
+        self.assertEqual(plan['current'][0]['fit_score'], 0)
+        
+        # Every projection is what /api/analyze would report after the steps so far
+        skills = dict(user_skills)
+        previous = start
+        for step in plan['steps']:
+            skills[step['skill']] = step['to_level']
+            score = self.fit_score(role, skills)
+            self.assertAlmostEqual(step['projected'][0]['fit_score'], score, delta=0.05)
+            self.assertAlmostEqual(step['fit_score_gain'], score - previous, delta=0.05)
+            previous = score
+        self.assertAlmostEqual(plan['expected_gain'], previous - start, delta=0.05)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+"""
+Tests for skill name resolution: near misses must not resolve to a skill
+
+Run from the backend folder:
+    python -m pytest tests
+    python -m unittest discover tests
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from algorithms.skill_matching import MATCH_ALIAS, MATCH_NONE, MATCH_SIMILAR, MATCH_TYPO, SkillResolver
+from datastore import DataStore
+
+
+class NearMissTest(unittest.TestCase):
+    """Names one edit away from a skill or alias that are different words"""
+    
+    @classmethod
+    def setUpClass(cls):
+        cls.resolver = DataStore(poll_interval=0).snapshot.skill_resolver
+    
+    def assert_unresolved(self, name):
+        resolution = self.resolver.resolve(name)
+        self.assertEqual(resolution.match, MATCH_NONE, f'{name!r} resolved to {resolution.skill_id!r}')
+        self.assertEqual(resolution.skill_id, name.lower())
+    
+    def assert_resolves(self, name, skill_id, match=MATCH_TYPO):
+        self.assertEqual(self.resolver.resolve(name), (skill_id, match))
+    
+    def test_short_alias_is_not_a_typo_target(self):
+        # 'stats' is an alias of Statistics
+        self.assert_unresolved('Stata')
+    
+    def test_different_first_letter(self):
+        self.assert_unresolved('Jython')
+        self.assert_unresolved('Cython')
+    
+    def test_truncated_alias(self):
+        # one deletion from the alias 'postgres', and close in trigrams
+        self.assert_unresolved('postgre')
+    
+    def test_short_names_are_not_fuzzy_matched(self):
+        self.assert_unresolved('Exel')
+        self.assert_unresolved('Pyton')
+    
+    def test_typos_inside_a_name_still_resolve(self):
+        self.assert_resolves('Pyhton', 'python')
+        self.assert_resolves('Statistcs', 'statistics')
+        self.assert_resolves('Tablaeu', 'tableau')
+        self.assert_resolves('Comunication', 'communication')
+        self.assert_resolves('Powr BI', 'power bi')
+        self.assert_resolves('postgress', 'sql')
+
+
+class FuzzyLengthTest(unittest.TestCase):
+    """Length limits of the typo and similarity passes, on a small catalogue"""
+    
+    def setUp(self):
+        self.resolver = SkillResolver(['Kotlin', 'Docker', 'Kubernetes'], {'Kubernetes': ['k8s', 'kube']})
+    
+    def test_one_edit_needs_six_characters(self):
+        self.assertEqual(self.resolver.resolve('kube').match, MATCH_ALIAS)
+        self.assertEqual(self.resolver.resolve('kubw').match, MATCH_NONE)
+        self.assertEqual(self.resolver.resolve('Kotlni').match, MATCH_NONE)  # swap at the end
+        self.assertEqual(self.resolver.resolve('Kotiln'), ('kotlin', MATCH_TYPO))
+    
+    def test_similarity_needs_eight_characters(self):
+        self.assertEqual(self.resolver.resolve('Dockers').match, MATCH_NONE)
+        self.assertEqual(self.resolver.resolve('Kubernetess'), ('kubernetes', MATCH_TYPO))
+        self.assertEqual(self.resolver.resolve('Kubernetesx'), ('kubernetes', MATCH_SIMILAR))
+        self.assertEqual(self.resolver.resolve('Kubernetes Engine').match, MATCH_NONE)
+        self.assertEqual(self.resolver.resolve('Kubernetes Eng'), ('kubernetes', MATCH_SIMILAR))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+"""
+Tests for /api/analyze/stream: every input line gets exactly one output line
+
+Run from the backend folder:
+    python -m pytest tests
+    python -m unittest discover tests
+"""
+
+import json
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app
+
+
+class StreamErrorTest(unittest.TestCase):
+    """Error lines must be encodable whatever the client sent"""
+    
+    def setUp(self):
+        self.client = app.test_client()
+    
+    def stream(self, *lines):
+        response = self.client.post('/api/analyze/stream', data=b''.join(line + b'\n' for line in lines),
+                                    content_type='application/x-ndjson')
+        self.assertEqual(response.status_code, 200)
+        return [json.loads(line) for line in response.get_data().splitlines()]
+    
+    def test_id_too_wide_for_the_encoder(self):
+        wide = 2 ** 70
+        results = self.stream(
+            json.dumps({'id': wide, 'role': 'Data Analyst', 'skills': {'SQL': 'advanced'}}).encode(),
+            json.dumps({'id': wide, 'role': 'No Such Role'}).encode(),
+            json.dumps({'id': 3, 'role': 'Data Analyst', 'skills': {'SQL': 'advanced'}}).encode()
+        )
+        self.assertEqual([result['line'] for result in results], [1, 2, 3])
+        for result in results[:2]:
+            self.assertIn('error', result)
+            self.assertIn(result['id'], (wide, str(wide)))
+        self.assertEqual(results[2]['id'], 3)
+        self.assertIn('result', results[2])
+    
+    def test_id_that_cannot_be_encoded_at_all(self):
+        # A lone surrogate decodes fine but is not valid UTF-8
+        results = self.stream(b'{"id": "\\ud800", "role": "No Such Role"}')
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0]['line'], 1)
+        self.assertEqual(results[0]['error'], 'Invalid job role')
+
+
+if __name__ == '__main__':
+    unittest.main()
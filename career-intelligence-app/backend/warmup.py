@@ -0,0 +1,185 @@
+"""
+Warm Start
+Precomputed /api/analyze results for the most common profiles, so a fresh
+worker answers them from its result cache instead of computing them
+
+The candidates are every role x experience level x education x location,
+each with a few skill presets derived from the role, plus any profile
+seen in a sample of real traffic. They are ranked by how often they occur
+in that sample; without one, the grid order is kept.
+
+The results file is a build artifact tagged with the data version it was
+computed from, and is ignored once the data files change. Layout (NDJSON):
+    header      {"format": 1, "data_version": ..., "created_at": ..., "entries": n}
+    entries     payload, a tab, then the encoded response, one per line,
+                most frequent first (compact JSON has no raw tabs or newlines)
+
+Build with:
+    python warmup.py [--traffic-log sample.ndjson] [--limit N] [data_dir]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+from algorithms.salary_estimation import EXPERIENCE_LEVELS, LOCATIONS
+from algorithms.scoring import EDUCATION_BONUS
+from serialization import Fragment, dumps
+
+WARM_START_FILENAME = 'warm_start.ndjson'
+FORMAT_VERSION = 1
+
+# Skill presets per role: no skills, the High priority skills at their
+# minimum level, and every required skill at its minimum level
+SKILL_PRESETS = ('none', 'high_priority', 'required')
+
+
+def skill_presets(role):
+    """
+    Args:
+        role: scoring.RoleIndex entry
+    
+    Returns:
+        {preset name: skills dict} for SKILL_PRESETS
+    """
+    return {
+        'none': {},
+        'high_priority': {
+            skill: min_level
+            for skill, min_level, priority in zip(role.skills, role.min_levels, role.priorities)
+            if priority == 'High'
+        },
+        'required': dict(zip(role.skills, role.min_levels))
+    }
+
+
+def candidate_profiles(role_index):
+    """Every role x experience x education x location x skill preset, as /api/analyze payloads"""
+    payloads = []
+    for role_name, role in role_index.items():
+        presets = skill_presets(role)
+        for preset in SKILL_PRESETS:
+            for experience in EXPERIENCE_LEVELS:
+                for education in EDUCATION_BONUS:
+                    for location in LOCATIONS:
+                        payloads.append({
+                            'role': role_name,
+                            'skills': presets[preset],
+                            'experience': experience,
+                            'education': education,
+                            'location': location
+                        })
+    return payloads
+
+
+def read_traffic_log(path):
+    """
+    /api/analyze payloads from an NDJSON traffic sample; unreadable lines are skipped
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                payload = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(payload, dict):
+                yield payload
+
+
+def rank_profiles(candidates, traffic, key_of, limit=None):
+    """
+    Payloads to warm, most frequent in traffic first
+    
+    Args:
+        candidates: Payloads to consider even if the sample never has them
+        traffic: Iterable of sampled payloads
+        key_of: payload -> canonical profile key, or None to skip the payload
+        limit: Most payloads returned
+    
+    Returns:
+        List of payloads, one per distinct profile
+    """
+    counts = {}  # key -> [count, first payload seen]
+    for payload in candidates:
+        key = key_of(payload)
+        if key is not None:
+            counts.setdefault(key, [0, payload])
+    for payload in traffic:
+        key = key_of(payload)
+        if key is not None:
+            counts.setdefault(key, [0, payload])[0] += 1
+    
+    # sorted() is stable, so unsampled candidates keep the grid order
+    ranked = sorted(counts.values(), key=lambda entry: -entry[0])
+    return [payload for _, payload in ranked[:limit]]
+
+
+def save_warm_start(path, data_version, results):
+    """
+    Write (payload, encoded response) pairs, replacing path atomically
+    """
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(dumps({
+            'format': FORMAT_VERSION,
+            'data_version': data_version,
+            'created_at': int(time.time()),
+            'entries': len(results)
+        }) + b'\n')
+        for payload, body in results:
+            f.write(dumps(payload) + b'\t' + body + b'\n')
+    os.replace(tmp_path, path)
+
+
+def load_warm_start(path, data_version):
+    """
+    Read a results file written by save_warm_start
+    
+    Returns:
+        List of (payload, serialization.Fragment), or None if the file is
+        missing, unreadable, or was computed from other data
+    """
+    try:
+        with open(path, 'rb') as f:
+            header = json.loads(f.readline())
+            if (not isinstance(header, dict) or header.get('format') != FORMAT_VERSION
+                    or header.get('data_version') != data_version):
+                return None
+            results = []
+            for line in f:
+                payload, body = line.rstrip(b'\n').split(b'\t', 1)
+                results.append((json.loads(payload), Fragment(body)))
+            return results
+    except (OSError, ValueError):
+        return None
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description='Precompute warm-start results for /api/analyze')
+    parser.add_argument('data_dir', nargs='?', help='data folder (default: the DataStore default)')
+    parser.add_argument('--traffic-log', help='NDJSON sample of /api/analyze payloads to rank profiles by')
+    parser.add_argument('--limit', type=int, help='most results kept (default: the result cache size)')
+    args = parser.parse_args(argv[1:])
+    
+    import app
+    from datastore import DATA_DIR, DataStore
+    
+    data_dir = args.data_dir or DATA_DIR
+    snapshot = DataStore(data_dir, poll_interval=0).snapshot
+    # Compute every result afresh rather than serving ones restored at import
+    app.RESULT_CACHE.clear()
+    traffic = read_traffic_log(args.traffic_log) if args.traffic_log else ()
+    limit = args.limit if args.limit is not None else app.RESULT_CACHE.maxsize
+    payloads = rank_profiles(candidate_profiles(snapshot.role_index), traffic,
+                             lambda payload: app.profile_key(payload, snapshot), limit)
+    results = [(payload, app.run_analysis(payload, snapshot)) for payload in payloads]
+    
+    path = os.path.join(data_dir, WARM_START_FILENAME)
+    save_warm_start(path, snapshot.version, results)
+    print(f'Wrote {path} ({len(results)} results, data version {snapshot.version})')
+
+
+if __name__ == '__main__':
+    main(sys.argv)
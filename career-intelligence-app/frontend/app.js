@@ -1,18 +1,66 @@
 // Configuration
 const API_URL = 'http://localhost:5000/api';
 
+// Times a busy (503) analysis is retried before giving up
+const MAX_BUSY_RETRIES = 3;
+
 // Global state
 let analysisResults = null;
+let catalogue = null;
 
 // Initialize app
 document.addEventListener('DOMContentLoaded', function() {
     setupEventListeners();
+    loadCatalogue();
 });
 
 // Event Listeners
 function setupEventListeners() {
     const form = document.getElementById('career-form');
     form.addEventListener('submit', handleFormSubmit);
+    document.getElementById('job-role').addEventListener('change', updateSkillSuggestions);
+}
+
+// Load every role and its skills in one request; the browser revalidates
+// it with the ETag, so repeat visits usually get a 304
+async function loadCatalogue() {
+    try {
+        const response = await fetch(`${API_URL}/catalogue`);
+        if (!response.ok) {
+            return;
+        }
+        catalogue = await response.json();
+    } catch (error) {
+        // Keep the role options built into the page
+        return;
+    }
+    
+    const select = document.getElementById('job-role');
+    const selected = select.value;
+    select.innerHTML = '<option value="">Select a role...</option>';
+    catalogue.roles.forEach(role => {
+        const option = document.createElement('option');
+        option.value = role;
+        option.textContent = role;
+        select.appendChild(option);
+    });
+    select.value = selected;
+    updateSkillSuggestions();
+}
+
+// Suggest the selected role's skills in the skill name inputs
+function updateSkillSuggestions() {
+    const datalist = document.getElementById('skill-suggestions');
+    const role = document.getElementById('job-role').value;
+    datalist.innerHTML = '';
+    if (!catalogue || !catalogue.skills[role]) {
+        return;
+    }
+    Object.keys(catalogue.skills[role]).forEach(skill => {
+        const option = document.createElement('option');
+        option.value = skill;
+        datalist.appendChild(option);
+    });
 }
 
 // Add new skill input row
@@ -21,7 +69,7 @@ function addSkill() {
     const newRow = document.createElement('div');
     newRow.className = 'skill-input-row';
     newRow.innerHTML = `
-        <input type="text" class="skill-name" placeholder="Skill name (e.g., Python)" required>
+        <input type="text" class="skill-name" placeholder="Skill name (e.g., Python)" list="skill-suggestions" required>
         <select class="skill-level" required>
             <option value="">Level...</option>
             <option value="beginner">Beginner</option>
@@ -125,19 +173,28 @@ function validateFormData(data) {
 
 // Call API to analyze profile
 async function analyzeProfile(data) {
-    const response = await fetch(`${API_URL}/analyze`, {
-        method: 'POST',
-        headers: {
-            'Content-Type': 'application/json'
-        },
-        body: JSON.stringify(data)
-    });
-    
-    if (!response.ok) {
-        throw new Error('API request failed');
+    for (let attempt = 0; ; attempt++) {
+        const response = await fetch(`${API_URL}/analyze`, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json'
+            },
+            body: JSON.stringify(data)
+        });
+        
+        // The server is at capacity: wait as long as it asks, then retry
+        if (response.status === 503 && attempt < MAX_BUSY_RETRIES) {
+            const seconds = parseInt(response.headers.get('Retry-After'), 10) || 1;
+            await new Promise(resolve => setTimeout(resolve, seconds * 1000));
+            continue;
+        }
+        
+        if (!response.ok) {
+            throw new Error('API request failed');
+        }
+        
+        return await response.json();
     }
-    
-    return await response.json();
 }
 
 // Display results
@@ -405,12 +462,13 @@ function resetForm() {
     
     // Reset form
     document.getElementById('career-form').reset();
+    updateSkillSuggestions();
     
     // Reset to single skill input
     const container = document.getElementById('skills-container');
     container.innerHTML = `
         <div class="skill-input-row">
-            <input type="text" class="skill-name" placeholder="Skill name (e.g., Python)" required>
+            <input type="text" class="skill-name" placeholder="Skill name (e.g., Python)" list="skill-suggestions" required>
             <select class="skill-level" required>
                 <option value="">Level...</option>
                 <option value="beginner">Beginner</option>